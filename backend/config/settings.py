@@ -4,6 +4,7 @@ Configuration and environment variables
 
 import os
 import sys
+import json
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -56,6 +57,18 @@ else:
 
 # Gemini API (2026 SDK)
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+# "genai" (real API) or "fake" (offline load testing, see services/gemini_fake.py)
+GEMINI_BACKEND = os.environ.get("GEMINI_BACKEND", "genai").lower()
+# Context caching of static system instructions: "remote" (SDK caches), "local" (in-process, offline/tests) or "off"
+GEMINI_CONTEXT_CACHE = os.environ.get("GEMINI_CONTEXT_CACHE", "remote").lower()
+GEMINI_CONTEXT_CACHE_TTL = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL", 3600))
+# Optional per-task routing overrides, e.g. '{"explain_term": {"max_output_tokens": 600}}'
+try:
+    GEMINI_TASK_ROUTE_OVERRIDES = json.loads(
+        os.environ.get("GEMINI_TASK_ROUTES", "") or "{}"
+    )
+except ValueError:
+    GEMINI_TASK_ROUTE_OVERRIDES = {}
 
 # LiveKit Configuration
 LIVEKIT_URL = os.environ.get("LIVEKIT_URL", "")
@@ -76,3 +89,59 @@ LOG_FILE = "app.log"
 # Application Settings
 APP_VERSION = "2.1.0"
 APP_NAME = "AI Health Care Platform"
+
+# Per-user context snapshot cache (profile + latest prediction) used for personalization
+USER_CONTEXT_TTL = int(os.environ.get("USER_CONTEXT_TTL", 300))
+USER_CONTEXT_MAX_ENTRIES = int(os.environ.get("USER_CONTEXT_MAX_ENTRIES", 10000))
+
+# Write-behind buffer for append-only inserts (chat history, activity events)
+WRITE_BEHIND_ENABLED = os.environ.get("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", 200))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", 1.0))
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get("WRITE_BEHIND_MAX_PENDING", 10000))
+
+# Multi-turn chat memory: verbatim recent turns within a token budget, older turns
+# folded into a rolling per-conversation summary
+CHAT_MEMORY_TOKEN_BUDGET = int(os.environ.get("CHAT_MEMORY_TOKEN_BUDGET", 1500))
+CHAT_MEMORY_MAX_CONVERSATIONS = int(
+    os.environ.get("CHAT_MEMORY_MAX_CONVERSATIONS", 5000)
+)
+
+# After an instant local emergency answer, still ask Gemini for follow-up detail
+EMERGENCY_LLM_FOLLOWUP = (
+    os.environ.get("EMERGENCY_LLM_FOLLOWUP", "true").lower() == "true"
+)
+
+# In-memory MinHash/LSH index of past predictions for similar-case lookups,
+# snapshotted to disk so restarts only read predictions newer than the snapshot
+SIMILAR_CASES_ENABLED = os.environ.get("SIMILAR_CASES_ENABLED", "true").lower() == "true"
+SIMILAR_CASES_SNAPSHOT_PATH = os.environ.get(
+    "SIMILAR_CASES_SNAPSHOT_PATH", "similar_cases.pkl"
+)
+SIMILAR_CASES_PERSIST_INTERVAL = int(
+    os.environ.get("SIMILAR_CASES_PERSIST_INTERVAL", 300)
+)
+SIMILAR_CASES_MAX = int(os.environ.get("SIMILAR_CASES_MAX", 500000))
+
+# Per-user stats documents are kept current with $inc on every write; this job
+# recomputes them from the source collections to repair drift (0 disables)
+USER_STATS_RECONCILE_INTERVAL = int(
+    os.environ.get("USER_STATS_RECONCILE_INTERVAL", 86400)
+)
+
+# Feed events expire this many days after they happen (0 keeps them forever).
+# The timeline looks back up to 365 days, so shorter retention trims it.
+ACTIVITY_EVENTS_RETENTION_DAYS = int(
+    os.environ.get("ACTIVITY_EVENTS_RETENTION_DAYS", 0)
+)
+
+# Admin platform statistics are recomputed in the background this often and
+# served from memory in between (0 computes them on first request only)
+PLATFORM_STATS_REFRESH_INTERVAL = int(
+    os.environ.get("PLATFORM_STATS_REFRESH_INTERVAL", 60)
+)
+
+# Daily analytics buckets are incremented on write; this job recomputes the
+# last ROLLUP_REPAIR_DAYS completed days from the source collections (0 disables)
+ROLLUP_REPAIR_INTERVAL = int(os.environ.get("ROLLUP_REPAIR_INTERVAL", 86400))
+ROLLUP_REPAIR_DAYS = int(os.environ.get("ROLLUP_REPAIR_DAYS", 3))
@@ -23,29 +23,72 @@ async def create_indexes():
     """Create MongoDB indexes"""
     try:
         await db.store.create_index("email", unique=True)
-        await db.appointments.create_index("email")
         await db.appointments.create_index("date")
+        await db.appointments.create_index([("user_email", 1), ("date", 1)])
+        await db.appointments.create_index("created_at")
+        # Keyset-paginated lists: (filter..., sort key, _id) in sort order
+        await db.appointments.create_index(
+            [("user_email", 1), ("created_at", -1), ("_id", -1)]
+        )
         await db.files.create_index("email")
+        await db.files.create_index([("email", 1), ("uploaded_at", -1), ("_id", -1)])
         await db.predictions.create_index("email")
         await db.predictions.create_index("created_at")
+        await db.predictions.create_index(
+            [("email", 1), ("created_at", -1), ("_id", -1)]
+        )
+        await db.store.create_index([("created_at", -1), ("_id", -1)])
+        await db.store.create_index("totp_verified", sparse=True)
+        await db.user_stats.create_index([("last_active_at", -1), ("_id", -1)])
         await db.chat_history.create_index("email")
+        await db.chat_history.create_index(
+            [("email", 1), ("conversation_id", 1), ("created_at", -1)]
+        )
+        await db.chat_summaries.create_index(
+            [("email", 1), ("conversation_id", 1)], unique=True
+        )
         await db.health_plans.create_index("email")
+        await db.health_plans.create_index(
+            [("email", 1), ("fingerprint", 1), ("created_at", -1)]
+        )
         await db.medications.create_index("email")
-        await db.medications.create_index([("email", 1), ("active", 1)])
+        await db.medications.create_index(
+            [("email", 1), ("created_at", -1), ("_id", -1)]
+        )
+        await db.medications.create_index(
+            [("email", 1), ("active", 1), ("created_at", -1), ("_id", -1)]
+        )
         await db.medication_logs.create_index("email")
         await db.medication_logs.create_index("medication_id")
+        await db.medication_logs.create_index([("email", 1), ("logged_at", -1)])
         await db.journal_entries.create_index("email")
-        await db.journal_entries.create_index([("email", 1), ("created_at", -1)])
+        await db.journal_entries.create_index(
+            [("email", 1), ("created_at", -1), ("_id", -1)]
+        )
         await db.family_profiles.create_index("owner_email")
         await db.notifications.create_index("email")
-        await db.notifications.create_index([("email", 1), ("read", 1)])
+        await db.notifications.create_index(
+            [("email", 1), ("created_at", -1), ("_id", -1)]
+        )
+        await db.notifications.create_index(
+            [("email", 1), ("read", 1), ("created_at", -1), ("_id", -1)]
+        )
         await db.doctors.create_index("specialization")
         await db.doctors.create_index("city")
         await db.doctors.create_index([("avg_rating", -1)])
+        for field, direction in (("avg_rating", -1), ("name", 1), ("review_count", -1)):
+            await db.doctors.create_index(
+                [("active", 1), (field, direction), ("_id", direction)]
+            )
         await db.doctor_reviews.create_index("doctor_id")
         await db.doctor_reviews.create_index(
             [("doctor_id", 1), ("email", 1)], unique=True
         )
+        await db.activity_events.create_index([("email", 1), ("date", -1), ("_id", -1)])
+        await db.activity_events.create_index([("created_at", -1)])
+        # Only events written with a retention period carry expires_at
+        await db.activity_events.create_index("expires_at", expireAfterSeconds=0)
+        await db.daily_rollups.create_index([("metric", 1), ("day", 1)])
         logger.info("Database indexes created")
     except Exception as e:
         logger.warning(f"Index creation warning: {e}")
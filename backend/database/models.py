@@ -79,6 +79,10 @@ class ContactRequest(BaseModel):
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=1000)
     context: Optional[Dict[str, Any]] = None
+    # Omit to start a new conversation; the response returns the id to reuse
+    conversation_id: Optional[str] = Field(
+        None, min_length=1, max_length=64, pattern="^[A-Za-z0-9_-]+$"
+    )
 
 
 class DrugInteractionRequest(BaseModel):
@@ -93,6 +97,17 @@ class SymptomAnalysisRequest(BaseModel):
     symptoms: str
 
 
+class NextSymptomRequest(BaseModel):
+    present: List[str] = Field(..., min_items=1, max_items=20)
+    # Symptoms the user already said they do not have
+    absent: List[str] = Field(default_factory=list, max_items=100)
+    limit: int = Field(3, ge=1, le=10)
+
+
+class SymptomExtractRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=5000)
+
+
 class MedicationCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
     dosage: str = Field(..., min_length=1, max_length=100)
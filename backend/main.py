@@ -26,7 +26,13 @@ from config.settings import (
 )
 from database.connection import db, create_indexes, close_connection
 from services.gemini_service import initialize_gemini
-from services.ml_service import load_models, are_models_loaded
+from services.ml_service import load_models, are_models_loaded, get_available_symptoms
+from services.write_behind import start_write_behind, stop_write_behind
+from services.similar_cases import start_similar_cases, stop_similar_cases
+from services.user_stats import start_user_stats_reconciler, stop_user_stats_reconciler
+from services.platform_stats import start_platform_stats, stop_platform_stats
+from services.rollups import start_rollup_repair, stop_rollup_repair
+from services.activity_feed import start_activity_backfill, stop_activity_backfill
 
 # Import ALL routers
 from routes.gemini import router as gemini_router
@@ -112,11 +118,35 @@ async def lifespan(app: FastAPI):
     # Create database indexes
     await create_indexes()
 
+    # Start batching append-only inserts
+    await start_write_behind()
+
+    # Similar-case index: snapshot + catch-up from Mongo in the background
+    await start_similar_cases(len(get_available_symptoms()))
+
+    # Timeline events for records stored before the activity feed (first run only)
+    start_activity_backfill()
+
+    # Periodic repair of incrementally maintained per-user stats
+    start_user_stats_reconciler()
+
+    # Admin dashboard counts, refreshed off the request path
+    start_platform_stats()
+
+    # Nightly recount of the daily analytics buckets
+    start_rollup_repair()
+
     logger.info("[READY] Application started successfully")
 
     yield
 
     logger.info("[SHUTDOWN] Closing application")
+    await stop_rollup_repair()
+    await stop_platform_stats()
+    await stop_user_stats_reconciler()
+    await stop_activity_backfill()
+    await stop_similar_cases()
+    await stop_write_behind()
     close_connection()
 
 
@@ -146,6 +176,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Conversation-Id"],
 )
 
 
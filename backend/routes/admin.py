@@ -4,13 +4,22 @@ Platform statistics, user management, and system health monitoring
 """
 
 from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import PlainTextResponse
 from database.connection import db
 from utils.helpers import standard_response, serialize_doc
+from utils.pagination import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
 from utils.security import require_auth
 from config.settings import ADMIN_EMAIL
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,83 +33,41 @@ def _require_admin(email: str):
 
 
 @router.get("/stats")
-async def get_platform_stats(request: Request):
-    """Get platform-wide statistics"""
+async def get_platform_stats(
+    request: Request,
+    refresh: bool = Query(default=False, description="Recompute instead of cached"),
+):
+    """Get platform-wide statistics (cached snapshot, see services.platform_stats)"""
     try:
         email = await require_auth(request)
         _require_admin(email)
 
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        seven_days_ago = now - timedelta(days=7)
-
-        total_users = await db.store.count_documents({})
-        total_predictions = await db.predictions.count_documents({})
-        total_appointments = await db.appointments.count_documents({})
-        total_medications = await db.medications.count_documents({})
-        total_doctors = await db.doctors.count_documents({})
-        total_files = await db.files.count_documents({})
-        total_contacts = await db.store.count_documents({"type": "contact"})
-        total_journal = await db.journal_entries.count_documents({})
-        total_family = await db.family_profiles.count_documents({})
-        total_reviews = await db.doctor_reviews.count_documents({})
-
-        recent_users = 0
-        recent_predictions = 0
-        recent_appointments = 0
-
-        try:
-            recent_users = await db.store.count_documents(
-                {"created_at": {"$gte": thirty_days_ago}}
-            )
-        except Exception:
-            pass
-
-        try:
-            recent_predictions = await db.predictions.count_documents(
-                {"created_at": {"$gte": thirty_days_ago.isoformat()}}
-            )
-        except Exception:
-            pass
-
-        try:
-            recent_appointments = await db.appointments.count_documents(
-                {"created_at": {"$gte": thirty_days_ago.isoformat()}}
-            )
-        except Exception:
-            pass
-
-        active_emails = set()
-        try:
-            async for pred in db.predictions.find(
-                {"created_at": {"$gte": seven_days_ago.isoformat()}},
-                {"email": 1},
-            ).limit(500):
-                if "email" in pred:
-                    active_emails.add(pred["email"])
-        except Exception:
-            pass
+        from services.platform_stats import get_platform_stats as load_stats
 
-        twofa_enabled = await db.store.count_documents({"totp_verified": True})
+        snapshot = await load_stats(refresh=refresh)
+        totals = snapshot["totals"]
+        recent = snapshot["recent"]
+        total_users = totals["store"]
+        twofa_enabled = recent["twofa_enabled"]
 
         return standard_response(
             data={
                 "overview": {
                     "total_users": total_users,
-                    "total_predictions": total_predictions,
-                    "total_appointments": total_appointments,
-                    "total_medications": total_medications,
-                    "total_doctors": total_doctors,
-                    "total_files": total_files,
-                    "total_journal_entries": total_journal,
-                    "total_family_profiles": total_family,
-                    "total_reviews": total_reviews,
+                    "total_predictions": totals["predictions"],
+                    "total_appointments": totals["appointments"],
+                    "total_medications": totals["medications"],
+                    "total_doctors": totals["doctors"],
+                    "total_files": totals["files"],
+                    "total_journal_entries": totals["journal_entries"],
+                    "total_family_profiles": totals["family_profiles"],
+                    "total_reviews": totals["doctor_reviews"],
                 },
                 "recent_activity": {
-                    "new_users_30d": recent_users,
-                    "predictions_30d": recent_predictions,
-                    "appointments_30d": recent_appointments,
-                    "active_users_7d": len(active_emails),
+                    "new_users_30d": recent["new_users_30d"],
+                    "predictions_30d": recent["predictions_30d"],
+                    "appointments_30d": recent["appointments_30d"],
+                    "active_users_7d": recent["active_users_7d"],
                 },
                 "security": {
                     "twofa_enabled": twofa_enabled,
@@ -109,6 +76,7 @@ async def get_platform_stats(request: Request):
                         1,
                     ),
                 },
+                "computed_at": snapshot["computed_at"],
             },
             message="Platform statistics retrieved",
         )
@@ -119,58 +87,204 @@ async def get_platform_stats(request: Request):
         raise HTTPException(status_code=500, detail="Failed to get platform statistics")
 
 
+USER_PROJECTION = {"password": 0, "totp_secret": 0, "recovery_codes": 0}
+# user_stats fields shown in the listing, nested under "stats"
+_LISTING_STATS = ("counts", "last_active_at", "reconciled_at")
+
+
+def _stats_fields(prefix: str) -> dict:
+    return {field: f"${prefix}{field}" for field in _LISTING_STATS}
+
+
+def _user_search(search: Optional[str], prefix: str = "") -> dict:
+    if not search:
+        return {}
+    return {
+        "$or": [
+            {f"{prefix}email": {"$regex": search, "$options": "i"}},
+            {f"{prefix}name": {"$regex": search, "$options": "i"}},
+        ]
+    }
+
+
+def _by_signup_pipeline(search, limit: int, after) -> list:
+    """Newest accounts first; each row looks up its user_stats document"""
+    match = _user_search(search)
+    if after:
+        match = {"$and": [match, keyset_filter("created_at", -1, *after)]}
+    return [
+        {"$match": match},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": USER_PROJECTION},
+        {
+            "$lookup": {
+                "from": "user_stats",
+                "localField": "email",
+                "foreignField": "_id",
+                "as": "stats",
+            }
+        },
+        {"$set": {"stats": {"$arrayElemAt": ["$stats", 0]}}},
+        {"$set": {"stats": _stats_fields("stats.")}},
+    ]
+
+
+def _by_activity_pipeline(limit: int, after) -> list:
+    """
+    Most recently active first, read from user_stats in (last_active_at, _id)
+    index order; each row looks up its account. The limit comes after the
+    lookup so stats of deleted users can't shorten a page, and the pipeline
+    streams, so only about one page of lookups runs. Only complete once every
+    account has a user_stats document (see all_users_have_stats).
+    """
+    pipeline = []
+    if after:
+        pipeline.append({"$match": keyset_filter("last_active_at", -1, *after)})
+    pipeline += [
+        {"$sort": {"last_active_at": -1, "_id": -1}},
+        {
+            "$lookup": {
+                "from": "store",
+                "localField": "_id",
+                "foreignField": "email",
+                "as": "user",
+            }
+        },
+        {"$unwind": "$user"},
+        {"$limit": limit + 1},
+        {
+            "$replaceRoot": {
+                "newRoot": {"$mergeObjects": ["$user", {"stats": _stats_fields("")}]}
+            }
+        },
+        {"$project": USER_PROJECTION},
+    ]
+    return pipeline
+
+
+def _by_activity_from_store_pipeline(search, limit: int, after) -> list:
+    """
+    Most recently active first among the accounts matching `search` (all of
+    them if none): the search narrows `store` before any user_stats lookup,
+    and accounts without stats sort last. Sorts the matched set in memory,
+    so it serves searches and databases not yet fully reconciled.
+    """
+    pipeline = [
+        {"$match": _user_search(search)},
+        {"$project": USER_PROJECTION},
+        {
+            "$lookup": {
+                "from": "user_stats",
+                "localField": "email",
+                "foreignField": "_id",
+                "as": "stats",
+            }
+        },
+        {"$set": {"stats": {"$arrayElemAt": ["$stats", 0]}}},
+        {"$set": {"last_active_at": "$stats.last_active_at"}},
+    ]
+    if after:
+        pipeline.append(
+            {"$match": keyset_filter("last_active_at", -1, *after, id_field="email")}
+        )
+    pipeline += [
+        {"$sort": {"last_active_at": -1, "email": -1}},
+        {"$limit": limit + 1},
+        {"$set": {"stats": _stats_fields("stats.")}},
+        {"$unset": "last_active_at"},
+    ]
+    return pipeline
+
+
+async def load_user_page(
+    search: Optional[str] = None,
+    sort_by: str = "created_at",
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of users with their prediction/appointment counts, built by a
+    single aggregation whatever the page size. Users whose stats were never
+    reconciled are rebuilt together in one batch.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if sort_by == "activity":
+        from services.user_stats import all_users_have_stats
+
+        if search or not await all_users_have_stats():
+            pipeline = _by_activity_from_store_pipeline(search, limit, after)
+            collection = db.store
+        else:
+            pipeline = _by_activity_pipeline(limit, after)
+            collection = db.user_stats
+    else:
+        pipeline = _by_signup_pipeline(search, limit, after)
+        collection = db.store
+    # One batch holds the whole page, so no getMore round trips either
+    rows = await collection.aggregate(pipeline, batchSize=limit + 1).to_list(
+        length=limit + 1
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if sort_by == "activity":
+            next_cursor = encode_cursor(
+                last["stats"].get("last_active_at"), last["email"]
+            )
+        else:
+            next_cursor = encode_cursor(last.get("created_at"), last["_id"])
+
+    unreconciled = [
+        row.get("email", "")
+        for row in rows
+        if not row.get("stats", {}).get("reconciled_at")
+    ]
+    if unreconciled:
+        from services.user_stats import get_many_user_stats
+
+        rebuilt = await get_many_user_stats(unreconciled)
+        for row in rows:
+            if row.get("email", "") in rebuilt:
+                row["stats"] = rebuilt[row["email"]]
+
+    users = []
+    for row in rows:
+        stats = row.pop("stats", None) or {}
+        counts = stats.get("counts") or {}
+        user_data = serialize_doc(row)
+        user_data["prediction_count"] = max(counts.get("predictions", 0), 0)
+        user_data["appointment_count"] = max(counts.get("appointments", 0), 0)
+        user_data["last_active_at"] = stats.get("last_active_at")
+        users.append(user_data)
+    return users, next_cursor
+
+
 @router.get("/users")
 async def get_users(
     request: Request,
-    limit: int = Query(default=50, ge=1, le=200),
-    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None),
     search: str = Query(default=None),
+    sort_by: str = Query(default="created_at", pattern="^(created_at|activity)$"),
 ):
-    """Get user list with basic info"""
+    """Get user list with basic info (newest or most recently active first)"""
     try:
         email = await require_auth(request)
         _require_admin(email)
 
-        query = {}
-        if search:
-            query["$or"] = [
-                {"email": {"$regex": search, "$options": "i"}},
-                {"name": {"$regex": search, "$options": "i"}},
-            ]
-
-        total = await db.store.count_documents(query)
-        cursor = (
-            db.store.find(
-                query,
-                {
-                    "password": 0,
-                    "totp_secret": 0,
-                    "recovery_codes": 0,
-                },
-            )
-            .sort("created_at", -1)
-            .skip(skip)
-            .limit(limit)
-        )
-
-        users = []
-        async for user in cursor:
-            user_data = serialize_doc(user)
-            user_email = user_data.get("email", "")
-            user_data["prediction_count"] = await db.predictions.count_documents(
-                {"email": user_email}
-            )
-            user_data["appointment_count"] = await db.appointments.count_documents(
-                {"email": user_email}
-            )
-            users.append(user_data)
+        total = await db.store.count_documents(_user_search(search))
+        users, next_cursor = await load_user_page(search, sort_by, limit, cursor)
 
         return standard_response(
             data={
                 "users": users,
                 "total": total,
                 "limit": limit,
-                "skip": skip,
+                "sort_by": sort_by,
+                "next_cursor": next_cursor,
             },
             message=f"Found {total} users",
         )
@@ -193,29 +307,20 @@ async def get_user_detail(request: Request, user_id: str):
         except InvalidId:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
-        user = await db.store.find_one(
-            {"_id": oid},
-            {"password": 0, "totp_secret": 0, "recovery_codes": 0},
-        )
+        user = await db.store.find_one({"_id": oid}, USER_PROJECTION)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         user_data = serialize_doc(user)
         user_email = user_data.get("email", "")
 
+        from services.user_stats import get_user_stats
+
+        stats = await get_user_stats(user_email)
         user_data["stats"] = {
-            "predictions": await db.predictions.count_documents({"email": user_email}),
-            "appointments": await db.appointments.count_documents(
-                {"email": user_email}
-            ),
-            "medications": await db.medications.count_documents({"email": user_email}),
-            "files": await db.files.count_documents({"email": user_email}),
-            "journal_entries": await db.journal_entries.count_documents(
-                {"email": user_email}
-            ),
-            "family_profiles": await db.family_profiles.count_documents(
-                {"owner_email": user_email}
-            ),
+            **stats["counts"],
+            "most_common_prediction": stats["most_common_prediction"],
+            "last_active_at": stats["last_active_at"],
         }
 
         return standard_response(data=user_data, message="User details retrieved")
@@ -250,7 +355,7 @@ async def delete_user(request: Request, user_id: str):
 
         await db.store.delete_one({"_id": oid})
         await db.predictions.delete_many({"email": user_email})
-        await db.appointments.delete_many({"email": user_email})
+        await db.appointments.delete_many({"user_email": user_email})
         await db.medications.delete_many({"email": user_email})
         await db.medication_logs.delete_many({"email": user_email})
         await db.files.delete_many({"email": user_email})
@@ -258,9 +363,22 @@ async def delete_user(request: Request, user_id: str):
         await db.family_profiles.delete_many({"owner_email": user_email})
         await db.notifications.delete_many({"email": user_email})
         await db.chat_history.delete_many({"email": user_email})
+        await db.chat_summaries.delete_many({"email": user_email})
         await db.health_plans.delete_many({"email": user_email})
         await db.doctor_reviews.delete_many({"email": user_email})
 
+        from services.activity_feed import delete_user_activity
+        from services.user_context import invalidate_user_context
+        from services.chat_memory import forget_user
+        from services.similar_cases import forget_user_cases
+        from services.user_stats import delete_user_stats
+
+        invalidate_user_context(user_email)
+        forget_user(user_email)
+        forget_user_cases(user_email)
+        await delete_user_stats(user_email)
+        await delete_user_activity(user_email)
+
         logger.info(f"Admin deleted user: {user_email}")
 
         return standard_response(
@@ -289,30 +407,46 @@ async def get_system_health(request: Request):
 
         from services.ml_service import are_models_loaded
         from services.gemini_service import is_gemini_available
+        from services.gemini_metrics import get_metrics_summary
+        from services.user_context import get_user_context_stats
+        from services.write_behind import get_write_behind_stats
+        from services.chat_memory import get_chat_memory_stats
+        from services.emergency_detector import get_emergency_stats
+        from services.symptom_normalizer import get_symptom_normalizer_stats
+        from services.symptom_suggest import get_symptom_suggest_stats
+        from services.similar_cases import get_similar_cases_stats
+        from services.user_stats import get_user_stats_service_stats
+        from services.activity_feed import get_activity_feed_stats
+        from services.rollups import get_rollup_stats
+
+        from services.platform_stats import (
+            get_platform_stats as load_stats,
+            get_platform_stats_service_stats,
+        )
 
-        collections = {
-            "users": await db.store.count_documents({}),
-            "predictions": await db.predictions.count_documents({}),
-            "appointments": await db.appointments.count_documents({}),
-            "medications": await db.medications.count_documents({}),
-            "medication_logs": await db.medication_logs.count_documents({}),
-            "files": await db.files.count_documents({}),
-            "journal_entries": await db.journal_entries.count_documents({}),
-            "family_profiles": await db.family_profiles.count_documents({}),
-            "notifications": await db.notifications.count_documents({}),
-            "doctors": await db.doctors.count_documents({}),
-            "doctor_reviews": await db.doctor_reviews.count_documents({}),
-            "chat_history": await db.chat_history.count_documents({}),
-            "health_plans": await db.health_plans.count_documents({}),
-        }
+        snapshot = await load_stats()
+        collections = snapshot["collections"]
 
         return standard_response(
             data={
                 "database": "connected" if db_healthy else "disconnected",
                 "ml_models": "loaded" if are_models_loaded() else "not loaded",
                 "gemini": "enabled" if is_gemini_available() else "disabled",
+                "gemini_metrics": get_metrics_summary(),
+                "user_context_cache": get_user_context_stats(),
+                "write_behind": get_write_behind_stats(),
+                "chat_memory": get_chat_memory_stats(),
+                "emergency_detector": get_emergency_stats(),
+                "symptom_normalizer": get_symptom_normalizer_stats(),
+                "symptom_suggest": get_symptom_suggest_stats(),
+                "similar_cases": get_similar_cases_stats(),
+                "user_stats": get_user_stats_service_stats(),
+                "platform_stats": get_platform_stats_service_stats(),
+                "activity_feed": get_activity_feed_stats(),
+                "rollups": get_rollup_stats(),
                 "collections": collections,
                 "total_documents": sum(collections.values()),
+                "collections_computed_at": snapshot["computed_at"],
                 "timestamp": datetime.utcnow().isoformat(),
             },
             message="System health retrieved",
@@ -324,61 +458,231 @@ async def get_system_health(request: Request):
         raise HTTPException(status_code=500, detail="Failed to get system health")
 
 
-@router.get("/activity")
-async def get_recent_activity(
+@router.get("/gemini/tasks")
+async def get_gemini_task_usage(request: Request):
+    """Gemini routing table with observed per-task latency and token usage"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.gemini_service import get_task_usage_stats, GEMINI_TASK_ROUTES
+
+        return standard_response(
+            data={"routes": GEMINI_TASK_ROUTES, "usage": get_task_usage_stats()},
+            message="Gemini task usage retrieved",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting Gemini task usage: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to get Gemini task usage")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics(request: Request):
+    """Gemini metrics in Prometheus text format (scrape with an admin bearer token)"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.gemini_metrics import render_prometheus
+
+        return PlainTextResponse(
+            render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to render metrics")
+
+
+@router.get("/symptoms/combinations")
+async def get_symptom_combination_stats(
     request: Request,
-    limit: int = Query(default=20, ge=1, le=100),
+    all_of: List[str] = Query(default=[]),
+    any_of: List[str] = Query(default=[]),
+    none_of: List[str] = Query(default=[]),
+    days: Optional[int] = Query(default=None, ge=1, le=3650),
+    limit: int = Query(default=50, ge=1, le=500),
 ):
-    """Get recent platform activity feed"""
+    """Predictions/users whose reported symptoms match a combination (bitset query)"""
     try:
         email = await require_auth(request)
         _require_admin(email)
 
-        activities = []
-
-        async for pred in db.predictions.find().sort("created_at", -1).limit(limit):
-            activities.append(
-                {
-                    "type": "prediction",
-                    "email": pred.get("email", "unknown"),
-                    "description": f"Disease prediction: {pred.get('ml_prediction', 'N/A')}",
-                    "date": pred.get("created_at", ""),
-                    "icon": "stethoscope",
-                }
-            )
+        if not (all_of or any_of or none_of):
+            raise HTTPException(status_code=400, detail="Specify at least one symptom")
 
-        async for appt in db.appointments.find().sort("created_at", -1).limit(limit):
-            activities.append(
-                {
-                    "type": "appointment",
-                    "email": appt.get("email", "unknown"),
-                    "description": f"Appointment with {appt.get('doctorName', 'N/A')}",
-                    "date": appt.get("created_at", ""),
-                    "icon": "calendar",
-                }
+        from services.symptom_bits import symptom_combination_stats
+
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        try:
+            stats = await symptom_combination_stats(
+                all_of, any_of, none_of, since=since, user_limit=limit
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        for user in stats["top_users"]:
+            if isinstance(user.get("last_reported"), datetime):
+                user["last_reported"] = user["last_reported"].isoformat()
+        return standard_response(
+            data={"all_of": all_of, "any_of": any_of, "none_of": none_of, **stats},
+            message="Symptom combination stats retrieved",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting symptom combination stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to get symptom stats")
+
+
+@router.post("/migrations/symptom-bits")
+async def run_symptom_bits_backfill(request: Request):
+    """Add symptom_bits to predictions stored before bitsets existed"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.symptom_bits import backfill_symptom_bits
+
+        try:
+            result = await backfill_symptom_bits()
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return standard_response(data=result, message="Symptom bitset backfill done")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Symptom bitset backfill failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Symptom bitset backfill failed")
+
+
+@router.post("/user-stats/reconcile")
+async def run_user_stats_reconciliation(
+    request: Request, user_email: Optional[str] = Query(default=None)
+):
+    """Recompute per-user stats from the source collections (one user or all)"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.user_stats import reconcile_user, reconcile_user_stats
 
-        async for user in db.store.find().sort("created_at", -1).limit(limit):
-            activities.append(
-                {
-                    "type": "signup",
-                    "email": user.get("email", "unknown"),
-                    "description": f"New user registered: {user.get('name', user.get('email', 'N/A'))}",
-                    "date": user.get("created_at", ""),
-                    "icon": "user-plus",
-                }
+        if user_email:
+            doc = await reconcile_user(user_email)
+            result = {"users": 1, "counts": doc["counts"]}
+        else:
+            result = await reconcile_user_stats()
+        return standard_response(data=result, message="User stats reconciled")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"User stats reconciliation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="User stats reconciliation failed")
+
+
+@router.get("/trends/{metric}")
+async def get_trend(
+    request: Request,
+    metric: str,
+    days: int = Query(default=30, ge=1, le=730),
+    granularity: str = Query(default="day", pattern="^(day|week)$"),
+    dimension: Optional[str] = Query(default=None),
+    city: Optional[str] = Query(default=None, description="Diseases within a city"),
+    top: int = Query(default=10, ge=1, le=100),
+):
+    """Daily/weekly trend of a metric from the pre-aggregated daily rollups"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.rollups import METRICS, get_trend as load_trend
+
+        if metric not in METRICS:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Unknown metric; choose from {', '.join(METRICS)}",
             )
+        try:
+            trend = await load_trend(metric, days, granularity, dimension, city, top)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return standard_response(data=trend, message="Trend retrieved")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting {metric} trend: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to get trend")
+
+
+@router.post("/rollups/rebuild")
+async def run_rollup_rebuild(
+    request: Request, days: int = Query(default=30, ge=1, le=730)
+):
+    """Recompute the daily rollups of the last `days` completed days"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.rollups import rebuild_rollups
+
+        result = await rebuild_rollups(days)
+        return standard_response(data=result, message="Rollups rebuilt")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Rollup rebuild failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Rollup rebuild failed")
+
+
+@router.post("/migrations/activity-events")
+async def run_activity_events_backfill(request: Request):
+    """Create feed events for records stored before the activity feed existed"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
+
+        from services.activity_feed import backfill_activity_events
+
+        result = await backfill_activity_events()
+        return standard_response(data=result, message="Activity event backfill done")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Activity event backfill failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Activity event backfill failed")
+
+
+@router.get("/activity")
+async def get_recent_activity(
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    """Get recent platform activity feed"""
+    try:
+        email = await require_auth(request)
+        _require_admin(email)
 
-        def _sort_key(item):
-            d = item.get("date", "")
-            if isinstance(d, datetime):
-                return d.isoformat()
-            return str(d)
+        from services.activity_feed import recent_activity
 
-        activities.sort(key=_sort_key, reverse=True)
+        activities = [
+            {
+                "type": event["type"],
+                "email": event.get("email", "unknown"),
+                "description": event.get("summary", ""),
+                "date": event.get("created_at", ""),
+                # Signups have no timeline entry to take the icon from
+                "icon": (event.get("event") or {}).get("icon", "user-plus"),
+            }
+            for event in await recent_activity(limit)
+        ]
 
         return standard_response(
-            data={"activities": activities[:limit]},
+            data={"activities": activities},
             message="Recent activity retrieved",
         )
     except HTTPException:
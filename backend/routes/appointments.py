@@ -3,19 +3,24 @@ Appointments Routes
 File Path: routes/appointments.py
 """
 
-from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Depends, Query
 from database.models import AppointmentRequest
 from database.connection import db
 
 # ✅ FIX: Use the new Auth system
 from services.auth_service import get_current_user
+from services.user_stats import record_created, record_deleted
+from services.activity_feed import record_activity, remove_activity
+from services.rollups import appointment_counters, record_rollup
 from utils.helpers import standard_response
+from utils.pagination import MAX_LIMIT, paginate
 
 # ✅ FIX: Import email service safely
 from services.email_service import send_appointment_confirmation, send_email
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,6 +49,15 @@ async def book_appointment(
 
         result = await db.appointments.insert_one(appointment_data)
         appointment_id = str(result.inserted_id)
+        await record_created(
+            current_user["email"], "appointments", appointment_data["created_at"]
+        )
+        await record_activity("appointment", appointment_data)
+        await record_rollup(
+            "appointments",
+            appointment_data["created_at"],
+            appointment_counters(appointment_data),
+        )
 
         # ✅ FIX: Safe Email Sending (Wrapped in try/except)
         try:
@@ -77,13 +91,21 @@ async def book_appointment(
 
 
 @router.get("")
-async def get_appointments(current_user: dict = Depends(get_current_user)):
+async def get_appointments(
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    current_user: dict = Depends(get_current_user),
+):
     """Get user's appointments"""
     try:
-        cursor = db.appointments.find({"user_email": current_user["email"]}).sort(
-            "created_at", -1
+        appointments, next_cursor = await paginate(
+            db.appointments,
+            {"user_email": current_user["email"]},
+            "created_at",
+            -1,
+            limit,
+            cursor,
         )
-        appointments = await cursor.to_list(length=100)
 
         # Convert ObjectId to string for Frontend
         for apt in appointments:
@@ -94,9 +116,15 @@ async def get_appointments(current_user: dict = Depends(get_current_user)):
 
         return standard_response(
             message="Appointments retrieved successfully",
-            data={"appointments": appointments, "count": len(appointments)},
+            data={
+                "appointments": appointments,
+                "count": len(appointments),
+                "next_cursor": next_cursor,
+            },
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get appointments error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get appointments")
@@ -122,6 +150,15 @@ async def cancel_appointment(
 
         if not appointment:
             raise HTTPException(status_code=404, detail="Appointment not found")
+        await record_deleted(current_user["email"], "appointments")
+        await remove_activity(oid)
+        if isinstance(appointment.get("created_at"), datetime):
+            await record_rollup(
+                "appointments",
+                appointment["created_at"],
+                appointment_counters(appointment),
+                sign=-1,
+            )
 
         # Send cancellation email (using internal function below)
         try:
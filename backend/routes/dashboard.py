@@ -6,73 +6,107 @@ from fastapi import APIRouter, HTTPException, Request
 from database.connection import db
 from utils.security import require_auth
 from utils.helpers import standard_response
+from services.user_stats import get_user_stats
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import asyncio
 import logging
 
-
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/health", tags=["Dashboard"])
 
 
+# Rows shown in the recent predictions / upcoming appointments cards
+RECENT_LIMIT = 5
+ACTIVITY_WINDOW_DAYS = 30
+
+
+def recent_predictions_cursor(email: str):
+    """Newest predictions first; served by the (email, created_at, _id) index"""
+    return (
+        db.predictions.find({"email": email}, {"symptom_bits": 0})
+        .sort("created_at", -1)
+        .limit(RECENT_LIMIT)
+    )
+
+
+def upcoming_appointments_cursor(email: str):
+    """Soonest appointments first; served by the (user_email, date) index"""
+    # Use both string and datetime comparison for compatibility with mixed storage formats
+    today_str = datetime.utcnow().strftime("%Y-%m-%d")
+    today_dt = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (
+        db.appointments.find(
+            {
+                "user_email": email,
+                "$or": [
+                    {"date": {"$gte": today_str, "$type": "string"}},
+                    {"date": {"$gte": today_dt, "$type": "date"}},
+                ],
+            }
+        )
+        .sort("date", 1)
+        .limit(RECENT_LIMIT)
+    )
+
+
+async def _prediction_summary(email: str, since: datetime) -> dict:
+    """Recent predictions and the recent-activity count (index-only count)"""
+    recent, recent_count = await asyncio.gather(
+        recent_predictions_cursor(email).to_list(length=RECENT_LIMIT),
+        db.predictions.count_documents({"email": email, "created_at": {"$gte": since}}),
+    )
+    return {"recent": recent, "recent_count": recent_count}
+
+
+async def _appointment_summary(email: str, since: datetime) -> dict:
+    """Upcoming appointments and the recent-activity count (index-only count)"""
+    upcoming, recent_count = await asyncio.gather(
+        upcoming_appointments_cursor(email).to_list(length=RECENT_LIMIT),
+        db.appointments.count_documents(
+            {"user_email": email, "created_at": {"$gte": since}}
+        ),
+    )
+    return {"upcoming": upcoming, "recent_count": recent_count}
+
+
+async def load_dashboard_data(
+    email: str,
+) -> Tuple[Optional[dict], dict, dict, dict]:
+    """(user, user stats, prediction summary, appointment summary), fetched concurrently"""
+    since = datetime.utcnow() - timedelta(days=ACTIVITY_WINDOW_DAYS)
+    user, stats, predictions, appointments = await asyncio.gather(
+        db.store.find_one({"email": email}),
+        get_user_stats(email),
+        _prediction_summary(email, since),
+        _appointment_summary(email, since),
+    )
+    return user, stats, predictions, appointments
+
+
 @router.get("/dashboard")
 async def get_dashboard(request: Request):
     """Get comprehensive health dashboard data"""
     try:
         email = await require_auth(request)
 
-        # Get user data
-        user = await db.store.find_one({"email": email})
+        user, stats, predictions, appointments = await load_dashboard_data(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Get recent predictions (last 5)
-        predictions_cursor = (
-            db.predictions.find({"email": email}).sort("created_at", -1).limit(5)
-        )
-        recent_predictions = await predictions_cursor.to_list(length=5)
-
+        recent_predictions = predictions["recent"]
         for pred in recent_predictions:
             pred["_id"] = str(pred["_id"])
             if isinstance(pred.get("created_at"), datetime):
                 pred["created_at"] = pred["created_at"].isoformat()
 
-        # Get upcoming appointments (only future appointments)
-        # Use both string and datetime comparison for compatibility with mixed storage formats
-        today_str = datetime.utcnow().strftime("%Y-%m-%d")
-        today_dt = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        appointments_cursor = (
-            db.appointments.find(
-                {
-                    "user_email": email,
-                    "$or": [
-                        {"date": {"$gte": today_str, "$type": "string"}},
-                        {"date": {"$gte": today_dt, "$type": "date"}},
-                    ],
-                }
-            )
-            .sort("date", 1)
-            .limit(5)
-        )
-        upcoming_appointments = await appointments_cursor.to_list(length=5)
-
+        upcoming_appointments = appointments["upcoming"]
         for apt in upcoming_appointments:
             apt["_id"] = str(apt["_id"])
 
-        # Get statistics
-        total_predictions = await db.predictions.count_documents({"email": email})
-        total_appointments = await db.appointments.count_documents(
-            {"user_email": email}
-        )
-
-        # Get most common health issue
-        pipeline = [
-            {"$match": {"email": email}},
-            {"$group": {"_id": "$ml_prediction", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 1},
-        ]
-        common_issues = await db.predictions.aggregate(pipeline).to_list(1)
-        most_common_issue = common_issues[0]["_id"] if common_issues else None
+        total_predictions = stats["counts"]["predictions"]
+        total_appointments = stats["counts"]["appointments"]
+        most_common_issue = stats["most_common_prediction"]
 
         # Health metrics
         health_metrics = {
@@ -90,15 +124,6 @@ async def get_dashboard(request: Request):
         # Get health status
         health_status = get_health_status(health_score)
 
-        # Recent activity (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_predictions_count = await db.predictions.count_documents(
-            {"email": email, "created_at": {"$gte": thirty_days_ago}}
-        )
-        recent_appointments_count = await db.appointments.count_documents(
-            {"user_email": email, "created_at": {"$gte": thirty_days_ago}}
-        )
-
         return standard_response(
             message="Dashboard data retrieved successfully",
             data={
@@ -124,8 +149,8 @@ async def get_dashboard(request: Request):
                     "total_predictions": total_predictions,
                     "total_appointments": total_appointments,
                     "most_common_issue": most_common_issue,
-                    "predictions_last_30_days": recent_predictions_count,
-                    "appointments_last_30_days": recent_appointments_count,
+                    "predictions_last_30_days": predictions["recent_count"],
+                    "appointments_last_30_days": appointments["recent_count"],
                 },
             },
         )
@@ -9,6 +9,7 @@ from database.models import DoctorCreate, DoctorReviewCreate
 from database.connection import db, get_user_by_email
 from utils.security import require_auth
 from utils.helpers import standard_response, serialize_doc
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime
@@ -57,8 +58,8 @@ async def list_doctors(
     search: Optional[str] = Query(None, description="Search by name"),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
     sort_by: str = Query("avg_rating", pattern="^(avg_rating|name|review_count)$"),
-    limit: int = Query(50, ge=1, le=200),
-    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
 ):
     """List doctors with filters"""
     try:
@@ -74,10 +75,9 @@ async def list_doctors(
             query["avg_rating"] = {"$gte": min_rating}
 
         sort_direction = -1 if sort_by in ("avg_rating", "review_count") else 1
-        cursor = (
-            db.doctors.find(query).sort(sort_by, sort_direction).skip(skip).limit(limit)
+        doctors, next_cursor = await paginate(
+            db.doctors, query, sort_by, sort_direction, limit, cursor
         )
-        doctors = await cursor.to_list(length=limit)
 
         total = await db.doctors.count_documents(query)
 
@@ -90,9 +90,11 @@ async def list_doctors(
                 "doctors": doctors,
                 "total": total,
                 "limit": limit,
-                "skip": skip,
+                "next_cursor": next_cursor,
             },
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"List doctors error: {e}")
         raise HTTPException(status_code=500, detail="Failed to list doctors")
@@ -13,6 +13,7 @@ import logging
 
 from database.connection import db, get_user_by_email
 from utils.security import require_auth
+from services.user_stats import get_user_stats
 from utils.helpers import serialize_date, safe_str, standard_response
 
 router = APIRouter(prefix="/export", tags=["Export"])
@@ -73,7 +74,7 @@ async def export_csv(request: Request, data_type: str, days: int = 90):
                         safe_str(
                             doc.get("ml_prediction", {}).get("confidence")
                             if isinstance(doc.get("ml_prediction"), dict)
-                            else ""
+                            else doc.get("confidence", "")
                         ),
                         safe_str(doc.get("specialist")),
                         safe_str(doc.get("description")),
@@ -84,7 +85,7 @@ async def export_csv(request: Request, data_type: str, days: int = 90):
             writer.writerow(
                 ["Date", "Time", "Doctor Name", "Specialization", "Location", "Status"]
             )
-            cursor = db.appointments.find({"email": email}).sort("date", -1)
+            cursor = db.appointments.find({"user_email": email}).sort("date", -1)
             async for doc in cursor:
                 writer.writerow(
                     [
@@ -277,7 +278,7 @@ async def export_fhir(request: Request, days: int = 90):
             )
 
         # Appointments as Encounter resources
-        cursor = db.appointments.find({"email": email}).sort("date", -1)
+        cursor = db.appointments.find({"user_email": email}).sort("date", -1)
         async for doc in cursor:
             appt_id = str(doc["_id"])
             status_map = {
@@ -480,12 +481,14 @@ async def export_summary(request: Request, days: int = 90):
         predictions_count = await db.predictions.count_documents(
             {"email": email, "created_at": {"$gte": cutoff}}
         )
-        appointments_count = await db.appointments.count_documents({"email": email})
-        medications_count = await db.medications.count_documents({"email": email})
         journal_count = await db.journal_entries.count_documents(
             {"email": email, "created_at": {"$gte": cutoff}}
         )
-        family_count = await db.family_profiles.count_documents({"owner_email": email})
+        # Appointments, medications and family profiles are exported in full
+        counts = (await get_user_stats(email))["counts"]
+        appointments_count = counts["appointments"]
+        medications_count = counts["medications"]
+        family_count = counts["family_profiles"]
 
         return standard_response(
             message="Export summary",
@@ -8,6 +8,7 @@ from database.connection import db
 from database.models import FamilyProfileCreate, FamilyProfileUpdate
 from utils.security import require_auth
 from utils.helpers import standard_response, serialize_doc
+from services.user_stats import record_created, record_deleted
 from bson import ObjectId
 from datetime import datetime
 import logging
@@ -47,6 +48,7 @@ async def create_family_profile(profile: FamilyProfileCreate, request: Request):
         }
 
         result = await db.family_profiles.insert_one(doc)
+        await record_created(email, "family_profiles")
         doc["_id"] = str(result.inserted_id)
 
         return standard_response(True, "Family profile created", {"profile": doc})
@@ -159,6 +161,7 @@ async def delete_family_profile(profile_id: str, request: Request):
 
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Family profile not found")
+        await record_deleted(email, "family_profiles")
 
         return standard_response(True, "Family profile deleted")
 
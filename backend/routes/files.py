@@ -2,16 +2,19 @@
 File Upload Routes
 """
 
-from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Query
 from fastapi.responses import FileResponse
 from database.connection import db
 from utils.security import require_auth
 from bson import ObjectId
 from bson.errors import InvalidId
 from utils.helpers import standard_response, allowed_file
+from utils.pagination import MAX_LIMIT, paginate
 from config.settings import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
 from services.gemini_service import process_medical_report  # ✅ ADD THIS
+from services.user_stats import record_created, record_deleted
 from datetime import datetime
+from typing import Optional
 import logging
 import aiofiles
 import os
@@ -73,6 +76,7 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
 
         result = await db.files.insert_one(file_data)
         file_id = str(result.inserted_id)
+        await record_created(email, "files", file_data["uploaded_at"])
 
         # ✅ AUTO-ANALYZE medical reports
         if file.content_type in [
@@ -165,14 +169,19 @@ async def get_health_metrics_history(request: Request):
 
 
 @router.get("")
-async def get_files(request: Request):
+async def get_files(
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+):
     """Get user's uploaded files"""
     try:
         email = await require_auth(request)
 
         # Get files
-        cursor = db.files.find({"email": email}).sort("uploaded_at", -1)
-        files = await cursor.to_list(length=100)
+        files, next_cursor = await paginate(
+            db.files, {"email": email}, "uploaded_at", -1, limit, cursor
+        )
 
         # Convert ObjectId and format data
         for f in files:
@@ -181,7 +190,7 @@ async def get_files(request: Request):
 
         return standard_response(
             message="Files retrieved successfully",
-            data={"files": files, "count": len(files)},
+            data={"files": files, "count": len(files), "next_cursor": next_cursor},
         )
 
     except HTTPException:
@@ -306,7 +315,8 @@ async def delete_file(request: Request, file_id: str):
             file_path.unlink()
 
         # Delete from database
-        await db.files.delete_one({"_id": oid})
+        result = await db.files.delete_one({"_id": oid})
+        await record_deleted(email, "files", result.deleted_count)
 
         logger.info(f"🗑️ File deleted: {file_doc['filename']}")
 
@@ -1,142 +1,14 @@
 from fastapi import APIRouter, HTTPException, Request
-from database.connection import db, get_user_by_email
 from utils.security import require_auth
 from utils.helpers import standard_response
-from datetime import datetime, timedelta
+from services.badges import BADGES, badge_progress, streak_weeks
+from services.user_stats import get_user_stats
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/gamification", tags=["Gamification"])
 
-BADGES = [
-    {
-        "id": "first_prediction",
-        "name": "First Step",
-        "description": "Made your first disease prediction",
-        "icon": "🔬",
-        "threshold": 1,
-        "collection": "predictions",
-        "field": "email",
-    },
-    {
-        "id": "prediction_5",
-        "name": "Health Detective",
-        "description": "Made 5 disease predictions",
-        "icon": "🕵️",
-        "threshold": 5,
-        "collection": "predictions",
-        "field": "email",
-    },
-    {
-        "id": "prediction_20",
-        "name": "Prediction Pro",
-        "description": "Made 20 disease predictions",
-        "icon": "🏆",
-        "threshold": 20,
-        "collection": "predictions",
-        "field": "email",
-    },
-    {
-        "id": "first_appointment",
-        "name": "Doctor Visit",
-        "description": "Booked your first appointment",
-        "icon": "📅",
-        "threshold": 1,
-        "collection": "appointments",
-        "field": "user_email",
-    },
-    {
-        "id": "appointment_5",
-        "name": "Regular Patient",
-        "description": "Booked 5 appointments",
-        "icon": "⭐",
-        "threshold": 5,
-        "collection": "appointments",
-        "field": "user_email",
-    },
-    {
-        "id": "first_medication",
-        "name": "Pill Tracker",
-        "description": "Added your first medication",
-        "icon": "💊",
-        "threshold": 1,
-        "collection": "medications",
-        "field": "email",
-    },
-    {
-        "id": "first_journal",
-        "name": "Health Journalist",
-        "description": "Wrote your first journal entry",
-        "icon": "📝",
-        "threshold": 1,
-        "collection": "journal_entries",
-        "field": "email",
-    },
-    {
-        "id": "journal_10",
-        "name": "Diary Keeper",
-        "description": "Wrote 10 journal entries",
-        "icon": "📖",
-        "threshold": 10,
-        "collection": "journal_entries",
-        "field": "email",
-    },
-    {
-        "id": "first_report",
-        "name": "Report Card",
-        "description": "Generated your first health report",
-        "icon": "📄",
-        "threshold": 1,
-        "collection": "report_downloads",
-        "field": "email",
-    },
-    {
-        "id": "family_care",
-        "name": "Family Guardian",
-        "description": "Added a family member profile",
-        "icon": "👨‍👩‍👧‍👦",
-        "threshold": 1,
-        "collection": "family_profiles",
-        "field": "owner_email",
-    },
-    {
-        "id": "profile_complete",
-        "name": "Identity Verified",
-        "description": "Completed your health profile",
-        "icon": "✅",
-        "threshold": -1,
-        "collection": "special",
-        "field": "special",
-    },
-    {
-        "id": "week_streak_3",
-        "name": "3-Week Warrior",
-        "description": "Maintained a 3-week check-in streak",
-        "icon": "🔥",
-        "threshold": 3,
-        "collection": "special_streak",
-        "field": "special",
-    },
-    {
-        "id": "week_streak_7",
-        "name": "Monthly Champion",
-        "description": "Maintained a 7-week check-in streak",
-        "icon": "💎",
-        "threshold": 7,
-        "collection": "special_streak",
-        "field": "special",
-    },
-    {
-        "id": "med_adherence_90",
-        "name": "Discipline Master",
-        "description": "Achieved 90%+ medication adherence",
-        "icon": "🎯",
-        "threshold": 90,
-        "collection": "special_adherence",
-        "field": "special",
-    },
-]
-
 HEALTH_TIPS = [
     "Drink at least 8 glasses of water daily to stay hydrated.",
     "Take a 10-minute walk after each meal to aid digestion.",
@@ -161,94 +33,15 @@ def _get_weekly_tip():
     return HEALTH_TIPS[week_number % len(HEALTH_TIPS)]
 
 
-async def _check_profile_complete(email: str) -> bool:
-    user = await get_user_by_email(email)
-    if not user:
-        return False
-    required = ["name", "age", "gender", "height", "weight", "phone", "city"]
-    return all(user.get(f) for f in required)
-
-
-async def _calculate_streak(email: str) -> int:
-    now = datetime.utcnow()
-    streak = 0
-
-    for weeks_ago in range(52):
-        week_start = now - timedelta(weeks=weeks_ago + 1)
-        week_end = now - timedelta(weeks=weeks_ago)
-
-        has_activity = False
-
-        pred_count = await db.predictions.count_documents(
-            {"email": email, "created_at": {"$gte": week_start, "$lt": week_end}}
-        )
-        if pred_count > 0:
-            has_activity = True
-
-        if not has_activity:
-            journal_count = await db.journal_entries.count_documents(
-                {"email": email, "created_at": {"$gte": week_start, "$lt": week_end}}
-            )
-            if journal_count > 0:
-                has_activity = True
-
-        if not has_activity:
-            log_count = await db.medication_logs.count_documents(
-                {
-                    "email": email,
-                    "logged_at": {
-                        "$gte": week_start.isoformat(),
-                        "$lt": week_end.isoformat(),
-                    },
-                }
-            )
-            if log_count > 0:
-                has_activity = True
-
-        if has_activity:
-            streak += 1
-        else:
-            break
-
-    return streak
-
-
-async def _get_med_adherence(email: str) -> float:
-    thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
-    total_logs = await db.medication_logs.count_documents(
-        {"email": email, "logged_at": {"$gte": thirty_days_ago}}
-    )
-    if total_logs == 0:
-        return 0.0
-
-    taken_logs = await db.medication_logs.count_documents(
-        {"email": email, "logged_at": {"$gte": thirty_days_ago}, "skipped": False}
-    )
-    return round((taken_logs / total_logs) * 100, 1)
-
-
 @router.get("")
 async def get_gamification(request: Request):
     try:
         email = await require_auth(request)
 
-        counts = {}
-        collection_fields = set()
-        for badge in BADGES:
-            key = (badge["collection"], badge["field"])
-            if key not in collection_fields and badge["collection"] not in (
-                "special",
-                "special_streak",
-                "special_adherence",
-            ):
-                collection_fields.add(key)
-                coll = getattr(db, badge["collection"], None)
-                if coll is not None:
-                    counts[key] = await coll.count_documents({badge["field"]: email})
-
-        profile_complete = await _check_profile_complete(email)
-        streak = await _calculate_streak(email)
-        adherence = await _get_med_adherence(email)
+        stats = await get_user_stats(email)
+        counts = stats["counts"]
+        streak = streak_weeks(stats["active_weeks"])
+        adherence = stats["adherence"]
 
         earned_badges = []
         locked_badges = []
@@ -261,46 +54,26 @@ async def get_gamification(request: Request):
                 "icon": badge["icon"],
             }
 
-            earned = False
-            if badge["collection"] == "special":
-                earned = profile_complete
-            elif badge["collection"] == "special_streak":
-                earned = streak >= badge["threshold"]
-            elif badge["collection"] == "special_adherence":
-                earned = adherence >= badge["threshold"]
-            else:
-                key = (badge["collection"], badge["field"])
-                earned = counts.get(key, 0) >= badge["threshold"]
-
-            if earned:
+            earned_at = stats["badges"].get(badge["id"])
+            if earned_at:
                 badge_data["earned"] = True
+                badge_data["earned_at"] = earned_at.isoformat()
                 earned_badges.append(badge_data)
             else:
                 badge_data["earned"] = False
-                if badge["collection"] not in (
-                    "special",
-                    "special_streak",
-                    "special_adherence",
-                ):
-                    key = (badge["collection"], badge["field"])
-                    badge_data["progress"] = min(counts.get(key, 0), badge["threshold"])
-                    badge_data["threshold"] = badge["threshold"]
-                elif badge["collection"] == "special_streak":
-                    badge_data["progress"] = streak
-                    badge_data["threshold"] = badge["threshold"]
-                elif badge["collection"] == "special_adherence":
-                    badge_data["progress"] = adherence
+                if badge["source"] != "special":
+                    progress = badge_progress(badge, stats, streak)
+                    badge_data["progress"] = min(progress, badge["threshold"])
                     badge_data["threshold"] = badge["threshold"]
                 locked_badges.append(badge_data)
 
-        user = await get_user_by_email(email)
-        total_predictions = counts.get(("predictions", "email"), 0)
-        total_appointments = counts.get(("appointments", "user_email"), 0)
+        total_predictions = counts.get("predictions", 0)
+        total_appointments = counts.get("appointments", 0)
 
         from routes.dashboard import calculate_health_score, get_health_status
 
         health_score = calculate_health_score(
-            user or {}, total_predictions, total_appointments
+            stats["profile"], total_predictions, total_appointments
         )
         health_status = get_health_status(health_score)
 
@@ -2,7 +2,7 @@
 Gemini AI Routes - Updated for 2026 SDK
 """
 
-from fastapi import APIRouter, HTTPException, Request, Form
+from fastapi import APIRouter, HTTPException, Request, Form, Query
 from fastapi.responses import StreamingResponse
 from database.models import ChatRequest, DrugInteractionRequest, SymptomAnalysisRequest
 from services.gemini_service import (
@@ -13,20 +13,127 @@ from services.gemini_service import (
     gemini_personalized_health_plan,
     gemini_chat_stream,
     is_gemini_available,
+    get_context_cache_stats,
+    get_gemini_backend_name,
 )
+from services.prompt_templates import HEALTH_PLAN, template_versions
+from services.user_context import get_user_context
+from services.chat_memory import get_chat_history, record_turn
+from services.emergency_detector import detect_emergency
+from services.symptom_normalizer import extract_symptoms
+from config.settings import EMERGENCY_LLM_FOLLOWUP
 from database.connection import db
 from utils.security import require_auth, get_current_user
-from utils.helpers import standard_response
+from utils.helpers import standard_response, compute_fingerprint
 from datetime import datetime
+import asyncio
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/gemini", tags=["Gemini AI"])
 
 
+async def _add_user_context(context: dict, email: str):
+    """Personalize chat context from the cached user snapshot"""
+    user_context = await get_user_context(email)
+    if user_context["exists"]:
+        context["user_age"] = user_context["age"]
+        context["user_gender"] = user_context["gender"]
+    if user_context["recent_prediction"]:
+        context["recent_prediction"] = user_context["recent_prediction"]
+
+
+# Background LLM follow-ups for emergency short-circuits (kept referenced until done)
+_followup_tasks: set = set()
+
+
+def _start_followup(coro):
+    task = asyncio.create_task(coro)
+    _followup_tasks.add(task)
+    task.add_done_callback(_followup_tasks.discard)
+
+
+async def _emergency_chat_followup(email: str, message: str, context: dict):
+    """Let Gemini add detail after the instant emergency guidance; sent as a notification"""
+    try:
+        from routes.notifications import notify_user
+
+        await _add_user_context(context, email)
+        detail = await gemini_health_chat(message, context)
+        await notify_user(
+            email, "Follow-up on your urgent message", detail, ntype="warning"
+        )
+    except Exception as e:
+        logger.warning(f"Emergency follow-up failed: {e}")
+
+
+async def _emergency_symptom_followup(email: str, symptoms: str):
+    try:
+        from routes.notifications import notify_user
+
+        result = await gemini_symptom_checker(symptoms)
+        if result.get("analysis"):
+            await notify_user(
+                email,
+                "Follow-up on your symptom check",
+                result["analysis"],
+                ntype="warning",
+            )
+    except Exception as e:
+        logger.warning(f"Emergency symptom follow-up failed: {e}")
+
+
+# Symptoms a chat message must mention before we offer a prediction
+MIN_SUGGESTED_SYMPTOMS = 2
+
+
+def _suggested_prediction(message: str):
+    """Pre-filled /predict/disease payload when the message lists symptoms"""
+    symptoms = extract_symptoms(message)["symptoms"]
+    if len(symptoms) < MIN_SUGGESTED_SYMPTOMS:
+        return None
+    return {"symptoms": symptoms}
+
+
+def _emergency_payload(emergency: dict, followup: bool) -> dict:
+    return {
+        "emergencies": emergency["emergencies"],
+        "language": emergency["language"],
+        "followup_pending": followup,
+    }
+
+
 @router.post("/chat")
 async def health_chatbot(chat: ChatRequest, request: Request):
     """Interactive health chatbot"""
+    # 🚨 Local emergency triage first — answers instantly, even without Gemini
+    emergency = detect_emergency(chat.message)
+    if emergency["is_emergency"]:
+        email = await get_current_user(request)
+        conversation_id = chat.conversation_id or uuid.uuid4().hex
+        followup = bool(EMERGENCY_LLM_FOLLOWUP and email and is_gemini_available())
+        if email:
+            try:
+                await record_turn(
+                    email, conversation_id, chat.message, emergency["guidance"]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to store chat turn: {e}")
+        if followup:
+            _start_followup(
+                _emergency_chat_followup(email, chat.message, chat.context or {})
+            )
+        return standard_response(
+            message="Emergency guidance",
+            data={
+                "response": emergency["guidance"],
+                "emergency": _emergency_payload(emergency, followup),
+                "conversation_id": conversation_id if email else None,
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+        )
+
     if not is_gemini_available():
         raise HTTPException(status_code=503, detail="Gemini unavailable")
 
@@ -34,40 +141,29 @@ async def health_chatbot(chat: ChatRequest, request: Request):
         context = chat.context or {}
         email = await get_current_user(request)
 
-        # Add user context
+        conversation_id = chat.conversation_id or uuid.uuid4().hex
+        history = None
+
+        # Add user context (cached snapshot — no DB round trip in steady state)
         if email:
-            user_data = await db.store.find_one({"email": email})
-            if user_data:
-                context["user_age"] = user_data.get("age")
-                context["user_gender"] = user_data.get("gender")
-
-            # Get recent prediction
-            recent = await db.predictions.find_one(
-                {"email": email}, sort=[("created_at", -1)]
-            )
-            if recent:
-                context["recent_prediction"] = recent.get("ml_prediction")
+            await _add_user_context(context, email)
+            history = await get_chat_history(email, conversation_id)
 
-        response_text = await gemini_health_chat(chat.message, context)
+        response_text = await gemini_health_chat(chat.message, context, history)
 
         # Store chat history
         if email:
             try:
-                await db.chat_history.insert_one(
-                    {
-                        "email": email,
-                        "message": chat.message,
-                        "response": response_text,
-                        "created_at": datetime.utcnow(),
-                    }
-                )
-            except:
-                pass
+                await record_turn(email, conversation_id, chat.message, response_text)
+            except Exception as e:
+                logger.warning(f"Failed to store chat turn: {e}")
 
         return standard_response(
             message="Chat response generated",
             data={
                 "response": response_text,
+                "conversation_id": conversation_id if email else None,
+                "suggested_prediction": _suggested_prediction(chat.message),
                 "timestamp": datetime.utcnow().isoformat(),
             },
         )
@@ -80,23 +176,43 @@ async def health_chatbot(chat: ChatRequest, request: Request):
 @router.post("/chat/stream")
 async def health_chatbot_stream(chat: ChatRequest, request: Request):
     """Streaming chatbot - NEW 2026 SDK feature"""
-    if not is_gemini_available():
+    emergency = detect_emergency(chat.message)
+    if not emergency["is_emergency"] and not is_gemini_available():
         raise HTTPException(status_code=503, detail="Gemini unavailable")
 
     try:
         context = chat.context or {}
         email = await get_current_user(request)
 
+        conversation_id = chat.conversation_id or uuid.uuid4().hex
+        history = None
+
         if email:
-            user_data = await db.store.find_one({"email": email})
-            if user_data:
-                context["user_age"] = user_data.get("age")
+            await _add_user_context(context, email)
+            history = await get_chat_history(email, conversation_id)
 
         async def generate():
-            async for chunk in gemini_chat_stream(chat.message, context):
-                yield chunk
-
-        return StreamingResponse(generate(), media_type="text/plain")
+            chunks = []
+            stream_llm = True
+            if emergency["is_emergency"]:
+                # 🚨 Guidance goes out first; Gemini's detail (optional) follows it
+                chunks.append(emergency["guidance"] + "\n\n")
+                yield chunks[-1]
+                stream_llm = EMERGENCY_LLM_FOLLOWUP and is_gemini_available()
+            if stream_llm:
+                async for chunk in gemini_chat_stream(chat.message, context, history):
+                    chunks.append(chunk)
+                    yield chunk
+            if email and chunks:
+                try:
+                    await record_turn(
+                        email, conversation_id, chat.message, "".join(chunks)
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to store chat turn: {e}")
+
+        headers = {"X-Conversation-Id": conversation_id} if email else None
+        return StreamingResponse(generate(), media_type="text/plain", headers=headers)
 
     except Exception as e:
         logger.error(f"Stream error: {e}")
@@ -122,7 +238,21 @@ async def explain_medical_term(request: Request, term: str):
 @router.post("/symptom/analyze")
 async def analyze_symptoms(http_request: Request, request: SymptomAnalysisRequest):
     """Symptom analysis"""
-    await require_auth(http_request)
+    email = await require_auth(http_request)
+
+    # 🚨 Local emergency triage before the LLM
+    emergency = detect_emergency(request.symptoms)
+    if emergency["is_emergency"]:
+        followup = EMERGENCY_LLM_FOLLOWUP and is_gemini_available()
+        if followup:
+            _start_followup(_emergency_symptom_followup(email, request.symptoms))
+        return standard_response(
+            message="Emergency guidance",
+            data={
+                "analysis": emergency["guidance"],
+                "emergency": _emergency_payload(emergency, followup),
+            },
+        )
 
     if not is_gemini_available():
         raise HTTPException(status_code=503, detail="Gemini unavailable")
@@ -157,20 +287,22 @@ async def check_drug_interactions(
 
 
 @router.post("/health/personalized-plan")
-async def generate_health_plan(request: Request):
-    """Generate Hybrid Health Plan (Prediction + Reports)"""
-    if not is_gemini_available():
-        raise HTTPException(status_code=503, detail="Gemini unavailable")
+async def generate_health_plan(
+    request: Request,
+    force: bool = Query(False, description="Regenerate even if inputs are unchanged"),
+):
+    """Generate Hybrid Health Plan (Prediction + Reports)
 
+    Plans are memoized by a fingerprint of their inputs (condition, report
+    analysis, profile). If nothing changed since the last successful plan it is
+    returned as-is; pass ``force=true`` to regenerate anyway. A stored plan is
+    served even while Gemini is unavailable.
+    """
     email = await require_auth(request)
 
-    # 1. Fetch User Profile
-    user_data = await db.store.find_one({"email": email})
-
-    # 2. Fetch Latest Prediction (ML Model)
-    recent_pred = await db.predictions.find_one(
-        {"email": email}, sort=[("created_at", -1)]
-    )
+    # 1-2. User Profile + Latest Prediction (ML Model), from the context cache
+    user_context = await get_user_context(email)
+    recent_prediction = user_context["recent_prediction"]
 
     # 3. ✅ FETCH LATEST REPORT ANALYSIS (Your PDF Data)
     recent_report = await db.files.find_one(
@@ -182,25 +314,46 @@ async def generate_health_plan(request: Request):
     )
 
     # Check if we have enough data (Need at least one source)
-    if not recent_pred and not recent_report:
+    if not recent_prediction and not recent_report:
         raise HTTPException(
             status_code=404,
             detail="No health data found. Please run a Prediction or Upload a Report first.",
         )
 
     # Prepare Data for the AI
-    condition = recent_pred.get("ml_prediction") if recent_pred else "General Wellness"
+    condition = recent_prediction or "General Wellness"
 
     user_profile = {
-        "age": user_data.get("age", "Unknown"),
-        "gender": user_data.get("gender", "Unknown"),
-        "weight": user_data.get("weight", "Unknown"),
-        "height": user_data.get("height", "Unknown"),
+        field: user_context[field] if user_context[field] is not None else "Unknown"
+        for field in ("age", "gender", "weight", "height")
     }
 
     # Get the analysis from the file (if it exists)
     report_data = recent_report.get("analysis") if recent_report else None
 
+    # ♻️ Reuse the latest plan if its inputs haven't changed
+    fingerprint = compute_fingerprint(
+        {
+            "condition": condition,
+            "profile": user_profile,
+            "report": report_data,
+            "template": HEALTH_PLAN.cache_key,
+        }
+    )
+    if not force:
+        cached_plan = await db.health_plans.find_one(
+            {"email": email, "fingerprint": fingerprint},
+            sort=[("created_at", -1)],
+        )
+        if cached_plan and cached_plan.get("plan"):
+            return standard_response(
+                message="Hybrid Health Plan Retrieved",
+                data={**cached_plan["plan"], "cached": True},
+            )
+
+    if not is_gemini_available():
+        raise HTTPException(status_code=503, detail="Gemini unavailable")
+
     # 🚀 GENERATE THE HYBRID PLAN
     health_plan = await gemini_personalized_health_plan(
         condition,
@@ -208,21 +361,24 @@ async def generate_health_plan(request: Request):
         report_analysis=report_data,  # Passing the PDF data here!
     )
 
-    # Save the plan
+    # Save the plan (only successful plans are eligible for reuse)
     try:
-        await db.health_plans.insert_one(
-            {
-                "email": email,
-                "condition": condition,
-                "used_report": bool(report_data),
-                "plan": health_plan,
-                "created_at": datetime.utcnow(),
-            }
-        )
-    except:
-        pass
+        plan_doc = {
+            "email": email,
+            "condition": condition,
+            "used_report": bool(report_data),
+            "plan": health_plan,
+            "created_at": datetime.utcnow(),
+        }
+        if "error" not in health_plan:
+            plan_doc["fingerprint"] = fingerprint
+        await db.health_plans.insert_one(plan_doc)
+    except Exception as e:
+        logger.warning(f"Failed to save health plan for {email}: {e}")
 
-    return standard_response(message="Hybrid Health Plan Generated", data=health_plan)
+    return standard_response(
+        message="Hybrid Health Plan Generated", data={**health_plan, "cached": False}
+    )
 
 
 @router.get("/status")
@@ -232,6 +388,7 @@ async def gemini_status():
         message="Gemini AI status",
         data={
             "enabled": is_gemini_available(),
+            "backend": get_gemini_backend_name(),
             "sdk_version": "2026 (google-genai)",
             "model": "gemini-2.0-flash",
             "features": {
@@ -242,5 +399,7 @@ async def gemini_status():
                 "drug_interactions": is_gemini_available(),
                 "health_plans": is_gemini_available(),
             },
+            "prompt_templates": template_versions(),
+            "context_cache": get_context_cache_stats(),
         },
     )
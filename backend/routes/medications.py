@@ -7,8 +7,13 @@ from database.models import MedicationCreate, MedicationUpdate, MedicationLogCre
 from database.connection import db
 from utils.security import require_auth
 from utils.helpers import standard_response, serialize_doc
+from utils.pagination import MAX_LIMIT, paginate
+from services.user_stats import record_created
+from services.activity_feed import record_activity
+from services.rollups import medication_log_counters, record_rollup
 from bson import ObjectId
 from datetime import datetime, timedelta
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,6 +35,7 @@ async def add_medication(request: Request, medication: MedicationCreate):
         }
 
         result = await db.medications.insert_one(med_data)
+        await record_created(email, "medications", med_data["created_at"])
         med_data["_id"] = str(result.inserted_id)
 
         return standard_response(
@@ -48,8 +54,10 @@ async def add_medication(request: Request, medication: MedicationCreate):
 async def list_medications(
     request: Request,
     active: bool = Query(None, description="Filter by active status"),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
 ):
-    """List all medications for current user"""
+    """List medications for current user"""
     try:
         email = await require_auth(request)
 
@@ -57,14 +65,18 @@ async def list_medications(
         if active is not None:
             query["active"] = active
 
-        cursor = db.medications.find(query).sort("created_at", -1)
-        medications = []
-        async for med in cursor:
-            medications.append(serialize_doc(med))
+        docs, next_cursor = await paginate(
+            db.medications, query, "created_at", -1, limit, cursor
+        )
+        medications = [serialize_doc(med) for med in docs]
 
         return standard_response(
             message="Medications retrieved",
-            data={"medications": medications, "count": len(medications)},
+            data={
+                "medications": medications,
+                "count": len(medications),
+                "next_cursor": next_cursor,
+            },
         )
 
     except HTTPException:
@@ -243,6 +255,13 @@ async def log_medication(request: Request, log: MedicationLogCreate):
         }
 
         result = await db.medication_logs.insert_one(log_data)
+        await record_created(email, "medication_logs", log_data["logged_at"])
+        await record_activity("medication_log", log_data)
+        await record_rollup(
+            "medication_logs",
+            log_data["logged_at"],
+            medication_log_counters(log.skipped),
+        )
         log_data["_id"] = str(result.inserted_id)
 
         return standard_response(
@@ -3,12 +3,20 @@ Real-time Notifications via WebSocket
 Routes: /ws/notifications (WebSocket), /notifications/* (REST)
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, HTTPException
+from fastapi import (
+    APIRouter,
+    WebSocket,
+    WebSocketDisconnect,
+    Request,
+    HTTPException,
+    Query,
+)
 from jose import jwt, JWTError
 from config.settings import SECRET_KEY
 from database.connection import db
 from utils.security import require_auth
 from utils.helpers import standard_response, serialize_mongo_doc
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 from datetime import datetime
 import logging
 import json
@@ -178,7 +186,10 @@ async def notify_user(
 # ── REST Endpoints ──
 @router.get("/notifications", tags=["Notifications"])
 async def get_notifications(
-    request: Request, limit: int = 50, unread_only: bool = False
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    unread_only: bool = False,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
 ):
     """Get user's notifications"""
     try:
@@ -187,12 +198,10 @@ async def get_notifications(
         if unread_only:
             query["read"] = False
 
-        cursor = (
-            db.notifications.find(query).sort("created_at", -1).limit(min(limit, 200))
+        docs, next_cursor = await paginate(
+            db.notifications, query, "created_at", -1, limit, cursor
         )
-        notifications = []
-        async for doc in cursor:
-            notifications.append(serialize_mongo_doc(doc))
+        notifications = [serialize_mongo_doc(doc) for doc in docs]
 
         unread_count = await db.notifications.count_documents(
             {"email": email, "read": False}
@@ -203,6 +212,7 @@ async def get_notifications(
             data={
                 "notifications": notifications,
                 "unread_count": unread_count,
+                "next_cursor": next_cursor,
             },
         )
     except HTTPException:
@@ -2,24 +2,63 @@
 Disease Prediction Routes
 """
 
-from fastapi import APIRouter, HTTPException, Request
-from database.models import SymptomPredictionRequest
-from services.ml_service import predict_disease
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from typing import Any, Dict, List
+from database.models import (
+    NextSymptomRequest,
+    SymptomExtractRequest,
+    SymptomPredictionRequest,
+)
+from services.ml_service import (
+    differential_as_dicts,
+    get_available_symptoms,
+    predict_with_differential,
+)
+from services import symptom_stats, symptom_suggest
+from services.symptom_normalizer import canonicalize_symptoms, extract_symptoms
+from services.symptom_bits import encode_symptoms
+from services.similar_cases import add_prediction_case, find_similar_cases
 from services.gemini_service import get_gemini_enhanced_prediction
 from utils.helpers import standard_response
 from utils.validators import validate_symptoms
 from utils.security import get_current_user
-from database.connection import db, get_user_by_email
+from services.user_context import get_user_context, record_new_prediction
+from services.user_stats import record_created
+from services.activity_feed import record_activity
+from services.rollups import prediction_counters, record_rollup
+from database.connection import db
 from datetime import datetime
+import asyncio
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/predict", tags=["Prediction"])
 
+# Below this expected entropy reduction (bits) another question isn't worth asking
+MIN_INFORMATION_GAIN = 0.05
+TOP_DISEASES = 5
+
+
+async def _count_prediction(
+    email: str, prediction: str, created_at: datetime, counters: Dict[str, Any]
+):
+    """Per-user stats (and badges) plus the daily rollup, after the response"""
+    results = await asyncio.gather(
+        record_created(email, "predictions", created_at, prediction=prediction),
+        record_rollup("predictions", created_at, counters),
+        return_exceptions=True,
+    )
+    for error in results:
+        if isinstance(error, Exception):
+            logger.warning(f"Failed to count prediction for {email}: {error}")
+
 
 @router.post("/disease")
 async def predict_disease_endpoint(
-    request: Request, symptoms: SymptomPredictionRequest
+    request: Request,
+    symptoms: SymptomPredictionRequest,
+    background_tasks: BackgroundTasks,
 ):
     """Disease prediction with ML ensemble + Gemini clinical analysis"""
     try:
@@ -28,21 +67,30 @@ async def predict_disease_endpoint(
         if not symptom_list:
             raise HTTPException(status_code=400, detail="No valid symptoms provided")
 
+        # Map aliases/misspellings onto the model's vocabulary
+        symptom_list, unrecognized = canonicalize_symptoms(symptom_list)
+        if not symptom_list:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No recognized symptoms provided: {', '.join(unrecognized[:10])}",
+            )
+
         logger.info(f"[ANALYZE] Symptoms: {symptom_list}")
 
-        prediction, description, precautions, specialist = await predict_disease(
-            symptom_list
-        )
+        result = await predict_with_differential(symptom_list)
+        prediction = result["prediction"]
+        description = result["description"]
+        precautions = result["precautions"]
+        specialist = result["specialist"]
 
         email = await get_current_user(request)
 
         user_age = None
         user_gender = None
         if email:
-            user_data = await get_user_by_email(email)
-            if user_data:
-                user_age = user_data.get("age")
-                user_gender = user_data.get("gender")
+            user_context = await get_user_context(email)
+            user_age = user_context["age"]
+            user_gender = user_context["gender"]
 
         enhanced_result = await get_gemini_enhanced_prediction(
             prediction=prediction,
@@ -56,17 +104,36 @@ async def predict_disease_endpoint(
 
         gemini_analysis = enhanced_result.get("gemini_analysis", "")
 
+        # Looked up before this prediction is indexed so it can't match itself
+        similar_cases = find_similar_cases(symptom_list, email)
+
         if email:
+            created_at = datetime.utcnow()
             try:
-                await db.predictions.insert_one(
-                    {
-                        "email": email,
-                        "symptoms": symptom_list,
-                        "ml_prediction": prediction,
-                        "specialist": specialist,
-                        "enhanced": enhanced_result.get("enhanced", False),
-                        "created_at": datetime.utcnow(),
-                    }
+                prediction_doc = {
+                    "email": email,
+                    "symptoms": symptom_list,
+                    "symptom_bits": encode_symptoms(symptom_list),
+                    "ml_prediction": prediction,
+                    "confidence": result["confidence"],
+                    "differential": result["differential"],
+                    "ml_models": result["models"],
+                    "specialist": specialist,
+                    "enhanced": enhanced_result.get("enhanced", False),
+                    "created_at": created_at,
+                }
+                # Direct insert: history and timeline read it back immediately
+                await db.predictions.insert_one(prediction_doc)
+                await record_activity("prediction", prediction_doc)
+                add_prediction_case(prediction_doc)
+                record_new_prediction(email, prediction, created_at)
+                # Counter updates are independent $incs; keep them off the response
+                background_tasks.add_task(
+                    _count_prediction,
+                    email,
+                    prediction,
+                    created_at,
+                    prediction_counters(prediction, user_context),
                 )
             except Exception as e:
                 logger.warning(f"Failed to store prediction: {e}")
@@ -76,7 +143,14 @@ async def predict_disease_endpoint(
             "ml_description": description,
             "ml_precautions": precautions,
             "ml_specialist": specialist,
+            "ml_confidence": result["confidence"],
+            # Averaged model scores: they rank diseases but are not calibrated
+            "ml_confidence_type": "relative_score",
+            "ml_models": result["models"],
+            "differential": differential_as_dicts(result["differential"]),
             "symptoms_analyzed": symptom_list,
+            "unrecognized_symptoms": unrecognized,
+            "similar_cases": similar_cases,
             "gemini_enhanced": enhanced_result.get("enhanced", False),
             "gemini_analysis": gemini_analysis,
             "generated_at": enhanced_result.get(
@@ -99,3 +173,94 @@ async def predict_disease_endpoint(
         raise HTTPException(
             status_code=500, detail="Prediction failed. Please try again."
         )
+
+
+@router.post("/next-symptom")
+async def next_symptom(body: NextSymptomRequest):
+    """
+    Interactive diagnosis: the unasked symptom whose yes/no answer is expected
+    to narrow the 41 candidate diseases the most, plus the current ranking
+    """
+    stats = symptom_stats.symptom_stats
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Symptom statistics not loaded")
+
+    present, unrecognized = canonicalize_symptoms(body.present)
+    absent, unrecognized_absent = canonicalize_symptoms(body.absent)
+    if not present:
+        raise HTTPException(status_code=400, detail="No recognized symptoms provided")
+
+    present_ids = stats.ids(present)
+    absent_ids = [i for i in stats.ids(absent) if i not in present_ids]
+    gain, posterior = stats.information_gain(present_ids, absent_ids)
+
+    candidates = [
+        {"symptom": stats.symptoms[i], "information_gain": round(float(gain[i]), 4)}
+        for i in np.argsort(-gain)[: body.limit]
+        if gain[i] >= MIN_INFORMATION_GAIN
+    ]
+    return standard_response(
+        message="Next symptom computed",
+        data={
+            "next_symptom": candidates[0]["symptom"] if candidates else None,
+            "candidates": candidates,
+            "entropy_bits": round(float(stats.entropy(posterior)), 4),
+            "top_diseases": [
+                {
+                    "disease": stats.diseases[i],
+                    "probability": round(float(posterior[i]), 4),
+                }
+                for i in np.argsort(-posterior)[:TOP_DISEASES]
+            ],
+            "present": present,
+            "absent": absent,
+            "unrecognized_symptoms": unrecognized + unrecognized_absent,
+        },
+    )
+
+
+@router.get("/symptoms")
+async def list_symptoms():
+    """All symptoms the models know, in training order"""
+    symptoms = get_available_symptoms()
+    return standard_response(
+        message="Symptoms retrieved",
+        data={"symptoms": symptoms, "count": len(symptoms)},
+    )
+
+
+@router.get("/symptoms/suggest")
+async def suggest_symptoms(
+    q: str = Query("", max_length=100),
+    selected: List[str] = Query([]),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Autocomplete for the symptom pickers: prefix matches on names, words and
+    aliases, ranked by co-occurrence with the `selected` symptoms
+    """
+    suggester = symptom_suggest.symptom_suggester
+    if suggester is None:
+        raise HTTPException(status_code=503, detail="Symptom index not loaded")
+    suggestions = suggester.suggest(q, selected, limit)
+    return standard_response(
+        message="Symptom suggestions",
+        data={"suggestions": suggestions, "count": len(suggestions)},
+    )
+
+
+@router.post("/symptoms/extract")
+async def extract_symptoms_endpoint(body: SymptomExtractRequest):
+    """
+    Canonical symptoms mentioned in free text (journal entry, chat message,
+    voice transcript), ready to pre-fill /predict/disease
+    """
+    try:
+        result = extract_symptoms(body.text)
+        return standard_response(
+            message="Symptoms extracted",
+            data={**result, "count": len(result["symptoms"])},
+        )
+    except Exception as e:
+        logger.error(f"[EXTRACT] Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to extract symptoms")
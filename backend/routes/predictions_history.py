@@ -5,6 +5,11 @@ from fastapi import APIRouter, HTTPException, Request, Query
 from database.connection import db
 from utils.security import require_auth
 from utils.helpers import standard_response
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from services.ml_service import differential_as_dicts
+from services.similar_cases import find_similar_cases
+from services.user_stats import get_user_stats
+from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
 
@@ -15,15 +20,18 @@ router = APIRouter(prefix="/predictions", tags=["Predictions History"])
 @router.get("/history")
 async def get_prediction_history(
     request: Request,
-    limit: int = Query(50, ge=1, le=100)
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
 ):
     """Get user's prediction history"""
     try:
         email = await require_auth(request)
         
         # Get predictions
-        cursor = db.predictions.find({"email": email}).sort("created_at", -1).limit(limit)
-        predictions = await cursor.to_list(length=limit)
+        predictions, next_cursor = await paginate(
+            db.predictions, {"email": email}, "created_at", -1, limit, cursor,
+            {"symptom_bits": 0}
+        )
         
         # Convert ObjectId to string
         for pred in predictions:
@@ -31,12 +39,15 @@ async def get_prediction_history(
             # Format datetime
             if "created_at" in pred:
                 pred["created_at"] = pred["created_at"].isoformat()
+            if "differential" in pred:
+                pred["differential"] = differential_as_dicts(pred["differential"])
         
         return standard_response(
             message="Prediction history retrieved successfully",
             data={
                 "predictions": predictions,
-                "count": len(predictions)
+                "count": len(predictions),
+                "next_cursor": next_cursor
             }
         )
         
@@ -47,14 +58,39 @@ async def get_prediction_history(
         raise HTTPException(status_code=500, detail="Failed to get prediction history")
 
 
+@router.get("/similar")
+async def get_similar_cases(
+    request: Request,
+    symptoms: List[str] = Query(...),
+    limit: int = Query(5, ge=1, le=20)
+):
+    """What similar past cases were diagnosed with, plus the user's own similar episodes"""
+    try:
+        email = await require_auth(request)
+
+        similar = find_similar_cases(symptoms, email, limit)
+        if similar is None:
+            raise HTTPException(status_code=503, detail="Similar case index unavailable")
+
+        return standard_response(
+            message="Similar cases retrieved successfully",
+            data=similar
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get similar cases error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get similar cases")
+
+
 @router.get("/statistics")
 async def get_prediction_statistics(request: Request):
     """Get user's prediction statistics"""
     try:
         email = await require_auth(request)
         
-        # Get total predictions
-        total = await db.predictions.count_documents({"email": email})
+        stats = await get_user_stats(email)
         
         # Get predictions in last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -63,27 +99,12 @@ async def get_prediction_statistics(request: Request):
             "created_at": {"$gte": thirty_days_ago}
         })
         
-        # Get most common predictions
-        pipeline = [
-            {"$match": {"email": email}},
-            {"$group": {"_id": "$ml_prediction", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 5}
-        ]
-        
-        common_predictions = []
-        async for doc in db.predictions.aggregate(pipeline):
-            common_predictions.append({
-                "disease": doc["_id"],
-                "count": doc["count"]
-            })
-        
         return standard_response(
             message="Statistics retrieved successfully",
             data={
-                "total_predictions": total,
+                "total_predictions": stats["counts"]["predictions"],
                 "recent_predictions": recent,
-                "most_common": common_predictions
+                "most_common": stats["predicted"][:5]
             }
         )
         
@@ -6,6 +6,8 @@ from database.models import ProfileUpdate, StandardResponse
 from database.connection import db
 from utils.security import require_auth
 from utils.helpers import standard_response
+from services.user_context import invalidate_user_context
+from services.user_stats import record_profile
 from datetime import datetime
 import logging
 
@@ -64,9 +66,12 @@ async def update_profile(request: Request, profile: ProfileUpdate):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
+
+        invalidate_user_context(email)
         
         # Get updated user
         updated_user = await db.store.find_one({"email": email})
+        await record_profile(email, updated_user)
         updated_user.pop("password", None)
         updated_user.pop("_id", None)
         
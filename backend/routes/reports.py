@@ -7,6 +7,7 @@ from fastapi.responses import StreamingResponse
 from database.connection import db, get_user_by_email
 from utils.security import require_auth
 from utils.helpers import standard_response, serialize_date
+from services.user_stats import record_created
 from datetime import datetime, timedelta
 from io import BytesIO
 import logging
@@ -528,6 +529,7 @@ async def generate_health_report(
 
         # Generate PDF
         pdf_buffer = _generate_pdf(report_data)
+        await record_created(email, "reports")
 
         filename = f"health_report_{datetime.utcnow().strftime('%Y%m%d')}.pdf"
 
@@ -1,15 +1,27 @@
 """
 Symptom Timeline / Health Journal Routes
-Aggregates predictions, appointments, medication logs, and manual journal entries into a unified timeline.
+Unified timeline of predictions, appointments, medication logs, and manual journal entries,
+served from the activity-event feed (services.activity_feed).
 """
 
 from fastapi import APIRouter, HTTPException, Request, Query
 from database.connection import db
 from database.models import SymptomJournalCreate, SymptomJournalUpdate
 from utils.security import require_auth
-from utils.helpers import standard_response, serialize_doc, serialize_date
+from utils.helpers import standard_response, serialize_doc
+from utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
+from services.symptom_normalizer import extract_symptoms
+from services.user_stats import record_created, record_deleted
+from services.activity_feed import (
+    record_activity,
+    remove_activity,
+    update_activity,
+    user_timeline,
+)
 from datetime import datetime, timedelta
+from typing import Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,149 +36,15 @@ async def get_timeline(
         None, pattern="^(prediction|appointment|medication_log|journal)$"
     ),
     limit: int = Query(100, ge=1, le=500),
+    before: Optional[str] = Query(None, description="next_cursor of the previous page"),
 ):
-    """Get unified health timeline — aggregates all health events"""
+    """Get unified health timeline — one range scan over the activity-event feed"""
     try:
         email = await require_auth(request)
         cutoff = datetime.utcnow() - timedelta(days=days)
-        events = []
-
-        # --- Predictions ---
-        if event_type is None or event_type == "prediction":
-            cursor = db.predictions.find(
-                {"email": email, "created_at": {"$gte": cutoff}}
-            ).sort("created_at", -1)
-            async for pred in cursor:
-                events.append(
-                    {
-                        "id": str(pred["_id"]),
-                        "type": "prediction",
-                        "title": pred.get("ml_prediction", "Disease Prediction"),
-                        "description": f"Symptoms: {', '.join(pred.get('symptoms', [])[:5])}",
-                        "details": {
-                            "symptoms": pred.get("symptoms", []),
-                            "specialist": pred.get("specialist"),
-                            "enhanced": pred.get("enhanced", False),
-                        },
-                        "severity": _prediction_severity(pred.get("ml_prediction", "")),
-                        "icon": "stethoscope",
-                        "date": serialize_date(pred.get("created_at")),
-                    }
-                )
-
-        # --- Appointments ---
-        if event_type is None or event_type == "appointment":
-            cursor = db.appointments.find({"user_email": email}).sort("date", -1)
-            async for apt in cursor:
-                apt_date = apt.get("date", "")
-                # Only include within date range
-                if isinstance(apt_date, str) and apt_date >= cutoff.strftime(
-                    "%Y-%m-%d"
-                ):
-                    events.append(
-                        {
-                            "id": str(apt["_id"]),
-                            "type": "appointment",
-                            "title": f"Appointment with Dr. {apt.get('doctorName', apt.get('doctor_name', 'Unknown'))}",
-                            "description": apt.get(
-                                "doctorSpecialization", apt.get("specialization", "")
-                            ),
-                            "details": {
-                                "doctor": apt.get("doctorName", apt.get("doctor_name")),
-                                "specialization": apt.get(
-                                    "doctorSpecialization", apt.get("specialization")
-                                ),
-                                "location": apt.get(
-                                    "doctorLocation", apt.get("location")
-                                ),
-                                "time": apt.get("time"),
-                                "status": apt.get("status", "scheduled"),
-                            },
-                            "severity": "info",
-                            "icon": "calendar",
-                            "date": apt_date
-                            if isinstance(apt_date, str)
-                            else serialize_date(apt_date),
-                        }
-                    )
-                elif isinstance(apt_date, datetime) and apt_date >= cutoff:
-                    events.append(
-                        {
-                            "id": str(apt["_id"]),
-                            "type": "appointment",
-                            "title": f"Appointment with Dr. {apt.get('doctorName', apt.get('doctor_name', 'Unknown'))}",
-                            "description": apt.get(
-                                "doctorSpecialization", apt.get("specialization", "")
-                            ),
-                            "details": {
-                                "doctor": apt.get("doctorName", apt.get("doctor_name")),
-                                "specialization": apt.get(
-                                    "doctorSpecialization", apt.get("specialization")
-                                ),
-                                "location": apt.get(
-                                    "doctorLocation", apt.get("location")
-                                ),
-                                "time": apt.get("time"),
-                                "status": apt.get("status", "scheduled"),
-                            },
-                            "severity": "info",
-                            "icon": "calendar",
-                            "date": serialize_date(apt_date),
-                        }
-                    )
-
-        # --- Medication Logs ---
-        if event_type is None or event_type == "medication_log":
-            cursor = db.medication_logs.find(
-                {"email": email, "logged_at": {"$gte": cutoff}}
-            ).sort("logged_at", -1)
-            async for log in cursor:
-                action = "Skipped" if log.get("skipped") else "Taken"
-                events.append(
-                    {
-                        "id": str(log["_id"]),
-                        "type": "medication_log",
-                        "title": f"Medication {action}: {log.get('medication_name', 'Unknown')}",
-                        "description": log.get("notes", ""),
-                        "details": {
-                            "medication_id": log.get("medication_id"),
-                            "medication_name": log.get("medication_name"),
-                            "skipped": log.get("skipped", False),
-                        },
-                        "severity": "low" if not log.get("skipped") else "medium",
-                        "icon": "pill",
-                        "date": serialize_date(log.get("logged_at")),
-                    }
-                )
-
-        # --- Journal Entries ---
-        if event_type is None or event_type == "journal":
-            cursor = db.journal_entries.find(
-                {"email": email, "created_at": {"$gte": cutoff}}
-            ).sort("created_at", -1)
-            async for entry in cursor:
-                events.append(
-                    {
-                        "id": str(entry["_id"]),
-                        "type": "journal",
-                        "title": entry.get("title", "Journal Entry"),
-                        "description": entry.get("content", "")[:200],
-                        "details": {
-                            "content": entry.get("content", ""),
-                            "mood": entry.get("mood"),
-                            "symptoms": entry.get("symptoms", []),
-                            "tags": entry.get("tags", []),
-                            "pain_level": entry.get("pain_level"),
-                        },
-                        "severity": _mood_to_severity(entry.get("mood")),
-                        "icon": "journal",
-                        "date": serialize_date(entry.get("created_at")),
-                    }
-                )
-
-        # Sort all events by date descending
-        events.sort(key=lambda e: e.get("date", ""), reverse=True)
-        events = events[:limit]
+        events, next_cursor = await user_timeline(
+            email, cutoff, event_type, limit, before
+        )
 
         return standard_response(
             message="Timeline retrieved successfully",
@@ -174,6 +52,7 @@ async def get_timeline(
                 "events": events,
                 "count": len(events),
                 "days": days,
+                "next_cursor": next_cursor,
             },
         )
 
@@ -187,6 +66,11 @@ async def get_timeline(
 # --- Journal CRUD ---
 
 
+def _detect_symptoms(title: str, content: str) -> list:
+    """Canonical symptoms mentioned in a journal entry (auto-tagging)"""
+    return extract_symptoms(f"{title or ''}\n{content or ''}")["symptoms"]
+
+
 @router.post("/journal")
 async def create_journal_entry(request: Request, entry: SymptomJournalCreate):
     """Create a new health journal entry"""
@@ -199,12 +83,15 @@ async def create_journal_entry(request: Request, entry: SymptomJournalCreate):
             "content": entry.content,
             "mood": entry.mood,
             "symptoms": entry.symptoms or [],
+            "detected_symptoms": _detect_symptoms(entry.title, entry.content),
             "tags": entry.tags or [],
             "pain_level": entry.pain_level,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
         }
         result = await db.journal_entries.insert_one(doc)
+        await record_created(email, "journal_entries", doc["created_at"])
+        await record_activity("journal", doc)
         doc["_id"] = str(result.inserted_id)
 
         return standard_response(
@@ -222,8 +109,9 @@ async def create_journal_entry(request: Request, entry: SymptomJournalCreate):
 @router.get("/journal")
 async def get_journal_entries(
     request: Request,
-    limit: int = Query(50, ge=1, le=200),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
     mood: str = Query(None, pattern="^(great|good|okay|bad|terrible)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
 ):
     """Get user's journal entries"""
     try:
@@ -232,9 +120,11 @@ async def get_journal_entries(
         if mood:
             query["mood"] = mood
 
-        cursor = db.journal_entries.find(query).sort("created_at", -1).limit(limit)
+        docs, next_cursor = await paginate(
+            db.journal_entries, query, "created_at", -1, limit, cursor
+        )
         entries = []
-        async for entry in cursor:
+        for entry in docs:
             entry["_id"] = str(entry["_id"])
             if isinstance(entry.get("created_at"), datetime):
                 entry["created_at"] = entry["created_at"].isoformat()
@@ -244,7 +134,11 @@ async def get_journal_entries(
 
         return standard_response(
             message="Journal entries retrieved",
-            data={"entries": entries, "count": len(entries)},
+            data={
+                "entries": entries,
+                "count": len(entries),
+                "next_cursor": next_cursor,
+            },
         )
 
     except HTTPException:
@@ -269,15 +163,29 @@ async def update_journal_entry(
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
 
+        if "title" in update_data or "content" in update_data:
+            existing = await db.journal_entries.find_one(
+                {"_id": ObjectId(entry_id), "email": email},
+                {"title": 1, "content": 1},
+            )
+            if not existing:
+                raise HTTPException(status_code=404, detail="Journal entry not found")
+            update_data["detected_symptoms"] = _detect_symptoms(
+                update_data.get("title", existing.get("title")),
+                update_data.get("content", existing.get("content")),
+            )
+
         update_data["updated_at"] = datetime.utcnow()
 
-        result = await db.journal_entries.update_one(
+        updated = await db.journal_entries.find_one_and_update(
             {"_id": ObjectId(entry_id), "email": email},
             {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
         )
 
-        if result.matched_count == 0:
+        if not updated:
             raise HTTPException(status_code=404, detail="Journal entry not found")
+        await update_activity("journal", updated)
 
         return standard_response(message="Journal entry updated")
 
@@ -303,6 +211,8 @@ async def delete_journal_entry(request: Request, entry_id: str):
 
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Journal entry not found")
+        await record_deleted(email, "journal_entries")
+        await remove_activity(ObjectId(entry_id))
 
         return standard_response(message="Journal entry deleted")
 
@@ -311,38 +221,3 @@ async def delete_journal_entry(request: Request, entry_id: str):
     except Exception as e:
         logger.error(f"Delete journal error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete journal entry")
-
-
-# --- Helpers ---
-
-
-def _prediction_severity(prediction: str) -> str:
-    """Map prediction to severity level"""
-    high_risk = {
-        "heart attack",
-        "stroke",
-        "diabetes",
-        "hepatitis",
-        "malaria",
-        "tuberculosis",
-        "pneumonia",
-        "aids",
-        "jaundice",
-    }
-    prediction_lower = prediction.lower()
-    for disease in high_risk:
-        if disease in prediction_lower:
-            return "high"
-    return "medium"
-
-
-def _mood_to_severity(mood: str) -> str:
-    """Map mood to severity for display"""
-    mapping = {
-        "great": "low",
-        "good": "low",
-        "okay": "medium",
-        "bad": "high",
-        "terrible": "high",
-    }
-    return mapping.get(mood, "medium")
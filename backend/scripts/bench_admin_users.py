@@ -0,0 +1,179 @@
+"""
+Admin User Listing Benchmark
+Seeds a throwaway database with users, predictions and appointments, then
+counts the MongoDB commands and time GET /admin/users needs per page size:
+the old per-user count_documents loop against load_user_page().
+
+    cd backend
+    python -m scripts.bench_admin_users                  # seed + run
+    python -m scripts.bench_admin_users --no-seed        # reuse the seeded data
+
+Uses MONGO_URI with MONGO_DBNAME defaulting to "helloai_bench"; the database
+is dropped on seeding, so the name must end in "_bench".
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pymongo import monitoring
+
+os.environ.setdefault("MONGO_DBNAME", "helloai_bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Commands that read data; handshakes, heartbeats and session cleanup don't count
+COUNTED = {"find", "aggregate", "count", "getMore", "distinct"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in COUNTED:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Must be registered before the client in database.connection is created
+counter = CommandCounter()
+monitoring.register(counter)
+
+from config.settings import MONGO_DBNAME  # noqa: E402
+from database.connection import client, create_indexes, db  # noqa: E402
+from routes.admin import USER_PROJECTION, load_user_page  # noqa: E402
+from services.user_stats import reconcile_user_stats  # noqa: E402
+
+INSERT_BATCH = 5000
+
+
+async def seed(users: int) -> None:
+    rng = random.Random(48)
+    now = datetime.utcnow()
+    await client.drop_database(MONGO_DBNAME)
+    await create_indexes()
+
+    emails = [f"user{i}@bench.local" for i in range(users)]
+    await db.store.insert_many(
+        [
+            {
+                "email": email,
+                "name": email.split("@")[0],
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            }
+            for email in emails
+        ]
+    )
+
+    predictions, appointments = [], []
+    for email in emails:
+        for _ in range(rng.randint(0, 40)):
+            predictions.append(
+                {
+                    "email": email,
+                    "symptoms": ["Cough"],
+                    "ml_prediction": "Common Cold",
+                    "created_at": now - timedelta(days=rng.randint(0, 365)),
+                }
+            )
+        for _ in range(rng.randint(0, 5)):
+            appointments.append(
+                {
+                    "user_email": email,
+                    "doctor_name": "Dr. Bench",
+                    "date": (now + timedelta(days=rng.randint(-90, 30))).strftime(
+                        "%Y-%m-%d"
+                    ),
+                    "status": "pending",
+                    "created_at": now - timedelta(days=rng.randint(0, 120)),
+                }
+            )
+    for collection, docs in (
+        ("predictions", predictions),
+        ("appointments", appointments),
+    ):
+        for i in range(0, len(docs), INSERT_BATCH):
+            await db[collection].insert_many(docs[i : i + INSERT_BATCH], ordered=False)
+    await reconcile_user_stats()
+
+
+async def per_user_counts_page(limit: int):
+    """The pre-aggregation listing: a page of users, then two counts per user"""
+    cursor = db.store.find({}, USER_PROJECTION).sort("created_at", -1).limit(limit)
+    users = []
+    async for user in cursor:
+        email = user.get("email", "")
+        user["prediction_count"] = await db.predictions.count_documents(
+            {"email": email}
+        )
+        user["appointment_count"] = await db.appointments.count_documents(
+            {"user_email": email}
+        )
+        users.append(user)
+    return users
+
+
+async def measure(loader, limit: int):
+    counter.count = 0
+    started = time.perf_counter()
+    users = await loader(limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    return users, counter.count, elapsed
+
+
+async def main(args) -> None:
+    if not MONGO_DBNAME.endswith("_bench"):
+        sys.exit(f"Refusing to use database {MONGO_DBNAME!r}: name must end in _bench")
+
+    if args.seed:
+        started = time.perf_counter()
+        await seed(args.users)
+        print(f"Seeded {MONGO_DBNAME} in {time.perf_counter() - started:.1f}s")
+
+    loaders = {
+        "per-user": per_user_counts_page,
+        "aggregate": lambda limit: load_user_page(limit=limit),
+        "by-activity": lambda limit: load_user_page(sort_by="activity", limit=limit),
+    }
+
+    # The aggregation must report the same counts before its numbers mean anything
+    old = await per_user_counts_page(50)
+    new, _ = await load_user_page(limit=50)
+    assert [
+        (u["email"], u["prediction_count"], u["appointment_count"]) for u in old
+    ] == [(u["email"], u["prediction_count"], u["appointment_count"]) for u in new]
+
+    print(f"{'page size':>9}  " + "".join(f"{name:>24}" for name in loaders))
+    query_counts = {name: set() for name in loaders}
+    for limit in args.page_sizes:
+        cells = []
+        for name, loader in loaders.items():
+            await measure(loader, limit)  # warm caches
+            _, queries, elapsed = await measure(loader, limit)
+            query_counts[name].add(queries)
+            cells.append(f"{queries:>6} queries {elapsed:8.2f} ms")
+        print(f"{limit:>9}  " + "".join(f"{cell:>24}" for cell in cells))
+
+    for name, counts in query_counts.items():
+        if name != "per-user":
+            assert (
+                len(counts) == 1
+            ), f"{name} query count varies with page size: {counts}"
+    print("Aggregated listings use a constant number of queries per page")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    asyncio.run(main(parser.parse_args()))
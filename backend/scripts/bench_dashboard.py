@@ -0,0 +1,298 @@
+"""
+Dashboard Benchmark
+Seeds a throwaway database with a few heavy users (10k predictions each) and
+a crowd of light ones, prints the query plan of each dashboard query (keys
+and documents examined; in-memory sorts and collection scans fail the run),
+then times GET /health/dashboard's data loading: the old one-query-at-a-time
+sequence against load_dashboard_data().
+
+    cd backend
+    python -m scripts.bench_dashboard                  # seed + run
+    python -m scripts.bench_dashboard --no-seed        # reuse the seeded data
+
+Uses MONGO_URI with MONGO_DBNAME defaulting to "helloai_bench"; the database
+is dropped on seeding, so the name must end in "_bench".
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("MONGO_DBNAME", "helloai_bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import MONGO_DBNAME  # noqa: E402
+from database.connection import client, create_indexes, db  # noqa: E402
+from routes.dashboard import (  # noqa: E402
+    load_dashboard_data,
+    recent_predictions_cursor,
+    upcoming_appointments_cursor,
+)
+from services.user_stats import reconcile_user_stats  # noqa: E402
+
+DISEASES = [
+    "Fungal infection",
+    "Allergy",
+    "GERD",
+    "Diabetes",
+    "Migraine",
+    "Malaria",
+    "Typhoid",
+    "Common Cold",
+    "Pneumonia",
+    "Hypertension",
+]
+SYMPTOMS = [
+    "Itching",
+    "Skin Rash",
+    "Cough",
+    "High Fever",
+    "Headache",
+    "Nausea",
+    "Fatigue",
+    "Chills",
+    "Vomiting",
+    "Joint Pain",
+]
+INSERT_BATCH = 5000
+
+
+def _prediction(email: str, now: datetime, rng: random.Random) -> dict:
+    created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+    return {
+        "email": email,
+        "symptoms": rng.sample(SYMPTOMS, 3),
+        "ml_prediction": rng.choice(DISEASES),
+        "confidence": round(rng.random(), 3),
+        "description": "Seeded prediction",
+        "precautions": ["rest", "hydrate"],
+        "specialist": "General Physician",
+        "created_at": created_at,
+    }
+
+
+def _appointment(email: str, now: datetime, rng: random.Random) -> dict:
+    when = now + timedelta(days=rng.randint(-180, 60))
+    return {
+        "user_email": email,
+        "doctor_name": "Dr. Bench",
+        "date": when.strftime("%Y-%m-%d") if rng.random() < 0.5 else when,
+        "time": "10:00",
+        "status": "pending",
+        "created_at": when - timedelta(days=7),
+    }
+
+
+async def seed(heavy_users: int, predictions: int, light_users: int) -> list:
+    rng = random.Random(41)
+    now = datetime.utcnow()
+    await client.drop_database(MONGO_DBNAME)
+    await create_indexes()
+
+    heavy = [f"heavy{i}@bench.local" for i in range(heavy_users)]
+    light = [f"user{i}@bench.local" for i in range(light_users)]
+    await db.store.insert_many(
+        [
+            {"email": email, "name": email.split("@")[0], "age": 40, "bmi": "22.5"}
+            for email in heavy + light
+        ]
+    )
+
+    batch = []
+    for email in heavy:
+        for _ in range(predictions):
+            batch.append(_prediction(email, now, rng))
+            if len(batch) >= INSERT_BATCH:
+                await db.predictions.insert_many(batch, ordered=False)
+                batch = []
+    for email in light:
+        batch.extend(_prediction(email, now, rng) for _ in range(rng.randint(0, 20)))
+    if batch:
+        await db.predictions.insert_many(batch, ordered=False)
+
+    appointments = [
+        _appointment(email, now, rng) for email in heavy for _ in range(200)
+    ] + [_appointment(email, now, rng) for email in light for _ in range(3)]
+    await db.appointments.insert_many(appointments, ordered=False)
+    await reconcile_user_stats()
+    return heavy
+
+
+async def sequential_dashboard_data(email: str):
+    """The original query sequence, one round trip after another"""
+    user = await db.store.find_one({"email": email})
+    recent = (
+        await db.predictions.find({"email": email}, {"symptom_bits": 0})
+        .sort("created_at", -1)
+        .limit(5)
+        .to_list(length=5)
+    )
+    today_str = datetime.utcnow().strftime("%Y-%m-%d")
+    today_dt = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    upcoming = (
+        await db.appointments.find(
+            {
+                "user_email": email,
+                "$or": [
+                    {"date": {"$gte": today_str, "$type": "string"}},
+                    {"date": {"$gte": today_dt, "$type": "date"}},
+                ],
+            }
+        )
+        .sort("date", 1)
+        .limit(5)
+        .to_list(length=5)
+    )
+    total_predictions = await db.predictions.count_documents({"email": email})
+    total_appointments = await db.appointments.count_documents({"user_email": email})
+    common = await db.predictions.aggregate(
+        [
+            {"$match": {"email": email}},
+            {"$group": {"_id": "$ml_prediction", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": 1},
+        ]
+    ).to_list(1)
+    since = datetime.utcnow() - timedelta(days=30)
+    recent_predictions = await db.predictions.count_documents(
+        {"email": email, "created_at": {"$gte": since}}
+    )
+    recent_appointments = await db.appointments.count_documents(
+        {"user_email": email, "created_at": {"$gte": since}}
+    )
+    return user, {
+        "recent": recent,
+        "upcoming": upcoming,
+        "totals": (total_predictions, total_appointments),
+        "most_common": common[0]["_id"] if common else None,
+        "recent_counts": (recent_predictions, recent_appointments),
+    }
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def _count_plan(collection: str, query: dict) -> dict:
+    return await db.command(
+        "explain", {"count": collection, "query": query}, verbosity="executionStats"
+    )
+
+
+async def check_plans(email: str) -> None:
+    """Every dashboard query must be answered from an index"""
+    since = datetime.utcnow() - timedelta(days=30)
+    plans = {
+        "recent predictions": await recent_predictions_cursor(email).explain(),
+        "upcoming appointments": await upcoming_appointments_cursor(email).explain(),
+        "30d predictions count": await _count_plan(
+            "predictions", {"email": email, "created_at": {"$gte": since}}
+        ),
+        "30d appointments count": await _count_plan(
+            "appointments", {"user_email": email, "created_at": {"$gte": since}}
+        ),
+    }
+    for name, plan in plans.items():
+        stats = plan["executionStats"]
+        stages = [s for s in _stages(plan["queryPlanner"]["winningPlan"]) if s]
+        print(
+            f"{name:<24} keys {stats['totalKeysExamined']:>6}  "
+            f"docs {stats['totalDocsExamined']:>6}  {' <- '.join(stages)}"
+        )
+        assert "COLLSCAN" not in stages and "SORT" not in stages, (name, stages)
+
+
+async def concurrent_dashboard_data(email: str):
+    user, stats, predictions, appointments = await load_dashboard_data(email)
+    return user, {
+        "recent": predictions["recent"],
+        "upcoming": appointments["upcoming"],
+        "totals": (stats["counts"]["predictions"], stats["counts"]["appointments"]),
+        "most_common": stats["most_common_prediction"],
+        "recent_counts": (predictions["recent_count"], appointments["recent_count"]),
+    }
+
+
+async def timed(loader, emails: list, runs: int) -> list:
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        await loader(emails[i % len(emails)])
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name: str, samples: list) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:<12} p50 {statistics.median(ordered):7.2f} ms   "
+        f"p95 {p95:7.2f} ms   max {ordered[-1]:7.2f} ms"
+    )
+
+
+async def main(args) -> None:
+    if not MONGO_DBNAME.endswith("_bench"):
+        sys.exit(f"Refusing to use database {MONGO_DBNAME!r}: name must end in _bench")
+
+    if args.seed:
+        started = time.perf_counter()
+        heavy = await seed(args.heavy_users, args.predictions, args.light_users)
+        print(f"Seeded {MONGO_DBNAME} in {time.perf_counter() - started:.1f}s")
+    else:
+        heavy = [f"heavy{i}@bench.local" for i in range(args.heavy_users)]
+
+    # Both paths must agree before their timings mean anything
+    for email in heavy:
+        _, old = await sequential_dashboard_data(email)
+        _, new = await concurrent_dashboard_data(email)
+        assert old["totals"] == new["totals"], (old["totals"], new["totals"])
+        assert old["recent_counts"] == new["recent_counts"]
+        assert old["most_common"] == new["most_common"]
+        assert [p["_id"] for p in old["recent"]] == [p["_id"] for p in new["recent"]]
+
+    await check_plans(heavy[0])
+
+    print(
+        f"{args.heavy_users} users x {args.predictions} predictions, "
+        f"{args.runs} runs each"
+    )
+    for name, loader in (
+        ("sequential", sequential_dashboard_data),
+        ("concurrent", concurrent_dashboard_data),
+    ):
+        await timed(loader, heavy, min(5, args.runs))  # warm caches
+        report(name, await timed(loader, heavy, args.runs))
+
+    # Many users opening the dashboard at once
+    for name, loader in (
+        ("sequential", sequential_dashboard_data),
+        ("concurrent", concurrent_dashboard_data),
+    ):
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(loader(heavy[i % len(heavy)]) for i in range(args.concurrency))
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{name:<12} {args.concurrency} concurrent loads in {elapsed:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--heavy-users", type=int, default=3)
+    parser.add_argument("--predictions", type=int, default=10_000)
+    parser.add_argument("--light-users", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,407 @@
+"""
+Activity Event Feed
+An append-only `activity_events` collection with one small document per
+prediction, appointment, medication log, journal entry and signup, written
+alongside the record it describes. Each event keeps the source record's
+_id and carries the timeline entry already rendered, so the user timeline
+and the admin activity feed are each one indexed range scan over this
+collection instead of a query per source collection merged in Python.
+
+    {_id: <source _id>, email, type,
+     date,        # timeline position (an appointment's own date)
+     created_at,  # when it happened, orders the admin feed
+     event,       # rendered timeline entry (None for signups)
+     summary,     # one-line description for the admin feed
+     expires_at}  # TTL, only when ACTIVITY_EVENTS_RETENTION_DAYS is set
+
+Predictions, medication logs and signups never change, so their events go
+through the write-behind buffer (flushed before the timeline is read). Appointments and journal entries can be
+edited or removed and write directly, so a follow-up update or delete
+always finds the event.
+
+Records stored before the feed existed are backfilled once, in the
+background on the first startup; completion is recorded in `migrations`.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from config.settings import ACTIVITY_EVENTS_RETENTION_DAYS
+from database.connection import db
+from services.ml_service import differential_as_dicts
+from services.write_behind import flush_write_behind, persist
+from utils.helpers import serialize_date
+from utils.pagination import paginate
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+BACKFILL_MIGRATION = "activity_events_backfill"
+
+_task: Optional[asyncio.Task] = None
+_stats = {"recorded": 0, "updated": 0, "removed": 0, "errors": 0, "last_backfill": None}
+
+
+def _day_key(value) -> datetime:
+    """Appointments may store the date as a YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+# --- Rendering ---
+
+
+def _prediction_severity(prediction: str) -> str:
+    """Map prediction to severity level"""
+    high_risk = {
+        "heart attack",
+        "stroke",
+        "diabetes",
+        "hepatitis",
+        "malaria",
+        "tuberculosis",
+        "pneumonia",
+        "aids",
+        "jaundice",
+    }
+    prediction_lower = prediction.lower()
+    for disease in high_risk:
+        if disease in prediction_lower:
+            return "high"
+    return "medium"
+
+
+def _mood_to_severity(mood: str) -> str:
+    """Map mood to severity for display"""
+    mapping = {
+        "great": "low",
+        "good": "low",
+        "okay": "medium",
+        "bad": "high",
+        "terrible": "high",
+    }
+    return mapping.get(mood, "medium")
+
+
+def _prediction_event(pred: dict) -> dict:
+    return {
+        "id": str(pred["_id"]),
+        "type": "prediction",
+        "title": pred.get("ml_prediction", "Disease Prediction"),
+        "description": f"Symptoms: {', '.join(pred.get('symptoms', [])[:5])}",
+        "details": {
+            "symptoms": pred.get("symptoms", []),
+            "specialist": pred.get("specialist"),
+            "enhanced": pred.get("enhanced", False),
+            "confidence": pred.get("confidence"),
+            "differential": differential_as_dicts(pred.get("differential")),
+        },
+        "severity": _prediction_severity(pred.get("ml_prediction", "")),
+        "icon": "stethoscope",
+        "date": serialize_date(pred.get("created_at")),
+    }
+
+
+def _appointment_event(apt: dict) -> dict:
+    apt_date = apt.get("date", "")
+    return {
+        "id": str(apt["_id"]),
+        "type": "appointment",
+        "title": f"Appointment with Dr. {apt.get('doctorName', apt.get('doctor_name', 'Unknown'))}",
+        "description": apt.get("doctorSpecialization", apt.get("specialization", "")),
+        "details": {
+            "doctor": apt.get("doctorName", apt.get("doctor_name")),
+            "specialization": apt.get(
+                "doctorSpecialization", apt.get("specialization")
+            ),
+            "location": apt.get("doctorLocation", apt.get("location")),
+            "time": apt.get("time"),
+            "status": apt.get("status", "scheduled"),
+        },
+        "severity": "info",
+        "icon": "calendar",
+        "date": apt_date if isinstance(apt_date, str) else serialize_date(apt_date),
+    }
+
+
+def _medication_log_event(log: dict) -> dict:
+    action = "Skipped" if log.get("skipped") else "Taken"
+    return {
+        "id": str(log["_id"]),
+        "type": "medication_log",
+        "title": f"Medication {action}: {log.get('medication_name', 'Unknown')}",
+        "description": log.get("notes", ""),
+        "details": {
+            "medication_id": log.get("medication_id"),
+            "medication_name": log.get("medication_name"),
+            "skipped": log.get("skipped", False),
+        },
+        "severity": "low" if not log.get("skipped") else "medium",
+        "icon": "pill",
+        "date": serialize_date(log.get("logged_at")),
+    }
+
+
+def _journal_event(entry: dict) -> dict:
+    return {
+        "id": str(entry["_id"]),
+        "type": "journal",
+        "title": entry.get("title", "Journal Entry"),
+        "description": entry.get("content", "")[:200],
+        "details": {
+            "content": entry.get("content", ""),
+            "mood": entry.get("mood"),
+            "symptoms": entry.get("symptoms", []),
+            "detected_symptoms": entry.get("detected_symptoms", []),
+            "tags": entry.get("tags", []),
+            "pain_level": entry.get("pain_level"),
+        },
+        "severity": _mood_to_severity(entry.get("mood")),
+        "icon": "journal",
+        "date": serialize_date(entry.get("created_at")),
+    }
+
+
+class ActivitySource(NamedTuple):
+    collection: str
+    owner_field: str
+    time_field: str  # timeline position
+    created_field: str  # when the record was made
+    to_event: Optional[Callable[[dict], dict]]  # None: not shown on the timeline
+    to_summary: Callable[[dict], str]
+
+
+ACTIVITY_SOURCES: Dict[str, ActivitySource] = {
+    "prediction": ActivitySource(
+        "predictions",
+        "email",
+        "created_at",
+        "created_at",
+        _prediction_event,
+        lambda d: f"Disease prediction: {d.get('ml_prediction', 'N/A')}",
+    ),
+    "appointment": ActivitySource(
+        "appointments",
+        "user_email",
+        "date",
+        "created_at",
+        _appointment_event,
+        lambda d: f"Appointment with {d.get('doctorName', d.get('doctor_name', 'N/A'))}",
+    ),
+    "medication_log": ActivitySource(
+        "medication_logs",
+        "email",
+        "logged_at",
+        "logged_at",
+        _medication_log_event,
+        lambda d: "Medication skipped" if d.get("skipped") else "Medication taken",
+    ),
+    "journal": ActivitySource(
+        "journal_entries",
+        "email",
+        "created_at",
+        "created_at",
+        _journal_event,
+        lambda d: "Journal entry added",
+    ),
+    "signup": ActivitySource(
+        "store",
+        "email",
+        "created_at",
+        "created_at",
+        None,
+        lambda d: f"New user registered: {d.get('name', d.get('email', 'N/A'))}",
+    ),
+}
+TIMELINE_TYPES = [t for t, s in ACTIVITY_SOURCES.items() if s.to_event]
+BUFFERED_TYPES = {"prediction", "medication_log", "signup"}
+
+
+def build_event(event_type: str, doc: dict) -> Dict[str, Any]:
+    """activity_events document for a source record (raises on a bad date)"""
+    source = ACTIVITY_SOURCES[event_type]
+    created_at = doc.get(source.created_field) or datetime.utcnow()
+    event = {
+        "_id": doc["_id"],
+        "email": doc.get(source.owner_field),
+        "type": event_type,
+        "date": _day_key(doc.get(source.time_field) or created_at),
+        "created_at": created_at,
+        "event": source.to_event(doc) if source.to_event else None,
+        "summary": source.to_summary(doc),
+    }
+    if ACTIVITY_EVENTS_RETENTION_DAYS > 0:
+        event["expires_at"] = created_at + timedelta(
+            days=ACTIVITY_EVENTS_RETENTION_DAYS
+        )
+    return event
+
+
+# --- Writes (never fail the request; the backfill repairs gaps) ---
+
+
+async def record_activity(event_type: str, doc: dict):
+    """Append the event for a record that was just inserted (doc has its _id)"""
+    try:
+        event = build_event(event_type, doc)
+        if event_type in BUFFERED_TYPES:
+            await persist("activity_events", event)
+        else:
+            await db.activity_events.insert_one(event)
+        _stats["recorded"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.warning(f"Failed to record {event_type} activity: {e}")
+
+
+async def update_activity(event_type: str, doc: dict):
+    """Re-render the event after its record was edited"""
+    try:
+        event = build_event(event_type, doc)
+        await db.activity_events.replace_one({"_id": event["_id"]}, event, upsert=True)
+        _stats["updated"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.warning(f"Failed to update {event_type} activity: {e}")
+
+
+async def remove_activity(source_id):
+    try:
+        await db.activity_events.delete_one({"_id": source_id})
+        _stats["removed"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.warning(f"Failed to remove activity {source_id}: {e}")
+
+
+async def delete_user_activity(email: str):
+    await db.activity_events.delete_many({"email": email})
+
+
+# --- Reads ---
+
+
+async def user_timeline(
+    email: str,
+    since: datetime,
+    event_type: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first rendered events of one user from `since`, and the next cursor"""
+    await flush_write_behind("activity_events")
+    query: Dict[str, Any] = {
+        "email": email,
+        "type": event_type or {"$in": TIMELINE_TYPES},
+        "date": {"$gte": since},
+    }
+    rows, next_cursor = await paginate(
+        db.activity_events, query, "date", -1, limit, cursor, {"date": 1, "event": 1}
+    )
+    return [row["event"] for row in rows], next_cursor
+
+
+async def recent_activity(limit: int = 20) -> List[Dict[str, Any]]:
+    """Platform-wide feed, most recent first"""
+    cursor = (
+        db.activity_events.find(
+            {}, {"type": 1, "email": 1, "summary": 1, "created_at": 1, "event.icon": 1}
+        )
+        .sort("created_at", -1)
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+
+# --- Backfill ---
+
+
+async def _insert_new(events: List[Dict[str, Any]]) -> int:
+    """Insert events, skipping ones already present; returns the number inserted"""
+    try:
+        result = await db.activity_events.insert_many(events, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        return e.details.get("nInserted", 0)
+
+
+async def backfill_activity_events(
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Create events for records stored before the feed existed (or missed by
+    a failed write). Events keep their source _id, so this is idempotent.
+    """
+    # Events still queued would otherwise be inserted twice (and skipped)
+    await flush_write_behind("activity_events")
+    result: Dict[str, Any] = {}
+    for event_type, source in ACTIVITY_SOURCES.items():
+        counts = {"scanned": 0, "inserted": 0, "skipped": 0}
+        batch: List[Dict[str, Any]] = []
+        cursor = (
+            db[source.collection]
+            .find(
+                {source.owner_field: {"$exists": True}},
+                {"password": 0, "symptom_bits": 0},
+            )
+            .batch_size(batch_size)
+        )
+        async for doc in cursor:
+            counts["scanned"] += 1
+            try:
+                batch.append(build_event(event_type, doc))
+            except (KeyError, TypeError, ValueError):
+                counts["skipped"] += 1
+                continue
+            if len(batch) >= batch_size:
+                counts["inserted"] += await _insert_new(batch)
+                batch = []
+        if batch:
+            counts["inserted"] += await _insert_new(batch)
+        result[event_type] = counts
+    _stats["last_backfill"] = {"at": datetime.utcnow(), **result}
+    await db.migrations.update_one(
+        {"_id": BACKFILL_MIGRATION},
+        {"$set": {"completed_at": datetime.utcnow(), "result": result}},
+        upsert=True,
+    )
+    logger.info(f"Activity event backfill: {result}")
+    return result
+
+
+async def _backfill_once():
+    try:
+        if await db.migrations.find_one({"_id": BACKFILL_MIGRATION}):
+            return
+        logger.info("Backfilling activity events for existing records")
+        await backfill_activity_events()
+    except Exception as e:
+        logger.error(f"Activity event backfill failed: {e}")
+
+
+def start_activity_backfill():
+    """Backfill in the background unless it already completed once"""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_backfill_once())
+
+
+async def stop_activity_backfill():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _task = None
+
+
+def get_activity_feed_stats() -> Dict[str, Any]:
+    return {"retention_days": ACTIVITY_EVENTS_RETENTION_DAYS, **_stats}
@@ -16,6 +16,9 @@ from jose import jwt, JWTError
 from database.connection import db
 from utils.security import hash_password, verify_password
 from config.settings import SECRET_KEY
+from services.activity_feed import record_activity
+from services.user_stats import record_profile
+from services.rollups import record_rollup, signup_counters
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +85,12 @@ async def register_user(user_data: Dict) -> Dict:
         # Explicitly ensure _id is handled if not added in-place
         if "_id" not in user_data:
             user_data["_id"] = new_user.inserted_id
+        await record_activity("signup", user_data)
+        # Gives the account a user_stats document, so activity-sorted listings see it
+        await record_profile(user_data["email"], user_data)
+        await record_rollup(
+            "signups", user_data["created_at"], signup_counters(user_data)
+        )
 
         token = create_access_token(user_data["email"])
 
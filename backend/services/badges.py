@@ -0,0 +1,250 @@
+"""
+Badge Engine
+Badges are evaluated when the activity behind them happens, not when the
+gamification page is read. services.user_stats calls award_badges() with a
+user's freshly updated stats document after each tracked write (prediction
+stored, journal entry, medication logged, profile updated); badges whose
+thresholds are now met are written to the document once and pushed to the
+user as a notification.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+BADGES = [
+    {
+        "id": "first_prediction",
+        "name": "First Step",
+        "description": "Made your first disease prediction",
+        "icon": "🔬",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "predictions",
+    },
+    {
+        "id": "prediction_5",
+        "name": "Health Detective",
+        "description": "Made 5 disease predictions",
+        "icon": "🕵️",
+        "threshold": 5,
+        "source": "counter",
+        "counter": "predictions",
+    },
+    {
+        "id": "prediction_20",
+        "name": "Prediction Pro",
+        "description": "Made 20 disease predictions",
+        "icon": "🏆",
+        "threshold": 20,
+        "source": "counter",
+        "counter": "predictions",
+    },
+    {
+        "id": "first_appointment",
+        "name": "Doctor Visit",
+        "description": "Booked your first appointment",
+        "icon": "📅",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "appointments",
+    },
+    {
+        "id": "appointment_5",
+        "name": "Regular Patient",
+        "description": "Booked 5 appointments",
+        "icon": "⭐",
+        "threshold": 5,
+        "source": "counter",
+        "counter": "appointments",
+    },
+    {
+        "id": "first_medication",
+        "name": "Pill Tracker",
+        "description": "Added your first medication",
+        "icon": "💊",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "medications",
+    },
+    {
+        "id": "first_journal",
+        "name": "Health Journalist",
+        "description": "Wrote your first journal entry",
+        "icon": "📝",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "journal_entries",
+    },
+    {
+        "id": "journal_10",
+        "name": "Diary Keeper",
+        "description": "Wrote 10 journal entries",
+        "icon": "📖",
+        "threshold": 10,
+        "source": "counter",
+        "counter": "journal_entries",
+    },
+    {
+        "id": "first_report",
+        "name": "Report Card",
+        "description": "Generated your first health report",
+        "icon": "📄",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "reports",
+    },
+    {
+        "id": "family_care",
+        "name": "Family Guardian",
+        "description": "Added a family member profile",
+        "icon": "👨‍👩‍👧‍👦",
+        "threshold": 1,
+        "source": "counter",
+        "counter": "family_profiles",
+    },
+    {
+        "id": "profile_complete",
+        "name": "Identity Verified",
+        "description": "Completed your health profile",
+        "icon": "✅",
+        "threshold": -1,
+        "source": "special",
+    },
+    {
+        "id": "week_streak_3",
+        "name": "3-Week Warrior",
+        "description": "Maintained a 3-week check-in streak",
+        "icon": "🔥",
+        "threshold": 3,
+        "source": "special_streak",
+    },
+    {
+        "id": "week_streak_7",
+        "name": "Monthly Champion",
+        "description": "Maintained a 7-week check-in streak",
+        "icon": "💎",
+        "threshold": 7,
+        "source": "special_streak",
+    },
+    {
+        "id": "med_adherence_90",
+        "name": "Discipline Master",
+        "description": "Achieved 90%+ medication adherence",
+        "icon": "🎯",
+        "threshold": 90,
+        "source": "special_adherence",
+    },
+]
+
+# Counters whose records count as a weekly check-in for streaks
+STREAK_COUNTERS = ("predictions", "journal_entries", "medication_logs")
+MAX_STREAK_WEEKS = 52
+PROFILE_FIELDS = ["name", "age", "gender", "height", "weight", "phone", "city"]
+
+
+def week_start(dt: datetime) -> datetime:
+    """Monday 00:00 UTC of dt's week (same bucket as $dateTrunc unit=week)"""
+    monday = dt - timedelta(days=dt.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def streak_weeks(
+    active_weeks: Iterable[datetime], now: Optional[datetime] = None
+) -> int:
+    """
+    Consecutive calendar weeks with activity, counting back from this week.
+    A week still in progress doesn't break the streak before its first check-in.
+    """
+    weeks = set(active_weeks)
+    week = week_start(now or datetime.utcnow())
+    if week not in weeks:
+        week -= timedelta(weeks=1)
+
+    streak = 0
+    while week in weeks and streak < MAX_STREAK_WEEKS:
+        streak += 1
+        week -= timedelta(weeks=1)
+    return streak
+
+
+def is_profile_complete(profile: Dict[str, Any]) -> bool:
+    return all(profile.get(field) for field in PROFILE_FIELDS)
+
+
+def badge_progress(badge: Dict[str, Any], stats: Dict[str, Any], streak: int):
+    """
+    Current value of the quantity a badge's threshold applies to. `stats` is
+    shaped like get_user_stats() output: adherence is the percentage itself.
+    """
+    if badge["source"] == "special":
+        return is_profile_complete(stats.get("profile") or {})
+    if badge["source"] == "special_streak":
+        return streak
+    if badge["source"] == "special_adherence":
+        return stats.get("adherence") or 0.0
+    return (stats.get("counts") or {}).get(badge["counter"], 0)
+
+
+def is_met(badge: Dict[str, Any], progress) -> bool:
+    if badge["source"] == "special":
+        return bool(progress)
+    return progress >= badge["threshold"]
+
+
+async def award_badges(
+    stats: Optional[Dict[str, Any]], notify: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Persist badges newly met by a user_stats document. Each award is a
+    conditional update, so a badge is granted (and announced) at most once
+    even when concurrent writes evaluate the same threshold.
+    """
+    if not stats:
+        return []
+    email = stats["_id"]
+    earned = stats.setdefault("badges", {})
+    streak = streak_weeks(stats.get("active_weeks") or [])
+    progress_stats = {
+        "counts": stats.get("counts") or {},
+        "profile": stats.get("profile") or {},
+        "adherence": (stats.get("adherence") or {}).get("percentage", 0.0),
+    }
+    awarded = []
+    for badge in BADGES:
+        if badge["id"] in earned or not is_met(
+            badge, badge_progress(badge, progress_stats, streak)
+        ):
+            continue
+        now = datetime.utcnow()
+        field = f"badges.{badge['id']}"
+        result = await db.user_stats.update_one(
+            {"_id": email, field: {"$exists": False}}, {"$set": {field: now}}
+        )
+        if result.modified_count:
+            earned[badge["id"]] = now
+            awarded.append(badge)
+
+    if notify:
+        for badge in awarded:
+            await _announce(email, badge)
+    return awarded
+
+
+async def _announce(email: str, badge: Dict[str, Any]):
+    try:
+        from routes.notifications import notify_user
+
+        await notify_user(
+            email,
+            f"{badge['icon']} Badge earned: {badge['name']}",
+            badge["description"],
+            ntype="success",
+            link="/achievements",
+        )
+    except Exception as e:
+        logger.warning(f"Badge notification failed for {email}: {e}")
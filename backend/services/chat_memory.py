@@ -0,0 +1,207 @@
+"""
+Chat Memory
+Multi-turn context for the health chat. Each conversation keeps its most
+recent turns verbatim within CHAT_MEMORY_TOKEN_BUDGET; turns that no longer
+fit are folded into a rolling summary (one Gemini call per batch of evicted
+turns, in the background), so prompt size stays flat however long the
+conversation gets.
+
+State lives in-process and is rebuilt from `chat_summaries` + `chat_history`
+on a miss; new turns are persisted through the write-behind buffer.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from config.settings import CHAT_MEMORY_MAX_CONVERSATIONS, CHAT_MEMORY_TOKEN_BUDGET
+from database.connection import db
+from services.write_behind import flush_write_behind, persist
+
+logger = logging.getLogger(__name__)
+
+# Turns read back from chat_history when rebuilding a conversation
+MAX_LOADED_TURNS = 30
+# Evicted turns kept while the summarizer is failing; older ones are lost
+MAX_UNSUMMARIZED_TURNS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text or "") // 4 + 1
+
+
+class ConversationState:
+    def __init__(self, summary: str = "", summarized_until: Optional[datetime] = None):
+        self.summary = summary
+        self.summarized_until = summarized_until
+        self.turns: Deque[Dict[str, Any]] = deque()
+        self.turn_tokens = 0
+        # Evicted from the window but not yet merged into the summary
+        self.unsummarized: List[Dict[str, Any]] = []
+        self.summarizing = False
+
+    def add_turn(self, turn: Dict[str, Any]):
+        turn["tokens"] = estimate_tokens(turn["message"]) + estimate_tokens(
+            turn["response"]
+        )
+        self.turns.append(turn)
+        self.turn_tokens += turn["tokens"]
+
+    def evict_over_budget(self, budget: int):
+        """Move the oldest turns out of the window until it fits the budget"""
+        available = budget - estimate_tokens(self.summary)
+        # Always keep the latest turn so a follow-up question has its antecedent
+        while len(self.turns) > 1 and self.turn_tokens > available:
+            turn = self.turns.popleft()
+            self.turn_tokens -= turn["tokens"]
+            self.unsummarized.append(turn)
+        if len(self.unsummarized) > MAX_UNSUMMARIZED_TURNS:
+            del self.unsummarized[:-MAX_UNSUMMARIZED_TURNS]
+
+    def prompt_history(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary,
+            "turns": [
+                {"message": t["message"], "response": t["response"]} for t in self.turns
+            ],
+        }
+
+
+_conversations: "OrderedDict[Tuple[str, str], ConversationState]" = OrderedDict()
+_background: Set[asyncio.Task] = set()
+_stats = {"loads": 0, "summaries": 0, "summary_failures": 0}
+
+
+async def _load_conversation(email: str, conversation_id: str) -> ConversationState:
+    _stats["loads"] += 1
+    # Turns still queued in the write-behind buffer would be missing
+    await flush_write_behind("chat_history")
+    summary_doc = await db.chat_summaries.find_one(
+        {"email": email, "conversation_id": conversation_id}
+    )
+    state = ConversationState(
+        summary=(summary_doc or {}).get("summary", ""),
+        summarized_until=(summary_doc or {}).get("summarized_until"),
+    )
+    query: Dict[str, Any] = {"email": email, "conversation_id": conversation_id}
+    if state.summarized_until:
+        query["created_at"] = {"$gt": state.summarized_until}
+    cursor = (
+        db.chat_history.find(
+            query, {"message": 1, "response": 1, "created_at": 1, "_id": 0}
+        )
+        .sort("created_at", -1)
+        .limit(MAX_LOADED_TURNS)
+    )
+    for turn in reversed(await cursor.to_list(length=MAX_LOADED_TURNS)):
+        state.add_turn(turn)
+    return state
+
+
+async def _get_state(email: str, conversation_id: str) -> ConversationState:
+    key = (email, conversation_id)
+    state = _conversations.get(key)
+    if state is None:
+        state = await _load_conversation(email, conversation_id)
+        # Another request may have loaded it while we awaited
+        state = _conversations.setdefault(key, state)
+        while len(_conversations) > CHAT_MEMORY_MAX_CONVERSATIONS:
+            _conversations.popitem(last=False)
+    _conversations.move_to_end(key)
+    state.evict_over_budget(CHAT_MEMORY_TOKEN_BUDGET)
+    _schedule_summary(email, conversation_id, state)
+    return state
+
+
+async def get_chat_history(email: str, conversation_id: str) -> Dict[str, Any]:
+    """Rolling summary + recent turns for the prompt, within the token budget"""
+    state = await _get_state(email, conversation_id)
+    return state.prompt_history()
+
+
+async def record_turn(email: str, conversation_id: str, message: str, response: str):
+    """Persist a completed turn and add it to the conversation window"""
+    created_at = datetime.utcnow()
+    await persist(
+        "chat_history",
+        {
+            "email": email,
+            "conversation_id": conversation_id,
+            "message": message,
+            "response": response,
+            "created_at": created_at,
+        },
+    )
+    state = _conversations.get((email, conversation_id))
+    if state is None:
+        # Not in memory (evicted); the next read rebuilds it from the DB
+        return
+    state.add_turn({"message": message, "response": response, "created_at": created_at})
+    state.evict_over_budget(CHAT_MEMORY_TOKEN_BUDGET)
+    _schedule_summary(email, conversation_id, state)
+
+
+def _schedule_summary(email: str, conversation_id: str, state: ConversationState):
+    if state.unsummarized and not state.summarizing:
+        state.summarizing = True
+        task = asyncio.create_task(_summarize(email, conversation_id, state))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
+async def _summarize(email: str, conversation_id: str, state: ConversationState):
+    """Merge evicted turns into the summary incrementally (old summary + new turns)"""
+    from services.gemini_service import gemini_summarize_conversation
+
+    try:
+        while state.unsummarized:
+            batch = list(state.unsummarized)
+            summary = await gemini_summarize_conversation(state.summary, batch)
+            if not summary:
+                _stats["summary_failures"] += 1
+                return
+            state.summary = summary
+            state.summarized_until = batch[-1]["created_at"]
+            folded = {id(turn) for turn in batch}
+            state.unsummarized = [
+                turn for turn in state.unsummarized if id(turn) not in folded
+            ]
+            _stats["summaries"] += 1
+            await db.chat_summaries.update_one(
+                {"email": email, "conversation_id": conversation_id},
+                {
+                    "$set": {
+                        "summary": summary,
+                        "summarized_until": state.summarized_until,
+                        "updated_at": datetime.utcnow(),
+                    },
+                    "$inc": {"turns_summarized": len(batch)},
+                    "$setOnInsert": {"created_at": datetime.utcnow()},
+                },
+                upsert=True,
+            )
+            # A longer summary leaves less room for verbatim turns
+            state.evict_over_budget(CHAT_MEMORY_TOKEN_BUDGET)
+    except Exception as e:
+        _stats["summary_failures"] += 1
+        logger.warning(f"Chat summary update failed for {conversation_id}: {e}")
+    finally:
+        state.summarizing = False
+
+
+def forget_user(email: str):
+    """Drop in-memory conversations of a deleted user"""
+    for key in [key for key in _conversations if key[0] == email]:
+        _conversations.pop(key, None)
+
+
+def get_chat_memory_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "conversations": len(_conversations),
+        "token_budget": CHAT_MEMORY_TOKEN_BUDGET,
+        "summarizing": len(_background),
+    }
@@ -0,0 +1,615 @@
+"""
+Emergency Phrase Detector
+Local, LLM-free triage for chat messages and symptom descriptions. A single
+Aho-Corasick pass over the normalized text maps curated English, Hindi and
+romanized-Hindi phrases to clinical signals; rules over those signals decide
+whether the message describes an emergency, in which case the caller returns
+EMERGENCY_GUIDANCE immediately instead of waiting for Gemini.
+
+Matching is per clause. A phrase is dropped when it is negated ("no chest
+pain"), refers to history ("takes medicine for seizures", "chest pain two
+years ago") or sits inside a benign phrase ("food poisoning"). Generic nouns
+("overdose", "seizures", "paralysis", "choking") only count together with an
+acute cue ("is having", "right now") or a second finding.
+"""
+
+import time
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from utils.aho_corasick import AhoCorasick, is_word_char
+from utils.text import CLAUSE_BOUNDARIES, DEVANAGARI, is_negated, normalize_text
+
+# ============================================
+# 📖 PHRASES → SIGNALS
+# ============================================
+# Romanized Hindi is listed under "hi" — users often type Hindi in Latin script.
+# Hindi phrases match as stems ("दौरा पड़" matches "दौरा पड़ा"); English ones
+# must end on a word boundary.
+
+SIGNAL_PHRASES: Dict[str, Dict[str, List[str]]] = {
+    "chest_pain": {
+        "en": [
+            "chest pain",
+            "pain in my chest",
+            "pain in chest",
+            "chest tightness",
+            "tightness in my chest",
+            "tight chest",
+            "chest pressure",
+            "pressure in my chest",
+            "heart pain",
+        ],
+        "hi": [
+            "सीने में दर्द",
+            "सीने मे दर्द",
+            "छाती में दर्द",
+            "छाती मे दर्द",
+            "सीने में जकड़न",
+            "दिल में दर्द",
+            "seene mein dard",
+            "seene me dard",
+            "sine me dard",
+            "chhati mein dard",
+            "chhati me dard",
+            "chati me dard",
+        ],
+    },
+    "severe_chest_pain": {
+        "en": [
+            "crushing chest",
+            "crushing pain in my chest",
+            "crushing pain in chest",
+            "chest feels crushed",
+            "elephant on my chest",
+        ],
+        "hi": [],
+    },
+    "breathlessness": {
+        "en": [
+            "shortness of breath",
+            "short of breath",
+            "difficulty breathing",
+            "trouble breathing",
+            "hard to breathe",
+            "breathless",
+            "breathing problem",
+            "out of breath",
+        ],
+        "hi": [
+            "सांस लेने में तकलीफ",
+            "सांस लेने में दिक्कत",
+            "सांस फूल",
+            "सांस की तकलीफ",
+            "saans lene mein takleef",
+            "saans lene me dikkat",
+            "sans lene me dikkat",
+            "saans phool",
+            "sans phool",
+        ],
+    },
+    "severe_breathing": {
+        "en": [
+            "cant breathe",
+            "cannot breathe",
+            "can not breathe",
+            "unable to breathe",
+            "struggling to breathe",
+            "gasping for air",
+            "is choking",
+            "im choking",
+            "choking on",
+            "lips turning blue",
+            "turning blue",
+        ],
+        "hi": [
+            "सांस नहीं आ रही",
+            "सांस नहीं ले पा",
+            "दम घुट",
+            "saans nahi aa rahi",
+            "sans nahi aa rahi",
+            "saans nahi le pa",
+            "dam ghut",
+        ],
+    },
+    "sweating": {
+        "en": ["cold sweat", "sweating", "sweaty", "clammy"],
+        "hi": ["ठंडा पसीना", "पसीना", "thanda pasina", "pasina", "paseena"],
+    },
+    "radiating_pain": {
+        "en": [
+            "left arm pain",
+            "pain in my left arm",
+            "pain in left arm",
+            "arm pain",
+            "jaw pain",
+            "pain in my jaw",
+            "pain spreading to my arm",
+            "radiating",
+        ],
+        "hi": [
+            "बाएं हाथ में दर्द",
+            "बाये हाथ में दर्द",
+            "जबड़े में दर्द",
+            "baaye haath mein dard",
+            "baye hath me dard",
+            "jabde mein dard",
+        ],
+    },
+    "face_droop": {
+        "en": [
+            "face drooping",
+            "facial droop",
+            "face droop",
+            "face is drooping",
+            "drooping face",
+            "face is numb on one side",
+            "mouth drooping",
+        ],
+        "hi": ["चेहरा टेढ़ा", "मुंह टेढ़ा", "chehra tedha", "muh tedha", "munh tedha"],
+    },
+    "speech_difficulty": {
+        "en": [
+            "slurred speech",
+            "slurring",
+            "speech is slurred",
+            "cant speak",
+            "cannot speak",
+            "difficulty speaking",
+            "trouble speaking",
+            "words are jumbled",
+        ],
+        "hi": [
+            "बोलने में दिक्कत",
+            "बोल नहीं पा",
+            "जुबान लड़खड़ा",
+            "bolne mein dikkat",
+            "bolne me dikkat",
+            "bol nahi pa",
+            "zubaan ladkhada",
+            "juban ladkhada",
+        ],
+    },
+    "one_sided_weakness": {
+        "en": [
+            "weakness on one side",
+            "one side weakness",
+            "numbness on one side",
+            "numb on one side",
+            "cant move my arm",
+            "cannot move my arm",
+            "cant move my leg",
+            "sudden weakness",
+            "paralyzed",
+        ],
+        "hi": [
+            "एक तरफ कमजोरी",
+            "लकवा मार",
+            "हाथ नहीं हिल",
+            "ek taraf kamzori",
+            "lakwa mar",
+            "lakva mar",
+            "haath nahi hil",
+            "hath nahi hil",
+        ],
+    },
+    "thunderclap_headache": {
+        "en": [
+            "worst headache",
+            "thunderclap headache",
+            "sudden severe headache",
+            "worst headache of my life",
+        ],
+        "hi": ["असहनीय सिरदर्द", "अचानक तेज सिरदर्द", "achanak tez sir dard"],
+    },
+    "throat_swelling": {
+        "en": [
+            "throat swelling",
+            "throat is swelling",
+            "swollen throat",
+            "throat closing",
+            "throat is closing",
+            "tongue swelling",
+            "swollen tongue",
+            "lips swelling",
+            "swollen lips",
+            "anaphylaxis",
+            "anaphylactic",
+        ],
+        "hi": [
+            "गले में सूजन",
+            "गला बंद",
+            "जीभ में सूजन",
+            "होंठ सूज",
+            "gale mein sujan",
+            "gale me sujan",
+            "gala band",
+            "jeebh mein sujan",
+            "honth sooj",
+        ],
+    },
+    "allergic_reaction": {
+        "en": [
+            "allergic reaction",
+            "hives",
+            "bee sting",
+            "wasp sting",
+            "peanut allergy",
+        ],
+        "hi": ["एलर्जी", "allergy ho gayi", "allergy ho gai"],
+    },
+    "unconscious": {
+        "en": [
+            "unconscious",
+            "passed out",
+            "fainted",
+            "not responding",
+            "unresponsive",
+            "collapsed",
+            "wont wake up",
+        ],
+        "hi": ["बेहोश", "होश नहीं", "behosh", "hosh nahi"],
+    },
+    "seizure": {
+        "en": [
+            "having a seizure",
+            "having seizures",
+            "seizing",
+            "convulsing",
+            "having a fit",
+        ],
+        "hi": ["दौरा पड़", "daura pad"],
+    },
+    "severe_bleeding": {
+        "en": [
+            "heavy bleeding",
+            "bleeding heavily",
+            "wont stop bleeding",
+            "bleeding wont stop",
+            "uncontrolled bleeding",
+            "vomiting blood",
+            "coughing up blood",
+            "blood in vomit",
+        ],
+        "hi": [
+            "खून बंद नहीं",
+            "बहुत खून",
+            "खून की उल्टी",
+            "khoon band nahi",
+            "bahut khoon",
+            "khoon ki ulti",
+            "khun ki ulti",
+        ],
+    },
+    "suicidal": {
+        "en": [
+            "suicide",
+            "suicidal",
+            "kill myself",
+            "end my life",
+            "want to die",
+            "self harm",
+            "hurt myself",
+            "better off dead",
+        ],
+        "hi": [
+            "आत्महत्या",
+            "खुदकुशी",
+            "मरना चाहता",
+            "मरना चाहती",
+            "जीना नहीं चाहता",
+            "जीना नहीं चाहती",
+            "aatmahatya",
+            "atmahatya",
+            "khudkushi",
+            "marna chahta",
+            "marna chahti",
+            "jeena nahi chahta",
+            "jeena nahi chahti",
+        ],
+    },
+    "poisoning": {
+        "en": [
+            "swallowed poison",
+            "drank poison",
+            "took too many pills",
+            "overdosed",
+        ],
+        "hi": ["जहर खा", "जहर पी", "zeher kha", "zehar kha", "zehar pi", "jahar kha"],
+    },
+    "vision_loss": {
+        "en": [
+            "sudden vision loss",
+            "lost my vision",
+            "suddenly cant see",
+            "sudden blindness",
+        ],
+        "hi": ["अचानक दिखना बंद", "achanak dikhna band"],
+    },
+    # Generic nouns, also used in questions and history ("what is the overdose
+    # limit", "epilepsy medicine for seizures"): they need an acute cue or a
+    # second finding (see EMERGENCY_RULES)
+    "poisoning_mention": {
+        "en": ["poisoning", "poison", "overdose"],
+        "hi": ["जहर", "zeher", "zehar", "jahar"],
+    },
+    "seizure_mention": {
+        "en": ["seizure", "seizures", "convulsion", "convulsions", "fits"],
+        "hi": ["मिर्गी", "दौरा", "mirgi", "daura"],
+    },
+    "paralysis_mention": {
+        "en": ["paralysis"],
+        "hi": ["लकवा", "lakwa", "lakva"],
+    },
+    "choking_mention": {
+        "en": ["choking", "choke"],
+        "hi": [],
+    },
+    "acute": {
+        "en": [
+            "right now",
+            "just now",
+            "happening now",
+            "just had",
+            "is having",
+            "am having",
+            "im having",
+            "are having",
+            "keeps",
+            "wont stop",
+            "not stopping",
+            "help me",
+        ],
+        "hi": ["अभी", "हो रहा", "हो रही", "abhi", "ho raha", "ho rahi"],
+    },
+}
+
+# Common conditions that contain a signal phrase but are not emergencies;
+# signals matched inside them are dropped
+BENIGN_PHRASES = ["food poisoning", "sleep paralysis", "bells palsy"]
+
+# Cues that a phrase describes history rather than what is happening now:
+# before the phrase ("history of", "medicine for") or after it ("2 years ago")
+HISTORY_BEFORE = {
+    "had",
+    "history",
+    "previous",
+    "previously",
+    "past",
+    "used",
+    "diagnosed",
+    "treated",
+    "medicine",
+    "medicines",
+    "medication",
+    "medications",
+    "tablets",
+    "pehle",
+    "पहले",
+}
+HISTORY_AFTER = {"year", "years", "month", "months", "saal", "साल"}
+# "have had chest pain since morning" is still going on, "just had" just happened
+RECENT_BEFORE_HAD = {
+    "have",
+    "has",
+    "ive",
+    "hes",
+    "shes",
+    "weve",
+    "theyve",
+    "just",
+    "now",
+}
+HISTORY_WINDOW = 3
+
+# ============================================
+# ⚖️ RULES: signals → emergency type
+# ============================================
+# Each rule is a list of alternatives; an alternative fires when all of its
+# signals are present.
+
+EMERGENCY_RULES: Dict[str, List[Tuple[str, ...]]] = {
+    "cardiac": [
+        ("severe_chest_pain",),
+        ("chest_pain", "acute"),
+        ("chest_pain", "breathlessness"),
+        ("chest_pain", "severe_breathing"),
+        ("chest_pain", "sweating"),
+        ("chest_pain", "radiating_pain"),
+    ],
+    "stroke": [
+        ("face_droop",),
+        ("speech_difficulty",),
+        ("one_sided_weakness",),
+        ("thunderclap_headache",),
+        ("paralysis_mention", "acute"),
+    ],
+    "anaphylaxis": [
+        ("throat_swelling",),
+        ("allergic_reaction", "breathlessness"),
+        ("allergic_reaction", "severe_breathing"),
+    ],
+    "respiratory": [
+        ("severe_breathing",),
+        ("choking_mention", "acute"),
+        ("choking_mention", "breathlessness"),
+    ],
+    "unconscious": [
+        ("unconscious",),
+        ("seizure",),
+        ("seizure_mention", "acute"),
+    ],
+    "severe_bleeding": [("severe_bleeding",)],
+    "mental_health_crisis": [("suicidal",)],
+    "poisoning": [
+        ("poisoning",),
+        ("poisoning_mention", "acute"),
+        ("poisoning_mention", "unconscious"),
+        ("poisoning_mention", "severe_breathing"),
+        ("poisoning_mention", "seizure"),
+    ],
+    "vision_loss": [("vision_loss",)],
+}
+
+_CALL_NOW = {
+    "en": "⚠️ **This may be a medical emergency. Call emergency services (112 / 108 / 911) now or go to the nearest emergency room.** Do not wait for an online answer.",
+    "hi": "⚠️ **यह मेडिकल इमरजेंसी हो सकती है। तुरंत 112 / 108 पर कॉल करें या नज़दीकी इमरजेंसी में जाएं।** ऑनलाइन जवाब का इंतज़ार न करें।",
+}
+
+EMERGENCY_GUIDANCE: Dict[str, Dict[str, str]] = {
+    "cardiac": {
+        "en": "Possible heart attack: stop all activity and sit down, loosen tight clothing, and chew one regular aspirin (325 mg) unless you are allergic or a doctor has told you not to. Do not drive yourself.",
+        "hi": "संभावित हार्ट अटैक: सारी गतिविधि रोककर बैठ जाएं, तंग कपड़े ढीले करें, और अगर एलर्जी नहीं है या डॉक्टर ने मना नहीं किया है तो एक एस्पिरिन (325 mg) चबाएं। खुद गाड़ी न चलाएं।",
+    },
+    "stroke": {
+        "en": "Possible stroke (FAST: Face drooping, Arm weakness, Speech difficulty, Time to call). Note the time symptoms started, do not eat or drink, and do not take aspirin unless a doctor says so.",
+        "hi": "संभावित स्ट्रोक (चेहरा टेढ़ा, हाथ में कमजोरी, बोलने में दिक्कत)। लक्षण शुरू होने का समय नोट करें, कुछ खाएं-पिएं नहीं, और डॉक्टर के कहे बिना एस्पिरिन न लें।",
+    },
+    "anaphylaxis": {
+        "en": "Possible severe allergic reaction: use an epinephrine auto-injector (EpiPen) now if one is available. Lie down with legs raised, or sit up if breathing is hard. Avoid the trigger.",
+        "hi": "संभावित गंभीर एलर्जी: अगर एपिनेफ्रीन ऑटो-इंजेक्टर (EpiPen) है तो तुरंत लगाएं। पैर ऊपर करके लेटें, या सांस में दिक्कत हो तो बैठ जाएं।",
+    },
+    "respiratory": {
+        "en": "Severe breathing difficulty: sit upright, stay calm, and use your rescue inhaler if you have one. If someone is choking and cannot cough or speak, give firm back blows and abdominal thrusts.",
+        "hi": "सांस की गंभीर तकलीफ: सीधे बैठें, शांत रहें, और अगर इनहेलर है तो इस्तेमाल करें। अगर कोई दम घुटने से खांस या बोल नहीं पा रहा, तो पीठ पर ज़ोर से थपकी दें।",
+    },
+    "unconscious": {
+        "en": "If the person is unresponsive or seizing: keep them away from hazards, do not put anything in their mouth, and once the seizure stops turn them on their side (recovery position). Start CPR if they are not breathing.",
+        "hi": "अगर व्यक्ति बेहोश है या दौरा पड़ रहा है: आसपास की खतरनाक चीज़ें हटाएं, मुंह में कुछ न डालें, और दौरा रुकने पर करवट दिलाएं। सांस न चल रही हो तो CPR शुरू करें।",
+    },
+    "severe_bleeding": {
+        "en": "Heavy bleeding: apply firm, continuous pressure on the wound with a clean cloth and keep the injured part raised. Vomiting or coughing up blood needs emergency care immediately.",
+        "hi": "ज़्यादा खून बहना: साफ कपड़े से घाव पर लगातार ज़ोर से दबाव रखें और घायल हिस्से को ऊपर उठाकर रखें। खून की उल्टी या खांसी में खून के लिए तुरंत इमरजेंसी जाएं।",
+    },
+    "mental_health_crisis": {
+        "en": "You are not alone, and help is available right now. Please call Tele-MANAS at 14416 (24x7, free) or KIRAN at 1800-599-0019, or reach out to someone you trust and stay with them.",
+        "hi": "आप अकेले नहीं हैं, मदद अभी उपलब्ध है। कृपया Tele-MANAS 14416 (24x7, मुफ्त) या KIRAN 1800-599-0019 पर कॉल करें, या किसी भरोसेमंद व्यक्ति के पास रहें।",
+    },
+    "poisoning": {
+        "en": "Possible poisoning or overdose: do not induce vomiting. Keep the container or pill strip to show the doctors, and go to the emergency room now.",
+        "hi": "संभावित ज़हर या ओवरडोज़: उल्टी कराने की कोशिश न करें। दवा/ज़हर का डिब्बा साथ रखें और तुरंत इमरजेंसी जाएं।",
+    },
+    "vision_loss": {
+        "en": "Sudden vision loss can be an eye or brain emergency; get emergency care now.",
+        "hi": "अचानक दिखना बंद होना आंख या दिमाग की इमरजेंसी हो सकती है; तुरंत इलाज लें।",
+    },
+}
+
+# ============================================
+# 🔤 AUTOMATON
+# ============================================
+
+
+def _build_matcher() -> AhoCorasick:
+    matcher: AhoCorasick = AhoCorasick()
+    for signal, by_language in SIGNAL_PHRASES.items():
+        for language, phrases in by_language.items():
+            for phrase in phrases:
+                matcher.add(f" {normalize_text(phrase)}", (signal, language))
+    for phrase in BENIGN_PHRASES:
+        matcher.add(f" {normalize_text(phrase)}", (None, "en"))
+    return matcher.build()
+
+
+def _is_history(tokens: Sequence[str], first: int, end: int) -> bool:
+    for i in range(max(0, first - HISTORY_WINDOW), first):
+        if tokens[i] not in HISTORY_BEFORE:
+            continue
+        # "have had", "just had", "now had": still going on or just happened
+        if tokens[i] == "had" and i > 0 and tokens[i - 1] in RECENT_BEFORE_HAD:
+            continue
+        return True
+    return any(t in HISTORY_AFTER for t in tokens[end : end + HISTORY_WINDOW])
+
+
+def _clause_signals(clause: str) -> Tuple[Set[str], bool]:
+    """Signals asserted in one clause, and whether a Hindi phrase matched"""
+    normalized = f" {normalize_text(clause)}"
+    tokens = normalized.split()
+    hits = []
+    benign: List[Tuple[int, int]] = []
+    for start, end, (signal, language) in _matcher.find_all(
+        normalized, whole_words=False
+    ):
+        if language == "en" and end < len(normalized) and is_word_char(normalized[end]):
+            continue
+        if signal is None:
+            benign.append((start, end))
+        else:
+            hits.append((start, end, signal, language))
+
+    signals: Set[str] = set()
+    hindi = False
+    for start, end, signal, language in hits:
+        if any(b_start <= start and end <= b_end for b_start, b_end in benign):
+            continue
+        # Patterns start on the space before their first word
+        first = normalized.count(" ", 0, start + 1) - 1
+        last = normalized.count(" ", 0, end)
+        if is_negated(tokens, first, last) or (
+            signal != "acute" and _is_history(tokens, first, last)
+        ):
+            continue
+        signals.add(signal)
+        hindi = hindi or language == "hi"
+    return signals, hindi
+
+
+# Patterns carry a leading space and text is padded with one, so every match
+# starts on a word boundary; the end boundary is checked per language.
+_matcher = _build_matcher()
+_stats: Dict[str, Any] = {"checked": 0, "emergencies": {}, "total_us": 0.0}
+
+
+def detect_emergency(text: str) -> Dict[str, Any]:
+    """
+    Returns {"is_emergency", "emergencies", "signals", "language", "guidance"}.
+    guidance is empty unless is_emergency.
+    """
+    started = time.perf_counter()
+    signals: Set[str] = set()
+    hindi = bool(DEVANAGARI.search(text or ""))
+    for clause in CLAUSE_BOUNDARIES.split(text or ""):
+        clause_signals, clause_hindi = _clause_signals(clause)
+        signals |= clause_signals
+        hindi = hindi or clause_hindi
+
+    emergencies = [
+        emergency
+        for emergency, alternatives in EMERGENCY_RULES.items()
+        if any(all(s in signals for s in required) for required in alternatives)
+    ]
+    language = "hi" if hindi else "en"
+
+    _stats["checked"] += 1
+    _stats["total_us"] += (time.perf_counter() - started) * 1e6
+    for emergency in emergencies:
+        _stats["emergencies"][emergency] = _stats["emergencies"].get(emergency, 0) + 1
+
+    return {
+        "is_emergency": bool(emergencies),
+        "emergencies": emergencies,
+        "signals": sorted(signals),
+        "language": language,
+        "guidance": build_guidance(emergencies, language) if emergencies else "",
+    }
+
+
+def build_guidance(emergencies: List[str], language: str = "en") -> str:
+    """Call-now banner plus first-aid steps; Hindi messages get both languages"""
+    languages = ["hi", "en"] if language == "hi" else ["en"]
+    sections = []
+    for lang in languages:
+        lines = [_CALL_NOW[lang]]
+        lines += [f"- {EMERGENCY_GUIDANCE[e][lang]}" for e in emergencies]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def get_emergency_stats() -> Dict[str, Any]:
+    checked = _stats["checked"]
+    return {
+        "checked": checked,
+        "emergencies": dict(_stats["emergencies"]),
+        "avg_detect_us": round(_stats["total_us"] / checked, 1) if checked else 0.0,
+        "phrases": len(_matcher),
+    }
@@ -0,0 +1,324 @@
+"""
+Fake Gemini Backend - offline load testing
+Deterministic stand-in for the google-genai client: configurable latency
+distributions, streaming chunk cadence, error/429 injection and canned
+responses. Select it with GEMINI_BACKEND=fake (no API key or network needed).
+
+Environment knobs (all optional):
+    GEMINI_FAKE_SEED=42
+    GEMINI_FAKE_LATENCY=lognormal:median=800,sigma=0.4   # total latency (ms)
+    GEMINI_FAKE_TTFT=lognormal:median=350,sigma=0.3      # stream first chunk (ms)
+    GEMINI_FAKE_CHUNK_INTERVAL=fixed:ms=40               # between stream chunks (ms)
+    GEMINI_FAKE_CHUNK_WORDS=12
+    GEMINI_FAKE_ERROR_RATE=0.01        # 503 UNAVAILABLE
+    GEMINI_FAKE_RATE_LIMIT_RATE=0.02   # 429 RESOURCE_EXHAUSTED
+    GEMINI_FAKE_FAILING_MODELS=gemini-2.5-flash          # always 503 on these
+    GEMINI_FAKE_RESPONSES=/path/to/responses.json        # {"task or keyword": "text"}
+
+Distributions: fixed:ms=N | uniform:min=A,max=B | normal:mean=M,std=S |
+lognormal:median=M,sigma=S (all in milliseconds).
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from services.gemini_service import GeminiBackend
+
+logger = logging.getLogger(__name__)
+
+
+class FakeGeminiError(Exception):
+    """Error shaped like the SDK's API errors ("<code> <STATUS>. <message>")"""
+
+    def __init__(self, code: int, status: str, message: str):
+        self.code = code
+        self.status = status
+        super().__init__(f"{code} {status}. {message}")
+
+
+class LatencyDistribution:
+    """Millisecond latency sampler parsed from 'kind:key=value,...'"""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = {}
+        for pair in filter(None, params.split(",")):
+            key, _, value = pair.partition("=")
+            self.params[key.strip()] = float(value)
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p.get("ms", 0.0)
+        elif self.kind == "uniform":
+            value = rng.uniform(p.get("min", 0.0), p.get("max", 0.0))
+        elif self.kind == "normal":
+            value = rng.gauss(p.get("mean", 0.0), p.get("std", 0.0))
+        else:
+            value = rng.lognormvariate(
+                math.log(max(p.get("median", 1.0), 1e-3)), p.get("sigma", 0.0)
+            )
+        return max(value, 0.0)
+
+
+_DEFAULT_TEXT = """### Assessment (simulated)
+This response was generated by the offline fake Gemini backend for load testing. It mirrors the length and structure of a typical clinical answer without calling the real API.
+
+* **Key point:** Symptoms should be evaluated by a qualified clinician.
+* **Monitoring:** Track symptoms daily and note any changes.
+* **When to seek care:** If symptoms worsen or new warning signs appear.
+
+---
+⚕️ This is AI-generated health information, not a medical diagnosis. Always consult a healthcare provider for medical decisions."""
+
+_DEFAULT_REPORT_JSON = json.dumps(
+    {
+        "report_type": "Complete Blood Count",
+        "patient_info": "Not specified",
+        "report_date": "Not specified",
+        "summary": "Simulated analysis from the offline fake backend. Values are within reference ranges except mildly low hemoglobin.",
+        "health_metrics": {
+            "Hemoglobin": "11.8 g/dL [12.0-15.5] (LOW)",
+            "WBC": "7.2 x10^3/uL [4.5-11.0] (NORMAL)",
+        },
+        "key_findings": ["Mildly low hemoglobin"],
+        "abnormal_values": ["Hemoglobin 11.8 g/dL vs 12.0-15.5"],
+        "risk_level": "Low",
+        "recommendations": ["Repeat CBC in 4 weeks"],
+        "limitations": "Simulated data",
+    }
+)
+
+_DEFAULT_RESPONSES = {
+    "STRICT JSON": _DEFAULT_REPORT_JSON,
+    "default": _DEFAULT_TEXT,
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _estimate_tokens(value: Any) -> int:
+    """Rough token estimate (~4 chars/token) for text, parts or content lists"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return max(1, len(value) // 4)
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_tokens(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_estimate_tokens(v) for v in value.values())
+    text = getattr(value, "text", None)
+    if isinstance(text, str):
+        return _estimate_tokens(text)
+    parts = getattr(value, "parts", None)
+    if parts:
+        return _estimate_tokens(parts)
+    inline = getattr(value, "inline_data", None)
+    if inline is not None and getattr(inline, "data", None):
+        return 258  # flat per-image/page cost, like the real API
+    return 0
+
+
+def _make_response(
+    text: str, prompt_tokens: int, cached_tokens: int, finish_reason: str = "STOP"
+):
+    output_tokens = _estimate_tokens(text) if text else 0
+    return SimpleNamespace(
+        text=text,
+        candidates=[
+            SimpleNamespace(
+                content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+                finish_reason=finish_reason,
+            )
+        ],
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens + cached_tokens,
+            candidates_token_count=output_tokens,
+            cached_content_token_count=cached_tokens,
+            total_token_count=prompt_tokens + cached_tokens + output_tokens,
+        ),
+        prompt_feedback=None,
+    )
+
+
+class FakeGeminiBackend(GeminiBackend):
+    """Offline, seedable implementation of the GeminiBackend interface"""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        seed: int = 42,
+        latency: str = "lognormal:median=800,sigma=0.4",
+        ttft: str = "lognormal:median=350,sigma=0.3",
+        chunk_interval: str = "fixed:ms=40",
+        chunk_words: int = 12,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        failing_models: Optional[List[str]] = None,
+        responses: Optional[Dict[str, str]] = None,
+    ):
+        self.seed = seed
+        self.latency = LatencyDistribution(latency)
+        self.ttft = LatencyDistribution(ttft)
+        self.chunk_interval = LatencyDistribution(chunk_interval)
+        self.chunk_words = max(1, chunk_words)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.failing_models = set(failing_models or [])
+        self.responses = {**_DEFAULT_RESPONSES, **(responses or {})}
+        self._caches: Dict[str, Dict[str, Any]] = {}
+        self._call_ids = itertools.count()
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiBackend":
+        responses = None
+        responses_path = os.environ.get("GEMINI_FAKE_RESPONSES")
+        if responses_path:
+            responses = json.loads(Path(responses_path).read_text(encoding="utf-8"))
+        failing = os.environ.get("GEMINI_FAKE_FAILING_MODELS", "")
+        return cls(
+            seed=int(os.environ.get("GEMINI_FAKE_SEED", 42)),
+            latency=os.environ.get(
+                "GEMINI_FAKE_LATENCY", "lognormal:median=800,sigma=0.4"
+            ),
+            ttft=os.environ.get("GEMINI_FAKE_TTFT", "lognormal:median=350,sigma=0.3"),
+            chunk_interval=os.environ.get("GEMINI_FAKE_CHUNK_INTERVAL", "fixed:ms=40"),
+            chunk_words=int(os.environ.get("GEMINI_FAKE_CHUNK_WORDS", 12)),
+            error_rate=_env_float("GEMINI_FAKE_ERROR_RATE", 0.0),
+            rate_limit_rate=_env_float("GEMINI_FAKE_RATE_LIMIT_RATE", 0.0),
+            failing_models=[m.strip() for m in failing.split(",") if m.strip()],
+            responses=responses,
+        )
+
+    # ── helpers ──
+
+    def _rng(self) -> random.Random:
+        # One RNG per call, derived from the seed and call order — the same
+        # seed replays the same latency/failure sequence.
+        self.calls += 1
+        return random.Random(self.seed * 1_000_003 + next(self._call_ids))
+
+    def _maybe_fail(self, model: str, rng: random.Random):
+        if model in self.failing_models:
+            raise FakeGeminiError(
+                503, "UNAVAILABLE", f"Model {model} is overloaded (injected)."
+            )
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeGeminiError(
+                429, "RESOURCE_EXHAUSTED", "Quota exceeded (injected)."
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeGeminiError(503, "UNAVAILABLE", "Service unavailable (injected).")
+
+    def _system_instruction(self, config) -> str:
+        cached_name = getattr(config, "cached_content", None)
+        if cached_name:
+            cache = self._caches.get(cached_name)
+            if cache is None:
+                raise FakeGeminiError(
+                    404, "NOT_FOUND", f"CachedContent not found: {cached_name}"
+                )
+            return cache["system_instruction"]
+        return getattr(config, "system_instruction", None) or ""
+
+    def _canned_text(self, system_instruction: str, contents: Any) -> str:
+        haystack = (
+            f"{system_instruction}\n{contents if isinstance(contents, str) else ''}"
+        )
+        for key, text in self.responses.items():
+            if key != "default" and key in haystack:
+                return text
+        return self.responses["default"]
+
+    def _limit_output(self, text: str, config):
+        max_tokens = getattr(config, "max_output_tokens", None)
+        if max_tokens and _estimate_tokens(text) > max_tokens:
+            return text[: max_tokens * 4], "MAX_TOKENS"
+        return text, "STOP"
+
+    def _prompt_tokens(self, contents: Any, config) -> Dict[str, int]:
+        cached = 0
+        inline = _estimate_tokens(contents)
+        cached_name = getattr(config, "cached_content", None)
+        if cached_name and cached_name in self._caches:
+            cached = self._caches[cached_name]["tokens"]
+        else:
+            inline += _estimate_tokens(getattr(config, "system_instruction", None))
+        return {"prompt": inline, "cached": cached}
+
+    # ── GeminiBackend interface ──
+
+    async def generate_content(self, model: str, contents: Any, config=None):
+        rng = self._rng()
+        system_instruction = self._system_instruction(config)
+        await asyncio.sleep(self.latency.sample(rng) / 1000)
+        self._maybe_fail(model, rng)
+        text, finish_reason = self._limit_output(
+            self._canned_text(system_instruction, contents), config
+        )
+        tokens = self._prompt_tokens(contents, config)
+        return _make_response(text, tokens["prompt"], tokens["cached"], finish_reason)
+
+    async def generate_content_stream(self, model: str, contents: Any, config=None):
+        rng = self._rng()
+        system_instruction = self._system_instruction(config)
+        self._maybe_fail(model, rng)
+        text, finish_reason = self._limit_output(
+            self._canned_text(system_instruction, contents), config
+        )
+        tokens = self._prompt_tokens(contents, config)
+        words = text.split(" ")
+        chunks = [
+            " ".join(words[i : i + self.chunk_words]) + " "
+            for i in range(0, len(words), self.chunk_words)
+        ]
+
+        async def _stream():
+            await asyncio.sleep(self.ttft.sample(rng) / 1000)
+            for index, chunk in enumerate(chunks):
+                if index:
+                    await asyncio.sleep(self.chunk_interval.sample(rng) / 1000)
+                last = index == len(chunks) - 1
+                response = _make_response(
+                    chunk,
+                    tokens["prompt"] if last else 0,
+                    tokens["cached"] if last else 0,
+                    finish_reason if last else "",
+                )
+                if not last:
+                    response.usage_metadata = None
+                yield response
+
+        return _stream()
+
+    async def create_cache(self, model: str, config):
+        rng = self._rng()
+        await asyncio.sleep(self.latency.sample(rng) / 4000)
+        name = f"cachedContents/fake-{len(self._caches) + 1}"
+        system_instruction = getattr(config, "system_instruction", "") or ""
+        self._caches[name] = {
+            "model": model,
+            "system_instruction": system_instruction,
+            "tokens": _estimate_tokens(system_instruction),
+        }
+        return SimpleNamespace(name=name, model=model)
@@ -0,0 +1,297 @@
+"""
+Gemini Metrics
+Latency histograms, token counters, fallbacks and error taxonomy for every
+Gemini generation, exported in Prometheus text format.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Seconds. Chat answers usually land in 1-8s; the tail covers the 90s health
+# plan / report analysis timeouts, plus a fallback to a second model.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+ERROR_CATEGORIES = (
+    "auth",
+    "quota",
+    "timeout",
+    "safety",
+    "unavailable",
+    "empty",
+    "other",
+)
+
+_SAFETY_FINISH_REASONS = ("SAFETY", "PROHIBITED_CONTENT", "BLOCKLIST", "SPII")
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        out = []
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            out.append((_format_bound(bound), running))
+        out.append(("+Inf", running + self.counts[-1]))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bucket bound containing the q-quantile (like histogram_quantile);
+        a quantile beyond the last bucket reports the largest finite bound
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return float(bound)
+        return float(self.buckets[-1])
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+_lock = threading.Lock()
+_total_latency: Dict[Tuple[str, str], Histogram] = {}
+_ttft: Dict[Tuple[str, str], Histogram] = {}
+_requests: Dict[Tuple[str, str, str], int] = {}  # (model, task, outcome)
+_tokens: Dict[Tuple[str, str, str], int] = {}  # (model, task, kind)
+_errors: Dict[Tuple[str, str, str], int] = {}  # (model, task, category)
+_fallbacks: Dict[Tuple[str, str], int] = {}  # (task, model)
+
+
+def _inc(counter: Dict, key: Tuple, amount: int = 1):
+    counter[key] = counter.get(key, 0) + amount
+
+
+def classify_error(error: Optional[BaseException] = None, response: Any = None) -> str:
+    """Map an exception (or a response that produced no text) to a category"""
+    if error is not None:
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            return "timeout"
+        code = getattr(error, "code", None)
+        message = f"{code or ''} {error}".upper()
+        if any(
+            s in message
+            for s in ("401", "403", "API KEY", "UNAUTHENTICATED", "PERMISSION_DENIED")
+        ):
+            return "auth"
+        if any(s in message for s in ("429", "RESOURCE_EXHAUSTED", "QUOTA")):
+            return "quota"
+        if any(s in message for s in ("504", "DEADLINE_EXCEEDED", "TIMED OUT")):
+            return "timeout"
+        if "SAFETY" in message or "BLOCKED" in message:
+            return "safety"
+        if any(s in message for s in ("500", "502", "503", "UNAVAILABLE", "INTERNAL")):
+            return "unavailable"
+        return "other"
+
+    if response is not None:
+        feedback = getattr(response, "prompt_feedback", None)
+        if feedback is not None and getattr(feedback, "block_reason", None):
+            return "safety"
+        try:
+            finish_reason = str(response.candidates[0].finish_reason or "").upper()
+        except (AttributeError, IndexError, TypeError):
+            finish_reason = ""
+        if any(reason in finish_reason for reason in _SAFETY_FINISH_REASONS):
+            return "safety"
+    return "empty"
+
+
+def record_generation(
+    task: str,
+    model: str,
+    latency: float,
+    ttft: Optional[float] = None,
+    usage: Optional[Dict[str, Any]] = None,
+    ok: bool = True,
+    error: Optional[BaseException] = None,
+    response: Any = None,
+) -> Optional[str]:
+    """
+    Record one generation attempt (one model in the fallback chain).
+    latency/ttft are seconds; for non-streaming calls the first token arrives
+    with the whole response, so ttft defaults to latency.
+    Returns the error category for failed attempts.
+    """
+    key = (model, task)
+    category = None if ok else classify_error(error, response)
+    with _lock:
+        _total_latency.setdefault(key, Histogram()).observe(latency)
+        if ok or ttft is not None:
+            _ttft.setdefault(key, Histogram()).observe(
+                ttft if ttft is not None else latency
+            )
+        _inc(_requests, (model, task, "success" if ok else "error"))
+        if category:
+            _inc(_errors, (model, task, category))
+        for kind in ("prompt", "output", "cached"):
+            count = (usage or {}).get(f"{kind}_tokens", 0)
+            if count:
+                _inc(_tokens, (model, task, kind), count)
+    return category
+
+
+def record_fallback(task: str, model: str):
+    """A request moved past the route's primary model to `model`"""
+    with _lock:
+        _inc(_fallbacks, (task, model))
+
+
+def reset_metrics():
+    with _lock:
+        for store in (_total_latency, _ttft, _requests, _tokens, _errors, _fallbacks):
+            store.clear()
+
+
+# ============================================
+# 📤 EXPORT
+# ============================================
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histograms(
+    lines: List[str], name: str, help_text: str, store: Dict[Tuple[str, str], Histogram]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (model, task), hist in sorted(store.items()):
+        for bound, count in hist.cumulative():
+            lines.append(
+                f"{name}_bucket{_labels(model=model, task=task, le=bound)} {count}"
+            )
+        lines.append(f"{name}_sum{_labels(model=model, task=task)} {hist.total:.6f}")
+        lines.append(f"{name}_count{_labels(model=model, task=task)} {hist.count}")
+
+
+def _render_counter(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    store: Dict[Tuple, int],
+    label_names: Tuple[str, ...],
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(store.items()):
+        lines.append(f"{name}{_labels(**dict(zip(label_names, key)))} {value}")
+
+
+def render_prometheus() -> str:
+    """All Gemini metrics in Prometheus text exposition format (0.0.4)"""
+    lines: List[str] = []
+    with _lock:
+        _render_histograms(
+            lines,
+            "gemini_request_duration_seconds",
+            "Total Gemini generation latency per attempt.",
+            _total_latency,
+        )
+        _render_histograms(
+            lines,
+            "gemini_time_to_first_token_seconds",
+            "Time until the first output token (whole response for unary calls).",
+            _ttft,
+        )
+        _render_counter(
+            lines,
+            "gemini_requests_total",
+            "Gemini generation attempts by outcome.",
+            _requests,
+            ("model", "task", "outcome"),
+        )
+        _render_counter(
+            lines,
+            "gemini_tokens_total",
+            "Tokens reported in usage metadata.",
+            _tokens,
+            ("model", "task", "kind"),
+        )
+        _render_counter(
+            lines,
+            "gemini_errors_total",
+            "Failed Gemini attempts by error category.",
+            _errors,
+            ("model", "task", "category"),
+        )
+        _render_counter(
+            lines,
+            "gemini_fallbacks_total",
+            "Attempts made on a non-primary model of the task route.",
+            _fallbacks,
+            ("task", "model"),
+        )
+    return "\n".join(lines) + "\n"
+
+
+def get_metrics_summary() -> Dict[str, Any]:
+    """Compact view for the admin system endpoint"""
+    with _lock:
+        models: Dict[str, Dict[str, Any]] = {}
+        for (model, task), hist in _total_latency.items():
+            entry = models.setdefault(
+                model, {"requests": 0, "errors": 0, "tasks": {}, "tokens": {}}
+            )
+            success = _requests.get((model, task, "success"), 0)
+            errors = _requests.get((model, task, "error"), 0)
+            entry["requests"] += success + errors
+            entry["errors"] += errors
+            ttft = _ttft.get((model, task))
+            entry["tasks"][task] = {
+                "requests": success + errors,
+                "errors": errors,
+                "avg_latency_s": round(hist.total / hist.count, 3) if hist.count else 0,
+                "p95_latency_s": hist.quantile(0.95),
+                "p95_ttft_s": ttft.quantile(0.95) if ttft else 0,
+            }
+        for (model, _task, kind), count in _tokens.items():
+            tokens = models.setdefault(
+                model, {"requests": 0, "errors": 0, "tasks": {}, "tokens": {}}
+            )["tokens"]
+            tokens[kind] = tokens.get(kind, 0) + count
+
+        errors_by_category = {category: 0 for category in ERROR_CATEGORIES}
+        for (_model, _task, category), count in _errors.items():
+            errors_by_category[category] = errors_by_category.get(category, 0) + count
+
+        fallbacks: Dict[str, int] = {}
+        for (task, _model), count in _fallbacks.items():
+            fallbacks[task] = fallbacks.get(task, 0) + count
+
+    return {
+        "total_requests": sum(m["requests"] for m in models.values()),
+        "total_errors": sum(m["errors"] for m in models.values()),
+        "errors_by_category": errors_by_category,
+        "fallbacks_by_task": fallbacks,
+        "models": models,
+    }
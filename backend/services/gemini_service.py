@@ -4,15 +4,38 @@ Uses the new google.genai Client-based architecture
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+import asyncio
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 import json
+from collections import deque
+
+from config.settings import (
+    GEMINI_BACKEND,
+    GEMINI_CONTEXT_CACHE,
+    GEMINI_CONTEXT_CACHE_TTL,
+    GEMINI_TASK_ROUTE_OVERRIDES,
+)
+from services import gemini_metrics
+from services.prompt_templates import (
+    PromptTemplate,
+    ENHANCED_PREDICTION,
+    HEALTH_CHAT,
+    CHAT_SUMMARY,
+    HEALTH_PLAN,
+    REPORT_PDF,
+    REPORT_IMAGE,
+    SYMPTOM_CHECKER,
+    DRUG_INTERACTIONS,
+    EXPLAIN_TERM,
+)
 
 logger = logging.getLogger(__name__)
 
-# Global Gemini client
-gemini_client = None
+# Global Gemini backend (real SDK client or offline fake)
+gemini_backend = None
 
 # ============================================
 # 📋 MODEL CONFIGURATION
@@ -23,21 +46,148 @@ GEMINI_MODELS = [
     "gemini-2.0-flash-lite",  # Lightweight fallback
 ]
 
+# Per-task routing: model preference, output cap, temperature, timeout (s).
+# Short tasks go to lighter models with small caps; long-form generation
+# keeps the stronger models. Tune from get_task_usage_stats() and override
+# per deployment with GEMINI_TASK_ROUTES (JSON, merged per task).
+GEMINI_TASK_ROUTES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "models": GEMINI_MODELS,
+        "max_output_tokens": 4000,
+        "temperature": 0.7,
+        "timeout": 60,
+    },
+    "enhanced_prediction": {
+        "models": GEMINI_MODELS,
+        "max_output_tokens": 3000,
+        "temperature": 0.4,
+        "timeout": 45,
+    },
+    "health_chat": {
+        "models": ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.0-flash-lite"],
+        "max_output_tokens": 1200,
+        "temperature": 0.7,
+        "timeout": 25,
+    },
+    "chat_stream": {
+        "models": ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.0-flash-lite"],
+        "max_output_tokens": 1200,
+        "temperature": 0.7,
+        "timeout": 30,
+    },
+    "health_plan": {
+        "models": ["gemini-2.5-flash", "gemini-2.0-flash"],
+        "max_output_tokens": 4000,
+        "temperature": 0.7,
+        "timeout": 90,
+    },
+    "report_analysis": {
+        "models": GEMINI_MODELS,
+        "max_output_tokens": 2500,
+        "temperature": 0.1,
+        "timeout": 90,
+    },
+    "symptom_checker": {
+        "models": ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.0-flash-lite"],
+        "max_output_tokens": 2000,
+        "temperature": 0.4,
+        "timeout": 40,
+    },
+    "drug_interactions": {
+        "models": GEMINI_MODELS,
+        "max_output_tokens": 2500,
+        "temperature": 0.3,
+        "timeout": 45,
+    },
+    "explain_term": {
+        "models": ["gemini-2.0-flash-lite", "gemini-2.0-flash"],
+        "max_output_tokens": 400,
+        "temperature": 0.3,
+        "timeout": 15,
+    },
+    "chat_summary": {
+        "models": ["gemini-2.0-flash-lite", "gemini-2.0-flash"],
+        "max_output_tokens": 400,
+        "temperature": 0.2,
+        "timeout": 20,
+    },
+}
+
+for _task, _overrides in GEMINI_TASK_ROUTE_OVERRIDES.items():
+    GEMINI_TASK_ROUTES[_task] = {
+        **GEMINI_TASK_ROUTES.get(_task, GEMINI_TASK_ROUTES["default"]),
+        **_overrides,
+    }
+
+
+def get_task_route(task: Optional[str]) -> Dict[str, Any]:
+    return GEMINI_TASK_ROUTES.get(task or "default", GEMINI_TASK_ROUTES["default"])
+
+
 # ============================================
 # 🔧 INITIALIZATION
 # ============================================
 
 
+class GeminiBackend:
+    """
+    Interface between this service and a Gemini implementation.
+    GenAIBackend wraps the google-genai client; services.gemini_fake provides
+    an offline fake (GEMINI_BACKEND=fake) for load testing.
+    """
+
+    name = "base"
+
+    async def generate_content(self, model: str, contents: Any, config=None):
+        raise NotImplementedError
+
+    async def generate_content_stream(self, model: str, contents: Any, config=None):
+        """Return an async iterator of response chunks"""
+        raise NotImplementedError
+
+    async def create_cache(self, model: str, config):
+        """Create a server-side context cache; returns an object with .name"""
+        raise NotImplementedError
+
+
+class GenAIBackend(GeminiBackend):
+    """google-genai async client"""
+
+    name = "genai"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate_content(self, model: str, contents: Any, config=None):
+        return await self.client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def generate_content_stream(self, model: str, contents: Any, config=None):
+        return await self.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+
+    async def create_cache(self, model: str, config):
+        return await self.client.aio.caches.create(model=model, config=config)
+
+
 def initialize_gemini(api_key: str) -> bool:
-    """Initialize Gemini AI with the new 2026 SDK"""
-    global gemini_client
+    """Initialize Gemini AI with the new 2026 SDK (or the offline fake backend)"""
+    global gemini_backend
+    if GEMINI_BACKEND == "fake":
+        from services.gemini_fake import FakeGeminiBackend
+
+        gemini_backend = FakeGeminiBackend.from_env()
+        logger.warning("⚠️ Using FAKE Gemini backend (offline load testing)")
+        return True
     if not api_key:
         logger.warning("⚠️ GEMINI_API_KEY not found. Gemini features disabled.")
         return False
     try:
         from google import genai
 
-        gemini_client = genai.Client(api_key=api_key)
+        gemini_backend = GenAIBackend(genai.Client(api_key=api_key))
         logger.info("✅ Gemini AI initialized with 2026 SDK (google-genai)")
         return True
     except Exception as e:
@@ -46,7 +196,11 @@ def initialize_gemini(api_key: str) -> bool:
 
 
 def is_gemini_available() -> bool:
-    return gemini_client is not None
+    return gemini_backend is not None
+
+
+def get_gemini_backend_name() -> str:
+    return gemini_backend.name if gemini_backend else "disabled"
 
 
 def _extract_text(response) -> str:
@@ -66,42 +220,334 @@ def _extract_text(response) -> str:
     return ""
 
 
+def _usage_from_response(response) -> Dict[str, Any]:
+    """Token counts and finish reason from a response's usage metadata"""
+    usage = {"prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+    meta = getattr(response, "usage_metadata", None)
+    if meta:
+        usage["prompt_tokens"] = getattr(meta, "prompt_token_count", 0) or 0
+        usage["output_tokens"] = getattr(meta, "candidates_token_count", 0) or 0
+        usage["cached_tokens"] = getattr(meta, "cached_content_token_count", 0) or 0
+    try:
+        usage["finish_reason"] = str(response.candidates[0].finish_reason or "")
+    except (AttributeError, IndexError, TypeError):
+        usage["finish_reason"] = ""
+    return usage
+
+
+# ============================================
+# 📊 TASK USAGE (Routing Table Tuning)
+# ============================================
+
+TASK_USAGE_WINDOW = 500
+_task_usage: Dict[str, deque] = {}
+
+
+def _record_task_sample(
+    task: str,
+    model: str,
+    started: float,
+    response=None,
+    ok: bool = True,
+    error: Optional[BaseException] = None,
+    ttft: Optional[float] = None,
+):
+    latency = time.perf_counter() - started
+    usage = _usage_from_response(response)
+    sample = {
+        "model": model,
+        "latency_ms": round(latency * 1000, 1),
+        "ok": ok,
+        **usage,
+    }
+    _task_usage.setdefault(task, deque(maxlen=TASK_USAGE_WINDOW)).append(sample)
+    gemini_metrics.record_generation(
+        task,
+        model,
+        latency,
+        ttft=ttft,
+        usage=usage,
+        ok=ok,
+        error=error,
+        response=response,
+    )
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def get_task_usage_stats() -> Dict[str, Any]:
+    """Per-task latency/token summary over the most recent samples"""
+    stats = {}
+    for task, samples in _task_usage.items():
+        ok_samples = [s for s in samples if s["ok"]]
+        latencies = sorted(s["latency_ms"] for s in ok_samples)
+        outputs = [s["output_tokens"] for s in ok_samples]
+        models: Dict[str, int] = {}
+        for s in ok_samples:
+            models[s["model"]] = models.get(s["model"], 0) + 1
+        route = get_task_route(task)
+        stats[task] = {
+            "route": route,
+            "samples": len(samples),
+            "errors": len(samples) - len(ok_samples),
+            "latency_ms": {
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "avg_prompt_tokens": (
+                round(sum(s["prompt_tokens"] for s in ok_samples) / len(ok_samples), 1)
+                if ok_samples
+                else 0
+            ),
+            "avg_output_tokens": (
+                round(sum(outputs) / len(outputs), 1) if outputs else 0
+            ),
+            "max_output_tokens_seen": max(outputs) if outputs else 0,
+            "truncated": sum(
+                1 for s in ok_samples if "MAX_TOKENS" in s.get("finish_reason", "")
+            ),
+            "models": models,
+        }
+    return stats
+
+
+# ============================================
+# 🗄️ CONTEXT CACHING (Static System Instructions)
+# ============================================
+
+
+class LocalContextCache:
+    """
+    In-process stand-in for SDK context caching (offline runs and tests).
+    Tracks cache entries per (model, template version) with the same TTL
+    semantics as the remote cache, but always sends the instruction inline.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str], float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    async def resolve(self, model: str, template: PromptTemplate) -> Dict[str, Any]:
+        key = (model, template.cache_key)
+        now = time.monotonic()
+        if self._entries.get(key, 0) > now:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._entries[key] = now + self.ttl_seconds
+        return {"system_instruction": template.system_instruction}
+
+    def invalidate(self, model: str, template: PromptTemplate):
+        self._entries.pop((model, template.cache_key), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "local",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+
+class RemoteContextCache(LocalContextCache):
+    """
+    Caches each template's system instruction server-side (client.caches) so
+    requests only send the compact dynamic payload. Caches are per model.
+    Falls back to an inline system_instruction when caching is unavailable
+    (e.g. the prefix is below the model's minimum cacheable token count).
+    """
+
+    # Refresh slightly before the server-side TTL expires
+    EXPIRY_MARGIN_SECONDS = 60
+
+    def __init__(self, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self._names: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._unsupported_until: Dict[Tuple[str, str], float] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    async def resolve(self, model: str, template: PromptTemplate) -> Dict[str, Any]:
+        key = (model, template.cache_key)
+        inline = {"system_instruction": template.system_instruction}
+        now = time.monotonic()
+
+        entry = self._names.get(key)
+        if entry and entry[1] > now:
+            self.hits += 1
+            return {"cached_content": entry[0]}
+        if self._unsupported_until.get(key, 0) > now:
+            return inline
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._names.get(key)
+            if entry and entry[1] > time.monotonic():
+                self.hits += 1
+                return {"cached_content": entry[0]}
+
+            self.misses += 1
+            try:
+                from google.genai import types
+
+                cache = await gemini_backend.create_cache(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=template.cache_key,
+                        system_instruction=template.system_instruction,
+                        ttl=f"{self.ttl_seconds}s",
+                    ),
+                )
+                expires = (
+                    time.monotonic()
+                    + self.ttl_seconds
+                    - min(self.EXPIRY_MARGIN_SECONDS, self.ttl_seconds // 2)
+                )
+                self._names[key] = (cache.name, expires)
+                return {"cached_content": cache.name}
+            except Exception as e:
+                self.failures += 1
+                self._unsupported_until[key] = time.monotonic() + self.ttl_seconds
+                logger.info(
+                    f"Context cache unavailable for {template.cache_key} on {model}: {e}"
+                )
+                return inline
+
+    def invalidate(self, model: str, template: PromptTemplate):
+        self._names.pop((model, template.cache_key), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "remote",
+            "entries": len(self._names),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+
+class NoContextCache(LocalContextCache):
+    """Caching disabled — always send the system instruction inline"""
+
+    async def resolve(self, model: str, template: PromptTemplate) -> Dict[str, Any]:
+        return {"system_instruction": template.system_instruction}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "off"}
+
+
+def _create_context_cache(mode: str) -> LocalContextCache:
+    if mode == "local":
+        return LocalContextCache(GEMINI_CONTEXT_CACHE_TTL)
+    if mode == "off":
+        return NoContextCache(GEMINI_CONTEXT_CACHE_TTL)
+    return RemoteContextCache(GEMINI_CONTEXT_CACHE_TTL)
+
+
+context_cache = _create_context_cache(GEMINI_CONTEXT_CACHE)
+
+
+def get_context_cache_stats() -> Dict[str, Any]:
+    return context_cache.stats()
+
+
+async def _template_config_kwargs(
+    model_name: str, template: Optional[PromptTemplate]
+) -> Dict[str, Any]:
+    if template is None:
+        return {}
+    return await context_cache.resolve(model_name, template)
+
+
+def _is_stale_cache_error(error: Exception) -> bool:
+    return "cached" in str(error).lower()
+
+
 # ============================================
 # 🔄 CORE API CALL (Robust Fallback)
 # ============================================
 
 
-async def call_gemini(prompt: str, config: Optional[Dict] = None) -> str:
-    if not gemini_client:
+async def call_gemini(
+    prompt: Any,
+    config: Optional[Dict] = None,
+    template: Optional[PromptTemplate] = None,
+    task: Optional[str] = None,
+) -> str:
+    """
+    Generate text with model fallback.
+    prompt: the dynamic payload (or full contents) for this request.
+    config: overrides for the task's generation parameters.
+    template: static system instruction to send as a (cached) prefix.
+    task: routing-table entry (defaults to the template name).
+    """
+    if not gemini_backend:
         raise Exception("Gemini client not initialized")
 
     try:
         from google.genai import types
 
-        # Increase token limit for detailed health plans
-        generation_config = config or types.GenerateContentConfig(
-            temperature=0.7,
-            top_p=0.95,
-            top_k=40,
-            max_output_tokens=4000,
-        )
+        task_name = task or (template.name if template else "default")
+        route = get_task_route(task_name)
+        generation_params = {
+            "temperature": route["temperature"],
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": route["max_output_tokens"],
+            **(config or {}),
+        }
 
         last_error = None
 
-        for model_name in GEMINI_MODELS:
+        for index, model_name in enumerate(route["models"]):
+            if index:
+                gemini_metrics.record_fallback(task_name, model_name)
+            started = time.perf_counter()
             try:
-                response = gemini_client.models.generate_content(
-                    model=model_name, contents=prompt, config=generation_config
+                cache_kwargs = await _template_config_kwargs(model_name, template)
+                response = await asyncio.wait_for(
+                    gemini_backend.generate_content(
+                        model=model_name,
+                        contents=prompt,
+                        config=types.GenerateContentConfig(
+                            **generation_params, **cache_kwargs
+                        ),
+                    ),
+                    timeout=route["timeout"],
+                )
+                text = _extract_text(response) if response else ""
+                _record_task_sample(
+                    task_name, model_name, started, response, ok=bool(text)
+                )
+                if text:
+                    return text
+            except asyncio.TimeoutError:
+                last_error = TimeoutError(
+                    f"{model_name} timed out after {route['timeout']}s"
                 )
-                if response:
-                    text = _extract_text(response)
-                    if text:
-                        return text
+                _record_task_sample(
+                    task_name, model_name, started, ok=False, error=last_error
+                )
+                continue
             except Exception as e:
+                _record_task_sample(task_name, model_name, started, ok=False, error=e)
                 last_error = e
                 # Don't retry on Auth errors
                 if "401" in str(e) or "API key" in str(e):
                     raise e
+                if template and _is_stale_cache_error(e):
+                    context_cache.invalidate(model_name, template)
                 continue
 
         logger.error("❌ All Gemini models failed.")
@@ -127,56 +573,22 @@ async def get_gemini_enhanced_prediction(
     user_age: Optional[int] = None,
     user_gender: Optional[str] = None,
 ) -> Dict[str, Any]:
-    if not gemini_client:
+    if not gemini_backend:
         return {
             "enhanced": False,
             "ml_prediction": prediction,
             "ml_description": description,
         }
     try:
-        context_str = ""
-        if user_age:
-            context_str += f"Age: {user_age} years"
-        if user_gender:
-            context_str += f", Sex: {user_gender}"
-        if not context_str:
-            context_str = "Demographics not provided — factor this uncertainty into your assessment"
-
-        prompt = f"""You are a board-certified internal medicine physician reviewing a machine learning model's provisional diagnosis. Your role is to provide a rigorous, evidence-based clinical assessment that a patient can take to their doctor.
-
-**PATIENT DEMOGRAPHICS:** {context_str}
-**PRESENTING SYMPTOMS:** {", ".join(symptoms)}
-**ML MODEL PREDICTION:** {prediction}
-
-Provide your assessment in the following structure (Markdown format):
-
-### Clinical Assessment of {prediction}
-
-**What This Condition Is:**
-Explain the pathophysiology of {prediction} in clear, accurate language. Include the organ systems involved, what goes wrong at a biological level, and how it manifests. Do NOT oversimplify to the point of inaccuracy. Do NOT use alarming language — be factual.
-
-**Why These Symptoms Occur:**
-For each reported symptom ({", ".join(symptoms)}), explain the specific pathophysiological mechanism connecting it to {prediction}. If a symptom does NOT typically correlate with this condition, explicitly state: "Note: [symptom] is not a classic presentation of {prediction} — this warrants discussion with your physician as it may indicate a co-existing condition or alternative diagnosis."
-
-**Differential Diagnoses to Consider:**
-List 2-4 alternative conditions that could explain this symptom cluster, ordered by clinical likelihood. For each, state: the condition name, the overlapping symptoms, and one distinguishing feature that differentiates it from {prediction}. This is critical — an ML model may misclassify, and the patient must be aware of alternatives.
-
-**Red Flags — Seek Emergency Care Immediately If You Experience:**
-List specific, measurable warning signs (e.g., "fever above 103°F / 39.4°C that does not respond to antipyretics within 2 hours", NOT vague statements like "if symptoms worsen"). Each red flag must be an actionable observation the patient can identify.
-
-**Expected Clinical Course (Next 7-14 Days):**
-Describe the typical trajectory — what improves first, what may linger, and realistic recovery timelines. Include: when symptoms should start improving with appropriate treatment, when to become concerned if no improvement, and any expected complications.
-
-**Recommended Diagnostic Workup:**
-List specific lab tests, imaging, or examinations the {specialize} should consider to confirm or rule out this diagnosis. For each test, briefly state what it checks for.
-
-**Questions to Ask Your {specialize}:**
-Provide 5 specific, high-value questions the patient should bring to their appointment. These should help differentiate the diagnosis, understand treatment options, and establish follow-up criteria.
-
----
-⚕️ **Medical Disclaimer:** This analysis is generated by AI for educational and informational purposes only. It is NOT a diagnosis, NOT a treatment plan, and NOT a substitute for in-person medical evaluation. An ML model prediction has limited accuracy and must be confirmed through proper clinical examination, diagnostic testing, and physician judgment. Always consult a qualified healthcare provider before making any medical decisions."""
+        payload = ENHANCED_PREDICTION.render(
+            prediction=prediction,
+            symptoms=symptoms,
+            specialist=specialize,
+            user_age=user_age,
+            user_gender=user_gender,
+        )
 
-        response_text = await call_gemini(prompt)
+        response_text = await call_gemini(payload, template=ENHANCED_PREDICTION)
         return (
             {
                 "enhanced": True,
@@ -208,98 +620,120 @@ Provide 5 specific, high-value questions the patient should bring to their appoi
 # ============================================
 
 
-async def gemini_health_chat(message: str, context: Optional[Dict] = None) -> str:
-    if not gemini_client:
+async def gemini_health_chat(
+    message: str, context: Optional[Dict] = None, history: Optional[Dict] = None
+) -> str:
+    """history: {"summary": str, "turns": [{"message", "response"}]} from chat memory"""
+    if not gemini_backend:
         return "AI Chat unavailable."
     try:
-        context_str = ""
-        if context:
-            if context.get("recent_prediction"):
-                context_str += (
-                    f"\n- Recent AI Prediction: {context['recent_prediction']}"
-                )
-            if context.get("user_age"):
-                context_str += f"\n- Patient Age: {context['user_age']}"
-            if context.get("user_gender"):
-                context_str += f"\n- Patient Sex: {context['user_gender']}"
-
-        prompt = f"""You are a clinical health assistant on the AI Health Care Platform. You provide accurate, evidence-based medical information grounded in current clinical guidelines (WHO, CDC, NIH, NICE).
-
-**YOUR RULES — NEVER VIOLATE THESE:**
-
-1. **ACCURACY ABOVE ALL**: Never fabricate medical facts. If you are uncertain about a specific dosage, interaction, or recommendation, say "I'm not certain about this specific detail — please verify with your physician" rather than guessing.
-
-2. **EMERGENCY DETECTION**: If the user describes ANY of the following, your FIRST response must be: "⚠️ This may be a medical emergency. Please call emergency services (112/911) immediately or go to your nearest emergency room."
-   - Chest pain with shortness of breath, sweating, or arm/jaw radiation
-   - Sudden severe headache ("worst headache of my life")
-   - Signs of stroke (facial drooping, arm weakness, speech difficulty)
-   - Difficulty breathing or choking
-   - Severe allergic reaction (throat swelling, anaphylaxis)
-   - Heavy uncontrolled bleeding
-   - Suicidal thoughts or self-harm
-   - Loss of consciousness
-   - Severe abdominal pain with fever and rigidity
-   - Sudden vision loss
-
-3. **NEVER MINIMIZE**: Do not dismiss symptoms with phrases like "it's probably nothing" or "don't worry." Instead: "While this could be benign, it's important to have it evaluated because [specific reason]."
-
-4. **DRUG SAFETY**: Never recommend specific prescription medications. For OTC medications, always include: dosage limits, contraindications, and when NOT to take them. Always ask about current medications and allergies before any recommendation.
-
-5. **NO DIAGNOSIS**: You may discuss possible conditions based on symptoms, but always frame as: "Based on what you're describing, this could potentially be related to X, Y, or Z — but only a proper clinical examination can determine the actual cause."
-
-6. **CITE WHEN POSSIBLE**: Reference clinical guidelines when making recommendations (e.g., "According to WHO guidelines..." or "Current evidence suggests...").
-
-**PATIENT CONTEXT:** {context_str if context_str else "New patient — no prior data available"}
-**PATIENT QUESTION:** "{message}"
-
-**RESPONSE FORMAT:**
-- Be empathetic but clinically precise
-- Keep responses concise (2-3 paragraphs max) unless the user asks for detail
-- Use bullet points for actionable advice
-- End every response with a brief note about when to see a doctor for this specific concern
-- Include the disclaimer: "This is AI-generated health information, not a medical diagnosis. Always consult a healthcare provider for medical decisions."
-"""
-        return await call_gemini(prompt)
+        payload = HEALTH_CHAT.render(message=message, context=context, history=history)
+        return await call_gemini(payload, template=HEALTH_CHAT)
     except Exception:
         return "I'm having trouble processing that. Please try again."
 
 
-async def gemini_chat_stream(message: str, context: Optional[Dict] = None):
-    if not gemini_client:
+async def gemini_chat_stream(
+    message: str, context: Optional[Dict] = None, history: Optional[Dict] = None
+):
+    if not gemini_backend:
         yield "AI Service Unavailable"
         return
     try:
         from google.genai import types
 
-        context_str = ""
-        if context:
-            if context.get("user_age"):
-                context_str += f"Patient Age: {context.get('user_age', 'Unknown')}"
-            if context.get("user_gender"):
-                context_str += f", Sex: {context.get('user_gender', 'Unknown')}"
-
-        prompt = f"""You are a clinical health assistant. Provide accurate, evidence-based medical guidance. RULES: Never fabricate medical facts — say "I'm unsure, consult your doctor" if uncertain. If symptoms suggest an emergency (chest pain + breathing difficulty, stroke signs, severe bleeding, anaphylaxis), IMMEDIATELY instruct to call 112/911. Never minimize symptoms. Never prescribe prescription drugs — only suggest OTC with dosage limits and contraindications. Always end with "Consult a healthcare provider for medical decisions."{" " + context_str if context_str else ""}
-User: {message}"""
-        config = types.GenerateContentConfig(temperature=0.7)
+        # Streams share the chat system instruction (and its cached prefix)
+        payload = HEALTH_CHAT.render(message=message, context=context, history=history)
+        route = get_task_route("chat_stream")
 
-        for model_name in GEMINI_MODELS:
+        for index, model_name in enumerate(route["models"]):
+            if index:
+                gemini_metrics.record_fallback("chat_stream", model_name)
+            started = time.perf_counter()
+            first_token_at = None
+            last_chunk = None
             try:
-                for chunk in gemini_client.models.generate_content_stream(
-                    model=model_name, contents=prompt, config=config
-                ):
+                cache_kwargs = await _template_config_kwargs(model_name, HEALTH_CHAT)
+                config = types.GenerateContentConfig(
+                    temperature=route["temperature"],
+                    max_output_tokens=route["max_output_tokens"],
+                    **cache_kwargs,
+                )
+                deadline = time.monotonic() + route["timeout"]
+                stream = await asyncio.wait_for(
+                    gemini_backend.generate_content_stream(
+                        model=model_name, contents=payload, config=config
+                    ),
+                    timeout=route["timeout"],
+                )
+                iterator = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            iterator.__anext__(),
+                            timeout=max(deadline - time.monotonic(), 0.1),
+                        )
+                    except StopAsyncIteration:
+                        break
+                    last_chunk = chunk
                     if chunk.text:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter() - started
                         yield chunk.text
+                _record_task_sample(
+                    "chat_stream",
+                    model_name,
+                    started,
+                    last_chunk,
+                    ok=first_token_at is not None,
+                    ttft=first_token_at,
+                )
+                if first_token_at is None:
+                    continue
                 return
             except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(
+                        f"{model_name} timed out after {route['timeout']}s"
+                    )
+                _record_task_sample(
+                    "chat_stream",
+                    model_name,
+                    started,
+                    last_chunk,
+                    ok=False,
+                    error=e,
+                    ttft=first_token_at,
+                )
+                if last_chunk is not None:
+                    # Output already reached the client — don't restart mid-answer
+                    yield "\n\n[Response interrupted. Please try again.]"
+                    return
                 if "401" in str(e) or "API key" in str(e):
                     yield "Authentication error. Check API key."
                     return
+                if _is_stale_cache_error(e):
+                    context_cache.invalidate(model_name, HEALTH_CHAT)
                 continue
         yield "All AI models temporarily unavailable. Please try again."
     except Exception:
         yield "Error generating response."
 
 
+async def gemini_summarize_conversation(
+    previous_summary: str, turns: List[Dict[str, str]]
+) -> str:
+    """Fold turns leaving the chat window into the rolling summary ("" on failure)"""
+    if not gemini_backend:
+        return ""
+    try:
+        payload = CHAT_SUMMARY.render(previous_summary=previous_summary, turns=turns)
+        return (await call_gemini(payload, template=CHAT_SUMMARY)).strip()
+    except Exception as e:
+        logger.warning(f"Conversation summary failed: {e}")
+        return ""
+
+
 # ============================================
 # 📋 HYBRID HEALTH PLAN (The Masterpiece)
 # ============================================
@@ -316,75 +750,17 @@ async def gemini_personalized_health_plan(
     2. The PDF Report Data (Blood work, etc.)
     3. User Demographics
     """
-    if not gemini_client:
+    if not gemini_backend:
         return {"error": "Health plan unavailable"}
 
     try:
-        # 1. Format User Data
-        profile_str = f"{user_profile.get('age', '?')}yo {user_profile.get('gender', 'Patient')}, {user_profile.get('weight', '?')}kg, {user_profile.get('height', '?')}cm"
-
-        report_str = "No laboratory reports available — recommendations should be conservative and emphasize the need for baseline testing."
-        if report_analysis:
-            metrics = report_analysis.get("health_metrics", {})
-            if isinstance(metrics, dict):
-                metric_list = [f"{k}: {v}" for k, v in metrics.items() if v]
-                report_str = f"""**LABORATORY FINDINGS (from uploaded report):**
-- Report Type: {report_analysis.get("report_type", "General")}
-- Key Metrics: {", ".join(metric_list) if metric_list else "None extracted"}
-- Risk Level: {report_analysis.get("risk_level", "Not assessed")}
-- Findings: {", ".join(report_analysis.get("key_findings", []))}
-- NOTE: Interpret these values in context of the patient's demographics and condition. Flag any values outside reference ranges explicitly."""
-
-        prompt = f"""You are a board-certified physician creating an evidence-based, personalized health management plan. Your plan must be medically sound, actionable, and safe.
-
-### PATIENT FILE
-* **Demographics:** {profile_str}
-* **Primary Condition (ML-predicted):** {condition}
-* **Clinical Evidence:**
-{report_str}
-
-### CLINICAL RULES — YOU MUST FOLLOW THESE:
-
-1. **CONTRAINDICATION CHECK**: Before recommending ANY exercise, dietary change, or supplement, consider the patient's condition. For example: do NOT recommend high-intensity exercise for a cardiac condition, do NOT recommend high-potassium foods if kidney disease is suspected, do NOT recommend fasting if the patient is diabetic.
-
-2. **LAB-DRIVEN PRIORITIES**: If lab results show specific abnormalities (e.g., high LDL, low hemoglobin, elevated HbA1c), the plan MUST prioritize addressing those specific values with targeted interventions, even if the ML-predicted condition is different.
-
-3. **REALISTIC TIMELINES**: Do not promise outcomes. Use language like "typically improves within" or "many patients see improvement by" with citation of clinical norms.
-
-4. **NO PRESCRIPTION DRUGS**: Do not prescribe medications. You may recommend OTC supplements (Vitamin D, Iron, Omega-3) with standard dosages and contraindications. For anything requiring a prescription, say "Discuss with your physician: [medication class] may be appropriate."
-
-5. **MEASURABLE TARGETS**: Every recommendation must include a specific, measurable target (e.g., "Walk 30 minutes, 5 days/week" not "exercise more"; "Limit sodium to <2,300mg/day" not "reduce salt").
-
-### OUTPUT FORMAT (Markdown):
-
-### Phase 1: Stabilization (Week 1)
-* **Primary Goal:** (address the most urgent metric or symptom)
-* **Daily Routine:** (specific wake/sleep times, activity windows)
-* **Dietary Changes:**
-  - ADD: 3 specific foods with quantities and frequency, explaining the clinical reason for each
-  - REMOVE: 3 specific foods/habits, explaining what harm they cause for this condition
-* **Monitoring:** What to track daily (weight, BP, glucose, symptom diary — be specific to the condition)
-
-### Phase 2: Active Recovery (Weeks 2-3)
-* **Exercise Protocol:** Specific type, duration, frequency, intensity (use heart rate zones or RPE scale). Include warm-up and contraindicated movements.
-* **Nutritional Targets:** Macronutrient goals with daily gram targets appropriate for the condition.
-* **Mental Health:** One evidence-based stress reduction technique with specific daily duration.
-* **Hydration:** Specific daily target in liters, adjusted for condition (e.g., fluid restriction for heart failure).
-
-### Phase 3: Maintenance (Week 4+)
-* **Long-term Prevention:** Lifestyle modifications to prevent recurrence, grounded in clinical guidelines.
-* **Follow-up Testing:** Specific lab tests or imaging to request at 4-week and 12-week marks, based on the condition and any lab abnormalities.
-* **When to Seek Urgent Care:** Specific warning signs during recovery that require immediate medical attention.
-
-### Nutritional Strategy Summary
-* **Caloric Target:** (based on demographics and condition)
-* **Macro Split:** Protein/Carbs/Fat in grams and percentages
-* **Key Micronutrients:** Specific vitamins/minerals relevant to this condition with recommended daily amounts
-
----
-⚕️ **IMPORTANT**: This is an AI-generated wellness plan for educational support only. It is NOT a substitute for physician-directed treatment. Do NOT alter any prescribed medications based on this plan. Consult your healthcare provider before making dietary or exercise changes, especially if you have pre-existing conditions."""
+        payload = HEALTH_PLAN.render(
+            condition=condition,
+            user_profile=user_profile,
+            report_analysis=report_analysis,
+        )
 
-        response_text = await call_gemini(prompt)
+        response_text = await call_gemini(payload, template=HEALTH_PLAN)
 
         return (
             {
@@ -408,23 +784,61 @@ async def gemini_personalized_health_plan(
 # ============================================
 
 
-async def _analyze_media_content(content_parts: list, prompt: str) -> Dict[str, Any]:
+async def _analyze_media_content(
+    content_parts: list, template: PromptTemplate
+) -> Dict[str, Any]:
+    from google.genai import types
+
+    route = get_task_route("report_analysis")
     response_text = ""
     last_error = None
-    for model_name in GEMINI_MODELS:
+    for index, model_name in enumerate(route["models"]):
+        if index:
+            gemini_metrics.record_fallback("report_analysis", model_name)
+        started = time.perf_counter()
         try:
-            response = gemini_client.models.generate_content(
-                model=model_name, contents=[*content_parts, prompt]
+            cache_kwargs = await _template_config_kwargs(model_name, template)
+            response = await asyncio.wait_for(
+                gemini_backend.generate_content(
+                    model=model_name,
+                    contents=[*content_parts, template.render()],
+                    config=types.GenerateContentConfig(
+                        temperature=route["temperature"],
+                        max_output_tokens=route["max_output_tokens"],
+                        **cache_kwargs,
+                    ),
+                ),
+                timeout=route["timeout"],
             )
             if hasattr(response, "candidates") or hasattr(response, "text"):
                 response_text = _extract_text(response)
+                _record_task_sample(
+                    "report_analysis",
+                    model_name,
+                    started,
+                    response,
+                    ok=bool(response_text),
+                )
                 if response_text:
                     break
+        except asyncio.TimeoutError:
+            last_error = TimeoutError(
+                f"{model_name} timed out after {route['timeout']}s"
+            )
+            _record_task_sample(
+                "report_analysis", model_name, started, ok=False, error=last_error
+            )
+            continue
         except Exception as e:
+            _record_task_sample(
+                "report_analysis", model_name, started, ok=False, error=e
+            )
             last_error = e
             if "401" in str(e) or "API key" in str(e):
                 logger.error(f"Auth error in media analysis: {e}")
                 return {"success": False, "error": "Authentication failed"}
+            if _is_stale_cache_error(e):
+                context_cache.invalidate(model_name, template)
             continue
 
     if not response_text:
@@ -444,7 +858,7 @@ async def _analyze_media_content(content_parts: list, prompt: str) -> Dict[str,
 
 
 async def analyze_pdf_report(file_path: str) -> Dict[str, Any]:
-    if not gemini_client:
+    if not gemini_backend:
         return {"success": False, "error": "Gemini unavailable"}
     try:
         from google.genai import types
@@ -454,37 +868,13 @@ async def analyze_pdf_report(file_path: str) -> Dict[str, Any]:
             data=file_bytes, mime_type="application/pdf"
         )
 
-        prompt = """You are a clinical laboratory specialist analyzing a medical report. Extract data with absolute precision — do NOT infer, estimate, or fabricate any value that is not explicitly present in the document.
-
-Output STRICT JSON in this exact format:
-{
-  "report_type": "string (e.g., Complete Blood Count, Lipid Profile, Liver Function Test, Metabolic Panel, Urinalysis, Thyroid Panel, HbA1c)",
-  "patient_info": "string (name, age, sex if visible — 'Not specified' if not found)",
-  "report_date": "string (date if visible — 'Not specified' if not found)",
-  "summary": "2-3 sentence clinical summary — state what is normal and what is abnormal. Be specific.",
-  "health_metrics": {
-    "Test Name": "Value Unit [Reference Range] (NORMAL/HIGH/LOW/CRITICAL)"
-  },
-  "key_findings": ["Finding 1 with clinical significance", "Finding 2 with clinical significance"],
-  "abnormal_values": ["List ONLY values outside reference range with their actual vs expected range"],
-  "risk_level": "Low / Moderate / High / Critical — based on the severity of abnormal findings",
-  "recommendations": ["Specific, actionable recommendation 1", "Specific recommendation 2"],
-  "limitations": "Note any values that were unclear, partially visible, or could not be reliably extracted"
-}
-
-RULES:
-1. health_metrics values MUST be simple strings in format: "value unit [ref range] (status)". No nested objects.
-2. If a value is not clearly legible in the document, do NOT include it — add it to "limitations" instead.
-3. For EVERY extracted metric, include the reference range if visible on the report.
-4. Flag any CRITICAL values (values dangerously outside reference range) prominently in key_findings.
-5. recommendations must be evidence-based and specific to the findings — not generic health advice."""
-        return await _analyze_media_content([pdf_content], prompt)
+        return await _analyze_media_content([pdf_content], REPORT_PDF)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 async def analyze_image_report(file_path: str) -> Dict[str, Any]:
-    if not gemini_client:
+    if not gemini_backend:
         return {"success": False, "error": "Gemini unavailable"}
     try:
         from google.genai import types
@@ -494,29 +884,7 @@ async def analyze_image_report(file_path: str) -> Dict[str, Any]:
         file_bytes = fpath.read_bytes()
         img_content = types.Part.from_bytes(data=file_bytes, mime_type=mime)
 
-        prompt = """You are a clinical laboratory specialist analyzing a medical report image. Extract data with absolute precision — do NOT infer or fabricate values not clearly visible in the image.
-
-Output STRICT JSON:
-{
-  "report_type": "string (e.g., Blood Test, Imaging Report, Prescription, Diagnostic Report)",
-  "patient_info": "string (name, age, sex if visible — 'Not specified' if not found)",
-  "report_date": "string (date if visible — 'Not specified' if not found)",
-  "summary": "2-3 sentence clinical summary of findings",
-  "health_metrics": { "Parameter": "Value Unit [Reference Range] (NORMAL/HIGH/LOW)" },
-  "key_findings": ["Finding with clinical significance"],
-  "abnormal_values": ["Values outside reference range with actual vs expected"],
-  "risk_level": "Low / Moderate / High / Critical",
-  "recommendations": ["Specific actionable recommendation"],
-  "limitations": "Note any values unclear due to image quality, partial visibility, or handwriting legibility"
-}
-
-RULES:
-1. health_metrics values MUST be simple strings. No nested objects.
-2. If a value is not clearly legible, do NOT include it — note in limitations.
-3. Include reference ranges where visible.
-4. Flag CRITICAL values prominently.
-5. If the image quality makes reliable extraction impossible, return: {"report_type": "Unclear", "summary": "Image quality insufficient for reliable extraction", "health_metrics": {}, "key_findings": [], "risk_level": "Unable to assess", "recommendations": ["Please upload a clearer image or the original PDF"], "limitations": "Specific quality issue description"}"""
-        return await _analyze_media_content([img_content], prompt)
+        return await _analyze_media_content([img_content], REPORT_IMAGE)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -542,105 +910,30 @@ async def process_medical_report(file_path: str, content_type: str) -> Dict[str,
 
 
 async def gemini_symptom_checker(symptoms_text: str) -> Dict[str, Any]:
-    if not gemini_client:
+    if not gemini_backend:
         return {"error": "Unavailable"}
     try:
-        prompt = f"""You are a clinical triage specialist conducting a structured symptom assessment. Analyze the following symptoms with medical rigor. NEVER minimize or dismiss symptoms.
-
-**Patient-Reported Symptoms:** "{symptoms_text}"
-
-Provide your assessment in the following structure (Markdown):
-
-### Triage Classification
-State ONE of the following levels with clear justification:
-- **EMERGENCY (Call 112/911 NOW):** Symptoms suggest an immediately life-threatening condition
-- **URGENT (See a doctor within 24 hours):** Symptoms suggest a condition that could worsen significantly without prompt evaluation
-- **SEMI-URGENT (Schedule appointment within 1 week):** Symptoms suggest a condition requiring medical evaluation but not immediately dangerous
-- **ROUTINE (Schedule at next available):** Symptoms are consistent with common, self-limiting conditions
-- **SELF-CARE (with monitoring):** Symptoms are mild and typically resolve with appropriate home management
-
-### Clinical Assessment
-For each potential cause, provide:
-1. **Condition name** — likelihood (Most Likely / Possible / Less Likely)
-2. **Why it fits:** Which reported symptoms support this diagnosis
-3. **What would distinguish it:** One test or observation that would confirm or rule it out
-
-List conditions in order from most to least likely. Include at least 3 possibilities.
-
-### Immediate Actions
-Provide specific, actionable steps ordered by priority:
-- What to do RIGHT NOW (e.g., "Apply cold compress for 15 minutes every 2 hours")
-- What to monitor (e.g., "Check temperature every 4 hours — seek care if above 101.3°F / 38.5°C")
-- What to AVOID (e.g., "Do not take ibuprofen if you have stomach pain or are on blood thinners")
-
-### When to Escalate
-List specific, measurable criteria for seeking immediate medical attention (e.g., "If pain intensity increases to 8/10 or above", "If symptoms persist beyond 48 hours without improvement", "If you develop [specific new symptom]").
-
----
-⚕️ This is an AI-generated symptom assessment for informational purposes only. It is NOT a clinical diagnosis. Always consult a qualified healthcare provider for proper evaluation and treatment."""
-        response = await call_gemini(prompt)
+        payload = SYMPTOM_CHECKER.render(symptoms_text=symptoms_text)
+        response = await call_gemini(payload, template=SYMPTOM_CHECKER)
         return {"analysis": response}
     except Exception:
         return {"error": "Failed"}
 
 
 async def gemini_drug_interaction_checker(medications: List[str]) -> str:
-    if not gemini_client:
+    if not gemini_backend:
         return "Unavailable"
     try:
-        prompt = f"""You are a clinical pharmacist conducting a drug interaction analysis. Provide a thorough, accurate pharmacological assessment. NEVER fabricate interactions — if you are uncertain about a specific interaction, explicitly state: "This interaction requires verification with a pharmacist or drug interaction database (e.g., Lexicomp, Micromedex)."
-
-**Medications to Analyze:** {", ".join(medications)}
-
-Provide your analysis in the following structure (Markdown):
-
-### Interaction Summary
-State the overall risk level:
-- **SEVERE / CONTRAINDICATED:** These drugs should NOT be taken together. Immediate physician consultation required.
-- **MODERATE:** Use with caution. Dose adjustment or monitoring may be needed.
-- **MINOR:** Interaction exists but is generally clinically insignificant at standard doses.
-- **NO CLINICALLY SIGNIFICANT INTERACTION:** These medications are generally safe to use together at standard doses.
-
-### Detailed Interaction Analysis
-For EACH drug pair that interacts, provide:
-1. **Drug A + Drug B:** Interaction classification (Severe/Moderate/Minor)
-2. **Mechanism:** The pharmacological mechanism (e.g., "Both drugs inhibit CYP3A4", "Additive CNS depression", "Reduced absorption due to chelation")
-3. **Clinical Effect:** What happens to the patient (e.g., "Increased bleeding risk", "Enhanced sedation", "Reduced efficacy of Drug A")
-4. **Risk Factors:** Patient populations at higher risk (e.g., elderly, renal impairment, hepatic disease)
-5. **Management:** Specific clinical recommendation (e.g., "Separate doses by at least 2 hours", "Monitor INR weekly", "Consider alternative: [specific drug]")
-
-If NO interactions are found, explicitly state for each pair: "[Drug A] and [Drug B]: No clinically significant interaction identified at standard therapeutic doses."
-
-### Important Considerations
-- Any drugs in the list that have narrow therapeutic indices (e.g., warfarin, digoxin, lithium, phenytoin)
-- Any drugs that should be taken at specific times relative to meals or other medications
-- Any common side effects that may be additive when these drugs are combined
-
-### Patient Safety Notes
-- Specific symptoms to watch for that may indicate an adverse interaction
-- When to contact a healthcare provider
-
----
-⚕️ This is an AI-generated pharmacological analysis for informational purposes only. It does NOT replace a professional pharmacist consultation or a verified drug interaction database. Always verify interactions with your pharmacist or physician, especially for complex medication regimens."""
-        return await call_gemini(prompt)
+        payload = DRUG_INTERACTIONS.render(medications=medications)
+        return await call_gemini(payload, template=DRUG_INTERACTIONS)
     except Exception:
         return "Failed"
 
 
 async def gemini_explain_medical_term(term: str) -> str:
-    if not gemini_client:
+    if not gemini_backend:
         return "Unavailable"
     try:
-        return await call_gemini(
-            f"""Explain the medical term '{term}' with clinical accuracy while being accessible to a non-medical audience.
-
-Structure your response as:
-1. **Medical Definition:** The precise clinical definition as it would appear in a medical textbook.
-2. **In Simple Terms:** A clear, everyday-language explanation that a patient would understand. Use an analogy if it genuinely helps understanding — but NEVER sacrifice accuracy for simplicity.
-3. **Why It Matters:** One sentence on the clinical significance — why a doctor would mention or test for this.
-4. **Related Terms:** 1-2 related medical terms the patient might also encounter in this context.
-
-RULES: Do NOT oversimplify to the point of inaccuracy. If the term has multiple meanings in different medical contexts, mention the most common one and note the existence of others."""
-        )
+        return await call_gemini(EXPLAIN_TERM.render(term=term), template=EXPLAIN_TERM)
     except Exception:
         return "Failed"
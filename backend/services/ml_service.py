@@ -12,6 +12,10 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import Counter
 
+from services.symptom_normalizer import build_symptom_normalizer
+from services.symptom_stats import build_symptom_stats
+from services.symptom_suggest import build_symptom_suggester
+
 logger = logging.getLogger(__name__)
 
 # Global ML models
@@ -22,12 +26,16 @@ data_dict = {}
 specialization = {}
 disease_descriptions = {}
 disease_precautions = {}
+# Entries in the top-k differential stored with each prediction
+DIFFERENTIAL_SIZE = 5
+# Built once in load_models(); the symptom vocabulary never changes at runtime
+available_symptoms: List[str] = []
 
 
 async def load_models():
     """Load ML models and CSV data"""
     global svm_model, nb_model, rf_model, data_dict, specialization
-    global disease_descriptions, disease_precautions
+    global disease_descriptions, disease_precautions, available_symptoms
 
     try:
         base_dir = Path(__file__).parent.parent
@@ -77,6 +85,12 @@ async def load_models():
                 if len(row) >= 5:
                     disease_precautions[row[0]] = [row[1], row[2], row[3], row[4]]
 
+        symptom_index = data_dict["symptom_index"]
+        available_symptoms = list(symptom_index.keys())
+        build_symptom_normalizer(symptom_index)
+        build_symptom_stats(nb_model, symptom_index, data_dict["predictions_classes"])
+        build_symptom_suggester(symptom_index)
+
         logger.info("[OK] All ML models loaded successfully")
         logger.info(f"[OK] Diseases: {len(disease_descriptions)}")
         logger.info(f"[OK] Symptoms: {len(data_dict.get('symptom_index', {}))}")
@@ -114,10 +128,39 @@ def normalize_symptom_name(symptom: str) -> str:
     return symptom.lower().replace(" ", "_").replace("-", "_")
 
 
-async def predict_disease(symptoms: List[str]) -> Tuple[str, str, List[str], str]:
+def _class_scores(
+    model, input_df: pd.DataFrame, n_classes: int
+) -> Tuple[np.ndarray, int]:
+    """
+    One model's output as a score row over predictions_classes (summing to
+    1), plus the index of its predicted class. Not calibrated: GaussianNB
+    saturates near 0/1 and the SVC row is a softmax over decision values.
+    """
+    if hasattr(model, "predict_proba"):
+        raw = model.predict_proba(input_df)[0]
+        label = model.classes_[int(np.argmax(raw))]
+    else:
+        # SVC trained without probability=True: softmax over one-vs-rest
+        # scores; its vote stays the (one-vs-one) predict() label
+        label = model.predict(input_df)[0]
+        decision = np.ravel(model.decision_function(input_df))
+        if len(decision) != len(model.classes_):
+            decision = (model.classes_ == label).astype(float)
+        raw = np.exp(decision - decision.max())
+        raw /= raw.sum()
+    scores = np.zeros(n_classes)
+    scores[model.classes_] = raw
+    return scores, int(label)
+
+
+async def predict_with_differential(
+    symptoms: List[str], top_k: int = DIFFERENTIAL_SIZE
+) -> Dict:
     """
-    Predict disease from symptoms using ensemble models
-    Returns: (prediction, description, precautions, specialist)
+    Ensemble prediction plus a ranked differential. Each model is evaluated
+    once on the same input; the majority vote picks the prediction and the
+    averaged class scores give its confidence and the top-k list. These are
+    relative scores for ranking, not calibrated probabilities.
     """
     if not all([svm_model, nb_model, rf_model]):
         raise RuntimeError("ML models not loaded - prediction service unavailable")
@@ -147,28 +190,44 @@ async def predict_disease(symptoms: List[str]) -> Tuple[str, str, List[str], str
     logger.info(
         f"[PREDICT] Input shape: {input_df.shape}, Active symptoms: {sum(input_data)}"
     )
-    logger.info(
-        f"[PREDICT] Using feature names: {feature_names[:5]}..."
-    )  # Show first 5
 
-    # Get predictions from all models
-    rf_pred = data_dict["predictions_classes"][rf_model.predict(input_df)[0]]
-    nb_pred = data_dict["predictions_classes"][nb_model.predict(input_df)[0]]
-    svm_pred = data_dict["predictions_classes"][svm_model.predict(input_df)[0]]
+    classes = data_dict["predictions_classes"]
+    scores, votes = {}, {}
+    for name, model in (("rf", rf_model), ("nb", nb_model), ("svm", svm_model)):
+        scores[name], label = _class_scores(model, input_df, len(classes))
+        votes[name] = classes[label]
 
-    logger.info(f"[PREDICT] RF: {rf_pred}, NB: {nb_pred}, SVM: {svm_pred}")
+    logger.info(f"[PREDICT] RF: {votes['rf']}, NB: {votes['nb']}, SVM: {votes['svm']}")
 
     # Ensemble prediction (mode/majority voting)
-    final_prediction = mode([rf_pred, nb_pred, svm_pred])
+    final_prediction = mode([votes["rf"], votes["nb"], votes["svm"]])
+    combined = np.mean(list(scores.values()), axis=0)
+    confidence = float(combined[list(classes).index(final_prediction)])
 
-    logger.info(f"[OK] Final prediction: {final_prediction}")
+    logger.info(f"[OK] Final prediction: {final_prediction} ({confidence:.2f})")
+
+    return {
+        "prediction": final_prediction,
+        "confidence": round(confidence, 4),
+        # [[disease, relative score], ...] — compact enough to store as-is
+        "differential": [
+            [classes[i], round(float(combined[i]), 4)]
+            for i in np.argsort(-combined)[:top_k]
+        ],
+        "models": votes,
+        "description": disease_descriptions.get(
+            final_prediction, "No description available"
+        ),
+        "precautions": disease_precautions.get(final_prediction, []),
+        "specialist": specialization.get(final_prediction, "General Physician"),
+    }
 
-    # Get additional info
-    description = disease_descriptions.get(final_prediction, "No description available")
-    precautions = disease_precautions.get(final_prediction, [])
-    specialist = specialization.get(final_prediction, "General Physician")
 
-    return final_prediction, description, precautions, specialist
+def differential_as_dicts(differential: List) -> List[Dict]:
+    """Stored [[disease, relative score], ...] pairs as API objects"""
+    return [
+        {"disease": disease, "score": score} for disease, score in differential or []
+    ]
 
 
 def are_models_loaded() -> bool:
@@ -177,19 +236,5 @@ def are_models_loaded() -> bool:
 
 
 def get_available_symptoms() -> List[str]:
-    """Get list of all available symptoms"""
-    if data_dict and "symptom_index" in data_dict:
-        return list(data_dict["symptom_index"].keys())
-    return []
-
-
-def get_disease_info(disease_name: str) -> Dict:
-    """Get complete information about a disease"""
-    return {
-        "disease": disease_name,
-        "description": disease_descriptions.get(
-            disease_name, "No description available"
-        ),
-        "precautions": disease_precautions.get(disease_name, []),
-        "specialist": specialization.get(disease_name, "General Physician"),
-    }
+    """Get list of all available symptoms (shared list; do not mutate)"""
+    return available_symptoms
@@ -0,0 +1,148 @@
+"""
+Platform Statistics
+Collection totals and recent-activity counts for /admin/stats and
+/admin/system, computed off the request path. Totals come from
+estimated_document_count (collection metadata, no scan), the filtered
+counts run on indexed fields, and all of them are issued concurrently.
+
+The latest snapshot is cached in memory and recomputed every
+PLATFORM_STATS_REFRESH_INTERVAL seconds by a background task, so the admin
+dashboard reads a dict regardless of data size; each snapshot carries the
+time it was computed.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from config.settings import PLATFORM_STATS_REFRESH_INTERVAL
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+# Reported by /admin/system, in display order
+COLLECTIONS = [
+    "store",
+    "predictions",
+    "appointments",
+    "medications",
+    "medication_logs",
+    "files",
+    "journal_entries",
+    "family_profiles",
+    "notifications",
+    "doctors",
+    "doctor_reviews",
+    "chat_history",
+    "health_plans",
+    "user_stats",
+    "activity_events",
+    "contacts",
+]
+# Response keys that differ from the collection name
+COLLECTION_LABELS = {"store": "users"}
+
+_snapshot: Optional[Dict[str, Any]] = None
+_lock = asyncio.Lock()
+_task: Optional[asyncio.Task] = None
+_stats = {"refreshes": 0, "errors": 0, "last_duration_ms": None, "last_error": None}
+
+
+async def _estimated_count(collection: str) -> int:
+    return await db[collection].estimated_document_count()
+
+
+async def _count_since(collection: str, field: str, since: datetime) -> int:
+    return await db[collection].count_documents({field: {"$gte": since}})
+
+
+async def compute_platform_stats() -> Dict[str, Any]:
+    """Run every count concurrently and return a fresh snapshot"""
+    started = datetime.utcnow()
+    thirty_days_ago = started - timedelta(days=30)
+    seven_days_ago = started - timedelta(days=7)
+
+    recent = {
+        "new_users_30d": _count_since("store", "created_at", thirty_days_ago),
+        "predictions_30d": _count_since("predictions", "created_at", thirty_days_ago),
+        "appointments_30d": _count_since(
+            "appointments", "created_at", thirty_days_ago
+        ),
+        # Any tracked activity (prediction, appointment, log, journal...) counts
+        "active_users_7d": _count_since("user_stats", "last_active_at", seven_days_ago),
+        "twofa_enabled": db.store.count_documents({"totp_verified": True}),
+    }
+    results = await asyncio.gather(
+        *(_estimated_count(c) for c in COLLECTIONS), *recent.values()
+    )
+    totals = dict(zip(COLLECTIONS, results[: len(COLLECTIONS)]))
+    recent_counts = dict(zip(recent, results[len(COLLECTIONS) :]))
+
+    computed_at = datetime.utcnow()
+    _stats["last_duration_ms"] = round(
+        (computed_at - started).total_seconds() * 1000, 1
+    )
+    return {
+        "totals": totals,
+        "collections": {COLLECTION_LABELS.get(c, c): n for c, n in totals.items()},
+        "recent": recent_counts,
+        "computed_at": computed_at,
+    }
+
+
+async def refresh_platform_stats() -> Dict[str, Any]:
+    global _snapshot
+    async with _lock:
+        try:
+            _snapshot = await compute_platform_stats()
+            _stats["refreshes"] += 1
+        except Exception as e:
+            _stats["errors"] += 1
+            _stats["last_error"] = str(e)[:200]
+            if _snapshot is None:
+                raise
+            logger.warning(f"Platform stats refresh failed, serving last snapshot: {e}")
+    return _snapshot
+
+
+async def get_platform_stats(refresh: bool = False) -> Dict[str, Any]:
+    """Cached snapshot; computed now if there is none yet or a refresh is asked for"""
+    if refresh or _snapshot is None:
+        return await refresh_platform_stats()
+    return _snapshot
+
+
+async def _refresh_loop():
+    while True:
+        try:
+            await refresh_platform_stats()
+        except Exception as e:
+            logger.error(f"Platform stats refresh failed: {e}")
+        await asyncio.sleep(PLATFORM_STATS_REFRESH_INTERVAL)
+
+
+def start_platform_stats():
+    global _task
+    if PLATFORM_STATS_REFRESH_INTERVAL > 0 and _task is None:
+        _task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_platform_stats():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _task = None
+
+
+def get_platform_stats_service_stats() -> Dict[str, Any]:
+    return {
+        "refresh_interval_seconds": PLATFORM_STATS_REFRESH_INTERVAL,
+        "computed_at": _snapshot["computed_at"] if _snapshot else None,
+        **_stats,
+    }
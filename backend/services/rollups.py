@@ -0,0 +1,420 @@
+"""
+Daily Rollups
+Population analytics read from pre-aggregated daily buckets instead of
+scanning predictions / store / appointments / medication_logs. Each
+`daily_rollups` document holds one metric for one UTC day:
+
+    {_id: "predictions:2026-10-19", metric, day, total,
+     by: {disease: {...}, city: {...}, age_band: {...}, gender: {...},
+          disease_by_city: {<city>: {<disease>: n}}},
+     taken, skipped}   # medication_logs only
+
+Writes $inc the current day's bucket (record_rollup). The repair job
+recomputes the last ROLLUP_REPAIR_DAYS completed days from the source
+collections, so counts missed by a failed increment and records deleted
+since are corrected; the current day is left to the increments so the
+two never race. Buckets keep the user's city/age/gender as of the write,
+while a rebuild uses the profile as it is now.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne
+
+from config.settings import ROLLUP_REPAIR_DAYS, ROLLUP_REPAIR_INTERVAL
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+# metric -> breakdowns kept under "by"
+METRICS = {
+    "predictions": ("disease", "city", "age_band", "gender", "disease_by_city"),
+    "signups": ("city", "age_band", "gender"),
+    "appointments": ("specialization", "city"),
+    "medication_logs": (),
+}
+AGE_BANDS = ((18, "0-17"), (30, "18-29"), (45, "30-44"), (60, "45-59"))
+UNKNOWN = "unknown"
+
+_stats = {"increments": 0, "errors": 0, "last_repair": None}
+_task: Optional[asyncio.Task] = None
+
+
+def _field_key(value: Any) -> str:
+    # Field names can't contain "." or start with "$"
+    text = str(value).strip() if value not in (None, "") else UNKNOWN
+    return text.replace(".", "．").lstrip("$") or UNKNOWN
+
+
+def age_band(age: Any) -> str:
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return UNKNOWN
+    for upper, label in AGE_BANDS:
+        if age < upper:
+            return label
+    return "60+"
+
+
+def _city(user: Dict[str, Any]) -> str:
+    return _field_key(str(user.get("city") or "").strip().title())
+
+
+def _gender(user: Dict[str, Any]) -> str:
+    return _field_key(str(user.get("gender") or "").strip().lower())
+
+
+def day_start(at: datetime) -> datetime:
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _bucket_id(metric: str, day: datetime) -> str:
+    return f"{metric}:{day.strftime('%Y-%m-%d')}"
+
+
+# --- What one record adds to its bucket (shared by writes and repair) ---
+
+
+def prediction_counters(disease: Optional[str], user: Dict[str, Any]) -> Dict[str, int]:
+    disease, city = _field_key(disease), _city(user)
+    return {
+        "total": 1,
+        f"by.disease.{disease}": 1,
+        f"by.city.{city}": 1,
+        f"by.age_band.{age_band(user.get('age'))}": 1,
+        f"by.gender.{_gender(user)}": 1,
+        f"by.disease_by_city.{city}.{disease}": 1,
+    }
+
+
+def signup_counters(user: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "total": 1,
+        f"by.city.{_city(user)}": 1,
+        f"by.age_band.{age_band(user.get('age'))}": 1,
+        f"by.gender.{_gender(user)}": 1,
+    }
+
+
+def appointment_counters(appointment: Dict[str, Any]) -> Dict[str, int]:
+    """By the doctor's specialization and city"""
+    specialization = appointment.get("doctorSpecialization") or appointment.get(
+        "specialization"
+    )
+    return {
+        "total": 1,
+        f"by.specialization.{_field_key(specialization)}": 1,
+        f"by.city.{_city({'city': appointment.get('doctorCity')})}": 1,
+    }
+
+
+def medication_log_counters(skipped: bool) -> Dict[str, int]:
+    return {"total": 1, "skipped" if skipped else "taken": 1}
+
+
+async def record_rollup(
+    metric: str, at: Optional[datetime], counters: Dict[str, int], sign: int = 1
+):
+    """$inc the bucket of `at`'s day (sign=-1 takes a record back out)"""
+    day = day_start(at or datetime.utcnow())
+    try:
+        await db.daily_rollups.update_one(
+            {"_id": _bucket_id(metric, day)},
+            {
+                "$inc": {path: n * sign for path, n in counters.items()},
+                "$setOnInsert": {"metric": metric, "day": day},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+        _stats["increments"] += 1
+    except Exception as e:
+        # Never fail the write being counted; the repair job recomputes the day
+        _stats["errors"] += 1
+        logger.warning(f"{metric} rollup update failed: {e}")
+
+
+# ============================================
+# 🔧 REPAIR
+# ============================================
+
+
+def _day_of(field: str) -> Dict[str, Any]:
+    return {"$dateTrunc": {"date": f"${field}", "unit": "day"}}
+
+
+def _window(field: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    return {"$match": {field: {"$gte": start, "$lt": end, "$type": "date"}}}
+
+
+def _user_lookup(local_field: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "$lookup": {
+                "from": "store",
+                "localField": local_field,
+                "foreignField": "email",
+                "as": "user",
+            }
+        },
+        {"$set": {"user": {"$arrayElemAt": ["$user", 0]}}},
+        {"$project": {"count": 1, "user.city": 1, "user.age": 1, "user.gender": 1}},
+    ]
+
+
+async def _prediction_rows(start: datetime, end: datetime):
+    pipeline = [
+        _window("created_at", start, end),
+        {
+            "$group": {
+                "_id": {
+                    "day": _day_of("created_at"),
+                    "email": "$email",
+                    "disease": "$ml_prediction",
+                },
+                "count": {"$sum": 1},
+            }
+        },
+        *_user_lookup("_id.email"),
+    ]
+    async for row in db.predictions.aggregate(pipeline, allowDiskUse=True):
+        counters = prediction_counters(row["_id"].get("disease"), row.get("user") or {})
+        yield row["_id"]["day"], counters, row["count"]
+
+
+async def _signup_rows(start: datetime, end: datetime):
+    pipeline = [
+        _window("created_at", start, end),
+        {"$match": {"email": {"$exists": True}}},
+        {
+            "$group": {
+                "_id": {
+                    "day": _day_of("created_at"),
+                    "city": "$city",
+                    "age": "$age",
+                    "gender": "$gender",
+                },
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    async for row in db.store.aggregate(pipeline, allowDiskUse=True):
+        yield row["_id"]["day"], signup_counters(row["_id"]), row["count"]
+
+
+async def _appointment_rows(start: datetime, end: datetime):
+    pipeline = [
+        _window("created_at", start, end),
+        {
+            "$group": {
+                "_id": {
+                    "day": _day_of("created_at"),
+                    "doctorSpecialization": {
+                        "$ifNull": ["$doctorSpecialization", "$specialization"]
+                    },
+                    "doctorCity": "$doctorCity",
+                },
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    async for row in db.appointments.aggregate(pipeline, allowDiskUse=True):
+        counters = appointment_counters(row["_id"])
+        yield row["_id"]["day"], counters, row["count"]
+
+
+async def _medication_log_rows(start: datetime, end: datetime):
+    pipeline = [
+        _window("logged_at", start, end),
+        {
+            "$group": {
+                "_id": {"day": _day_of("logged_at"), "skipped": "$skipped"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    async for row in db.medication_logs.aggregate(pipeline):
+        counters = medication_log_counters(bool(row["_id"].get("skipped")))
+        yield row["_id"]["day"], counters, row["count"]
+
+
+SOURCES = {
+    "predictions": _prediction_rows,
+    "signups": _signup_rows,
+    "appointments": _appointment_rows,
+    "medication_logs": _medication_log_rows,
+}
+
+
+def _add(doc: Dict[str, Any], path: str, n: int):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = doc.get(leaf, 0) + n
+
+
+async def rebuild_rollups(
+    days: int = ROLLUP_REPAIR_DAYS, metrics: Iterable[str] = METRICS
+) -> Dict[str, Any]:
+    """
+    Recompute the buckets of the last `days` completed days from the source
+    collections (idempotent); days without records lose their bucket
+    """
+    end = day_start(datetime.utcnow())
+    start = end - timedelta(days=days)
+    now = datetime.utcnow()
+    result: Dict[str, Any] = {"from": start, "to": end}
+    for metric in metrics:
+        buckets: Dict[datetime, Dict[str, Any]] = {}
+        async for day, counters, count in SOURCES[metric](start, end):
+            doc = buckets.setdefault(
+                day,
+                {"_id": _bucket_id(metric, day), "metric": metric, "day": day},
+            )
+            for path, n in counters.items():
+                _add(doc, path, n * count)
+        operations = []
+        for doc in buckets.values():
+            doc["updated_at"] = now
+            operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        if operations:
+            await db.daily_rollups.bulk_write(operations, ordered=False)
+        stale = await db.daily_rollups.delete_many(
+            {
+                "metric": metric,
+                "day": {"$gte": start, "$lt": end},
+                "_id": {"$nin": [doc["_id"] for doc in buckets.values()]},
+            }
+        )
+        result[metric] = {"buckets": len(buckets), "removed": stale.deleted_count}
+    _stats["last_repair"] = {"at": now, **result}
+    logger.info(f"Rollup repair: {result}")
+    return result
+
+
+async def _repair_loop():
+    while True:
+        await asyncio.sleep(ROLLUP_REPAIR_INTERVAL)
+        try:
+            await rebuild_rollups()
+        except Exception as e:
+            logger.error(f"Rollup repair failed: {e}")
+
+
+def start_rollup_repair():
+    global _task
+    if ROLLUP_REPAIR_INTERVAL > 0 and _task is None:
+        _task = asyncio.create_task(_repair_loop())
+
+
+async def stop_rollup_repair():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _task = None
+
+
+# ============================================
+# 📈 TRENDS
+# ============================================
+
+
+def _period(day: datetime, granularity: str) -> datetime:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+async def get_trend(
+    metric: str,
+    days: int = 30,
+    granularity: str = "day",
+    dimension: Optional[str] = None,
+    city: Optional[str] = None,
+    top: int = 10,
+) -> Dict[str, Any]:
+    """
+    Totals per day or week over the last `days` days, optionally broken down
+    by one dimension (or by disease within one city). Reads only the
+    metric's buckets in range, and only the fields the answer needs.
+    """
+    if dimension and (
+        dimension not in METRICS[metric] or dimension == "disease_by_city"
+    ):
+        raise ValueError(f"{metric} has no '{dimension}' breakdown")
+    if city and metric != "predictions":
+        raise ValueError("Only predictions can be filtered by city")
+    if city:
+        dimension = None
+        breakdown_path = f"by.disease_by_city.{_city({'city': city})}"
+    else:
+        breakdown_path = f"by.{dimension}" if dimension else None
+
+    since = day_start(datetime.utcnow()) - timedelta(days=days - 1)
+    projection = {"day": 1, "total": 1, "taken": 1, "skipped": 1}
+    if breakdown_path:
+        projection[breakdown_path] = 1
+
+    periods: Dict[datetime, Dict[str, Any]] = {}
+    overall: Dict[str, int] = {}
+    cursor = db.daily_rollups.find(
+        {"metric": metric, "day": {"$gte": since}}, projection
+    ).sort("day", 1)
+    async for doc in cursor:
+        point = periods.setdefault(
+            _period(doc["day"], granularity),
+            {"total": 0, "taken": 0, "skipped": 0, "breakdown": {}},
+        )
+        point["total"] += doc.get("total", 0)
+        point["taken"] += doc.get("taken", 0)
+        point["skipped"] += doc.get("skipped", 0)
+        if breakdown_path:
+            values = doc
+            for part in breakdown_path.split("."):
+                values = values.get(part) or {}
+            for key, n in values.items():
+                point["breakdown"][key] = point["breakdown"].get(key, 0) + n
+                overall[key] = overall.get(key, 0) + n
+
+    series = []
+    for period, point in sorted(periods.items()):
+        entry: Dict[str, Any] = {"period": period, "total": point["total"]}
+        if metric == "medication_logs":
+            logged = point["taken"] + point["skipped"]
+            entry["taken"] = point["taken"]
+            entry["skipped"] = point["skipped"]
+            entry["adherence"] = (
+                round(point["taken"] / logged * 100, 1) if logged else None
+            )
+        if breakdown_path:
+            entry["breakdown"] = point["breakdown"]
+        series.append(entry)
+
+    leaders = sorted(overall.items(), key=lambda item: (-item[1], item[0]))[:top]
+    return {
+        "metric": metric,
+        "granularity": granularity,
+        "dimension": "disease" if city else dimension,
+        "city": city,
+        "since": since,
+        "series": series,
+        "total": sum(point["total"] for point in periods.values()),
+        "top": [{"key": key, "count": n} for key, n in leaders],
+    }
+
+
+def get_rollup_stats() -> Dict[str, Any]:
+    return {
+        "repair_interval_seconds": ROLLUP_REPAIR_INTERVAL,
+        "repair_days": ROLLUP_REPAIR_DAYS,
+        **_stats,
+    }
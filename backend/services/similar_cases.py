@@ -0,0 +1,454 @@
+"""
+Similar Case Index
+In-memory MinHash/LSH index over the symptom sets of past predictions, used
+for "people with similar symptoms were most often diagnosed with ..." and a
+user's own similar past episodes without scanning db.predictions.
+
+- Signatures: MINHASH_PERMUTATIONS min-hashes per case. The symptom universe
+  is small, so each "permutation" is a precomputed column of random 32-bit
+  ranks, one per symptom, and signing a case is one numpy min over its rows.
+- LSH: signatures are split into LSH_BANDS bands of 3 rows; cases sharing
+  any band bucket are candidates (Jaccard 0.5 is found with p ≈ 0.99),
+  and candidates are ranked by exact Jaccard on symptom bitmasks. Only the
+  newest MAX_BUCKET_SCAN entries of a bucket are scanned, which bounds query
+  cost however popular a symptom combination gets.
+- Cases are added as predictions are made and the index is snapshotted to
+  SIMILAR_CASES_SNAPSHOT_PATH every SIMILAR_CASES_PERSIST_INTERVAL seconds
+  (and on shutdown). On startup the snapshot is loaded and only predictions
+  newer than it are read from Mongo.
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config.settings import (
+    SIMILAR_CASES_ENABLED,
+    SIMILAR_CASES_MAX,
+    SIMILAR_CASES_PERSIST_INTERVAL,
+    SIMILAR_CASES_SNAPSHOT_PATH,
+)
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+MINHASH_PERMUTATIONS = 96
+LSH_BANDS = 32  # 3 rows per band: 1 - (1 - 0.5**3)**32 ≈ 0.99 at Jaccard 0.5
+MIN_SIMILARITY = 0.3
+SNAPSHOT_VERSION = 1
+_SEED = 20240601  # fixed so bucket keys are reproducible across restarts
+MAX_BUCKET_SCAN = 32
+CATCH_UP_BATCH = 1000
+
+
+class Case:
+    __slots__ = ("case_id", "email", "prediction", "bits", "created_at")
+
+    def __init__(
+        self, case_id: str, email: str, prediction: str, bits: int, created_at
+    ):
+        self.case_id = case_id
+        self.email = email
+        self.prediction = prediction
+        self.bits = bits  # symptom bitmask as a Python int
+        self.created_at = created_at
+
+
+def _jaccard(a: int, b: int) -> float:
+    union = (a | b).bit_count()
+    return (a & b).bit_count() / union if union else 0.0
+
+
+def _bit_ids(bits: int) -> List[int]:
+    ids = []
+    while bits:
+        low = bits & -bits
+        ids.append(low.bit_length() - 1)
+        bits ^= low
+    return ids
+
+
+class SimilarCaseIndex:
+    def __init__(self, num_symptoms: int, max_cases: int = SIMILAR_CASES_MAX):
+        self.num_symptoms = num_symptoms
+        self.max_cases = max_cases
+        rng = np.random.default_rng(_SEED)
+        # (symptom, permutation) ranks
+        self._hashes = rng.integers(
+            0, 1 << 32, (num_symptoms, MINHASH_PERMUTATIONS), dtype=np.uint32
+        )
+        self._rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        self._cases: Dict[str, Case] = {}  # insertion order = oldest first
+        self._by_user: Dict[str, List[str]] = defaultdict(list)
+        self._buckets: List[Dict[bytes, List[str]]] = [
+            defaultdict(list) for _ in range(LSH_BANDS)
+        ]
+        self._stale = 0  # removed ids still referenced from buckets
+        self.watermark: Optional[datetime] = None  # newest created_at indexed
+        self.dirty = False
+        self._stats = {"queries": 0, "total_us": 0.0, "candidates": 0}
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def _band_keys(self, bits: int) -> List[bytes]:
+        ids = _bit_ids(bits)
+        signature = self._hashes[ids].min(axis=0)
+        return [
+            signature[band * self._rows : (band + 1) * self._rows].tobytes()
+            for band in range(LSH_BANDS)
+        ]
+
+    def add(self, case: Case):
+        if not case.bits or case.case_id in self._cases:
+            return
+        self._cases[case.case_id] = case
+        self._by_user[case.email].append(case.case_id)
+        for band, key in enumerate(self._band_keys(case.bits)):
+            self._buckets[band][key].append(case.case_id)
+        if isinstance(case.created_at, datetime) and (
+            self.watermark is None or case.created_at > self.watermark
+        ):
+            self.watermark = case.created_at
+        self.dirty = True
+        while len(self._cases) > self.max_cases:
+            self.remove(next(iter(self._cases)))
+
+    def remove(self, case_id: str):
+        case = self._cases.pop(case_id, None)
+        if case is not None:
+            user_cases = self._by_user.get(case.email, [])
+            if case_id in user_cases:
+                user_cases.remove(case_id)
+            if not user_cases:
+                self._by_user.pop(case.email, None)
+            self._stale += 1
+            self.dirty = True
+            if self._stale > max(1000, len(self._cases) // 5):
+                self._rebuild_buckets()
+
+    def remove_user(self, email: str) -> int:
+        case_ids = list(self._by_user.get(email, ()))
+        for case_id in case_ids:
+            self.remove(case_id)
+        return len(case_ids)
+
+    def _rebuild_buckets(self):
+        self._buckets = [defaultdict(list) for _ in range(LSH_BANDS)]
+        for case in self._cases.values():
+            for band, key in enumerate(self._band_keys(case.bits)):
+                self._buckets[band][key].append(case.case_id)
+        self._stale = 0
+
+    def query(
+        self,
+        bits: int,
+        limit: int = 20,
+        min_similarity: float = MIN_SIMILARITY,
+        exclude_ids: Iterable[str] = (),
+    ) -> List[Tuple[float, Case]]:
+        """Cases with Jaccard ≥ min_similarity to `bits`, most similar first"""
+        if not bits:
+            return []
+        started = time.perf_counter()
+        candidates: Set[str] = set()
+        for band, key in enumerate(self._band_keys(bits)):
+            bucket = self._buckets[band].get(key)
+            if bucket:
+                candidates.update(bucket[-MAX_BUCKET_SCAN:])
+        candidates.difference_update(exclude_ids)
+        scored = []
+        for case_id in candidates:
+            case = self._cases.get(case_id)
+            if case is None:
+                continue
+            similarity = _jaccard(bits, case.bits)
+            if similarity >= min_similarity:
+                scored.append((similarity, case))
+        scored.sort(key=lambda item: (-item[0], item[1].case_id))
+        self._stats["queries"] += 1
+        self._stats["candidates"] += len(candidates)
+        self._stats["total_us"] += (time.perf_counter() - started) * 1e6
+        return scored[:limit]
+
+    def user_cases(
+        self,
+        email: str,
+        bits: int,
+        limit: int = 5,
+        min_similarity: float = MIN_SIMILARITY,
+    ) -> List[Tuple[float, Case]]:
+        """The user's own cases similar to `bits` (exact; users have few cases)"""
+        scored = []
+        for case_id in self._by_user.get(email, ()):
+            case = self._cases[case_id]
+            similarity = _jaccard(bits, case.bits)
+            if similarity >= min_similarity:
+                scored.append((similarity, case))
+        scored.sort(key=lambda item: (-item[0], item[1].case_id))
+        return scored[:limit]
+
+    # ---------- persistence ----------
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "num_symptoms": self.num_symptoms,
+            "watermark": self.watermark,
+            "cases": [
+                (c.case_id, c.email, c.prediction, c.bits, c.created_at)
+                for c in self._cases.values()
+            ],
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any], num_symptoms: int):
+        """None if the snapshot doesn't match this symptom vocabulary"""
+        if (
+            data.get("version") != SNAPSHOT_VERSION
+            or data.get("num_symptoms") != num_symptoms
+        ):
+            return None
+        index = cls(num_symptoms)
+        for fields in data["cases"]:
+            index.add(Case(*fields))
+        index.watermark = data.get("watermark") or index.watermark
+        index.dirty = False
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = self._stats["queries"]
+        return {
+            "cases": len(self._cases),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "queries": queries,
+            "avg_query_us": (
+                round(self._stats["total_us"] / queries, 1) if queries else 0.0
+            ),
+            "avg_candidates": (
+                round(self._stats["candidates"] / queries, 1) if queries else 0.0
+            ),
+        }
+
+
+# ============================================
+# 🔁 LIFECYCLE
+# ============================================
+
+similar_cases: Optional[SimilarCaseIndex] = None
+_ready = False  # False until the startup catch-up has finished
+_tasks: List[asyncio.Task] = []
+
+
+def _bits_from_doc(doc: Dict[str, Any]) -> int:
+    from services.symptom_bits import encode_symptoms
+
+    raw = doc.get("symptom_bits")
+    if raw is None:
+        raw = encode_symptoms(doc.get("symptoms") or [])
+    return int.from_bytes(bytes(raw), "little")
+
+
+def _load_snapshot(num_symptoms: int) -> Optional[SimilarCaseIndex]:
+    if not os.path.exists(SIMILAR_CASES_SNAPSHOT_PATH):
+        return None
+    try:
+        with open(SIMILAR_CASES_SNAPSHOT_PATH, "rb") as f:
+            return SimilarCaseIndex.from_snapshot(pickle.load(f), num_symptoms)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable similar-case snapshot: {e}")
+        return None
+
+
+def _write_snapshot(data: Dict[str, Any]):
+    tmp_path = f"{SIMILAR_CASES_SNAPSHOT_PATH}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, SIMILAR_CASES_SNAPSHOT_PATH)
+
+
+async def persist_similar_cases():
+    """Write the snapshot if anything changed since the last one"""
+    if similar_cases is None or not _ready or not similar_cases.dirty:
+        return
+    similar_cases.dirty = False
+    data = similar_cases.snapshot()
+    try:
+        await asyncio.to_thread(_write_snapshot, data)
+    except Exception as e:
+        similar_cases.dirty = True
+        logger.warning(f"Similar-case snapshot failed: {e}")
+
+
+async def _catch_up(index: SimilarCaseIndex):
+    """Index predictions newer than the snapshot"""
+    global _ready
+    query: Dict[str, Any] = {"symptoms": {"$exists": True}}
+    if index.watermark:
+        query["created_at"] = {"$gte": index.watermark}
+    cursor = (
+        db.predictions.find(
+            query,
+            {
+                "email": 1,
+                "symptoms": 1,
+                "symptom_bits": 1,
+                "ml_prediction": 1,
+                "created_at": 1,
+            },
+        )
+        .sort("created_at", 1)
+        .batch_size(CATCH_UP_BATCH)
+    )
+    added = 0
+    try:
+        async for doc in cursor:
+            index.add(
+                Case(
+                    str(doc["_id"]),
+                    doc.get("email"),
+                    doc.get("ml_prediction"),
+                    _bits_from_doc(doc),
+                    doc.get("created_at"),
+                )
+            )
+            added += 1
+            if added % CATCH_UP_BATCH == 0:
+                await asyncio.sleep(0)  # let requests through during a big rebuild
+        logger.info(f"[OK] Similar-case index: {len(index)} cases (+{added} from DB)")
+    except Exception as e:
+        logger.warning(f"Similar-case catch-up stopped after {added} cases: {e}")
+    finally:
+        _ready = True
+
+
+async def _persist_loop():
+    while True:
+        await asyncio.sleep(SIMILAR_CASES_PERSIST_INTERVAL)
+        await persist_similar_cases()
+
+
+async def start_similar_cases(num_symptoms: int):
+    """Load the snapshot and catch up from Mongo in the background"""
+    global similar_cases, _ready
+    if not SIMILAR_CASES_ENABLED or not num_symptoms:
+        return
+    _ready = False
+    similar_cases = _load_snapshot(num_symptoms) or SimilarCaseIndex(num_symptoms)
+    _tasks.append(asyncio.create_task(_catch_up(similar_cases)))
+    _tasks.append(asyncio.create_task(_persist_loop()))
+
+
+async def stop_similar_cases():
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _tasks.clear()
+    await persist_similar_cases()
+
+
+def add_prediction_case(doc: Dict[str, Any]):
+    """Index a stored prediction document (must already have its _id)"""
+    if similar_cases is None or "_id" not in doc:
+        return
+    try:
+        similar_cases.add(
+            Case(
+                str(doc["_id"]),
+                doc.get("email"),
+                doc.get("ml_prediction"),
+                _bits_from_doc(doc),
+                doc.get("created_at") or datetime.utcnow(),
+            )
+        )
+    except Exception as e:
+        logger.warning(f"Failed to index prediction case: {e}")
+
+
+def forget_user_cases(email: str):
+    if similar_cases is not None:
+        similar_cases.remove_user(email)
+
+
+def find_similar_cases(
+    symptoms: List[str],
+    email: Optional[str] = None,
+    limit: int = 5,
+    exclude_ids: Iterable[str] = (),
+) -> Optional[Dict[str, Any]]:
+    """
+    {"diagnoses": [...], "own_cases": [...], "matched_cases": n} for a
+    symptom set: what similar cases of other users were diagnosed with
+    (similarity-weighted share) and the caller's own similar past
+    predictions. None while the index is unavailable.
+    """
+    if similar_cases is None:
+        return None
+    from services.symptom_bits import encode_symptoms
+
+    bits = int.from_bytes(bytes(encode_symptoms(symptoms)), "little")
+
+    weights: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for similarity, case in similar_cases.query(
+        bits, limit=200, exclude_ids=exclude_ids
+    ):
+        if case.email != email and case.prediction:
+            weights[case.prediction] += similarity
+            counts[case.prediction] += 1
+
+    own_cases = []
+    if email:
+        for similarity, case in similar_cases.user_cases(email, bits, limit):
+            if case.case_id in exclude_ids:
+                continue
+            own_cases.append(
+                {
+                    "prediction_id": case.case_id,
+                    "prediction": case.prediction,
+                    "similarity": round(similarity, 3),
+                    "created_at": (
+                        case.created_at.isoformat()
+                        if isinstance(case.created_at, datetime)
+                        else case.created_at
+                    ),
+                }
+            )
+
+    total = sum(weights.values())
+    diagnoses = [
+        {
+            "disease": disease,
+            "share": round(weight / total, 3),
+            "cases": counts[disease],
+        }
+        for disease, weight in sorted(weights.items(), key=lambda kv: -kv[1])[:limit]
+    ]
+    return {
+        "diagnoses": diagnoses,
+        "own_cases": own_cases,
+        "matched_cases": sum(counts.values()),
+        "ready": _ready,
+    }
+
+
+def get_similar_cases_stats() -> Dict[str, Any]:
+    if similar_cases is None:
+        return {"enabled": SIMILAR_CASES_ENABLED, "loaded": False}
+    return {
+        "enabled": SIMILAR_CASES_ENABLED,
+        "loaded": True,
+        "ready": _ready,
+        **similar_cases.get_stats(),
+    }
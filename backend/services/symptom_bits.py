@@ -0,0 +1,178 @@
+"""
+Symptom Bitsets
+Each prediction carries `symptom_bits`: a fixed-width BSON binary with bit i
+set when the symptom with symptom_index value i was reported (bit 0 is the
+least significant bit of the first byte, the layout MongoDB's $bitsAllSet /
+$bitsAnySet / $bitsAllClear operators use). Symptom-combination questions
+("who reported X and Y but not Z") become a bitmask test per document
+instead of string-array scans.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from database.connection import db
+from services import ml_service
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def _symptom_index() -> Dict[str, int]:
+    index = ml_service.data_dict.get("symptom_index") if ml_service.data_dict else None
+    if not index:
+        raise RuntimeError("Symptom index not loaded")
+    return index
+
+
+def _symptom_id(name: str, index: Dict[str, int]) -> Optional[int]:
+    if name in index:
+        return index[name]
+    # Older documents may hold aliases or differently cased names
+    from services.symptom_normalizer import symptom_normalizer
+
+    canonical = symptom_normalizer.resolve(name) if symptom_normalizer else None
+    return index.get(canonical) if canonical else None
+
+
+def symptom_ids(symptoms: Iterable[str]) -> List[int]:
+    """Bit positions of known symptom names (unknown names are skipped)"""
+    index = _symptom_index()
+    ids = (_symptom_id(name, index) for name in symptoms)
+    return sorted({i for i in ids if i is not None})
+
+
+def encode_symptoms(symptoms: Iterable[str]) -> Binary:
+    """Fixed-width bitset (one bit per entry of symptom_index)"""
+    index = _symptom_index()
+    bits = bytearray((len(index) + 7) // 8)
+    for name in symptoms:
+        symptom_id = _symptom_id(name, index)
+        if symptom_id is not None:
+            bits[symptom_id // 8] |= 1 << (symptom_id % 8)
+    return Binary(bytes(bits))
+
+
+def symptom_bits_filter(
+    all_of: Iterable[str] = (),
+    any_of: Iterable[str] = (),
+    none_of: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Mongo filter on symptom_bits; raises ValueError for unknown symptom names"""
+    conditions: Dict[str, Any] = {}
+    for operator, names in (
+        ("$bitsAllSet", all_of),
+        ("$bitsAnySet", any_of),
+        ("$bitsAllClear", none_of),
+    ):
+        names = list(names)
+        if not names:
+            continue
+        index = _symptom_index()
+        unknown = [name for name in names if _symptom_id(name, index) is None]
+        if unknown:
+            raise ValueError(f"Unknown symptoms: {', '.join(unknown)}")
+        conditions[operator] = symptom_ids(names)
+    return {"symptom_bits": conditions} if conditions else {}
+
+
+def _facet_count(result: Dict[str, Any], facet: str) -> int:
+    """Value of a [{"$count": "n"}] facet, which is empty when nothing matched"""
+    rows = result.get(facet) or []
+    return rows[0]["n"] if rows else 0
+
+
+async def symptom_combination_stats(
+    all_of: Iterable[str] = (),
+    any_of: Iterable[str] = (),
+    none_of: Iterable[str] = (),
+    since: Optional[datetime] = None,
+    user_limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Predictions and users matching a symptom combination, the diseases
+    predicted for them and the users who reported it most (one aggregation)
+    """
+    match = symptom_bits_filter(all_of, any_of, none_of)
+    if since:
+        match["created_at"] = {"$gte": since}
+    # Each facet's output is a single document (16MB cap), so every facet
+    # reduces to a bounded result: counts or a limited list
+    pipeline = [
+        {"$match": match},
+        {
+            "$facet": {
+                "prediction_count": [{"$count": "n"}],
+                "user_count": [{"$group": {"_id": "$email"}}, {"$count": "n"}],
+                "users": [
+                    {
+                        "$group": {
+                            "_id": "$email",
+                            "predictions": {"$sum": 1},
+                            "last_reported": {"$max": "$created_at"},
+                        }
+                    },
+                    {"$sort": {"predictions": -1, "last_reported": -1}},
+                    {"$limit": user_limit},
+                ],
+                "diseases": [
+                    {"$group": {"_id": "$ml_prediction", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": 10},
+                ],
+            }
+        },
+    ]
+    result = await db.predictions.aggregate(pipeline).to_list(length=1)
+    result = result[0] if result else {}
+    return {
+        "predictions": _facet_count(result, "prediction_count"),
+        "users": _facet_count(result, "user_count"),
+        "top_users": [
+            {
+                "email": u["_id"],
+                "predictions": u["predictions"],
+                "last_reported": u.get("last_reported"),
+            }
+            for u in result.get("users", [])
+        ],
+        "diseases": [
+            {"disease": d["_id"], "count": d["count"]}
+            for d in result.get("diseases", [])
+        ],
+    }
+
+
+async def backfill_symptom_bits(
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Add symptom_bits to predictions stored before bitsets existed (idempotent)"""
+    _symptom_index()  # fail fast if models aren't loaded
+    stats = {"updated": 0, "batches": 0}
+    cursor = db.predictions.find(
+        {"symptom_bits": {"$exists": False}}, {"symptoms": 1}
+    ).batch_size(batch_size)
+    operations: List[UpdateOne] = []
+    async for doc in cursor:
+        operations.append(
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"symptom_bits": encode_symptoms(doc.get("symptoms") or [])}},
+            )
+        )
+        if len(operations) >= batch_size:
+            await db.predictions.bulk_write(operations, ordered=False)
+            stats["updated"] += len(operations)
+            stats["batches"] += 1
+            operations = []
+    if operations:
+        await db.predictions.bulk_write(operations, ordered=False)
+        stats["updated"] += len(operations)
+        stats["batches"] += 1
+    logger.info(f"Symptom bitset backfill: {stats}")
+    return stats
@@ -0,0 +1,580 @@
+"""
+Symptom Normalizer
+Maps free text (journal entries, chat messages, voice transcripts) and loosely
+spelled symptom names onto the model's canonical symptom vocabulary
+(data_dict["symptom_index"]).
+
+Built once in load_models():
+- an Aho-Corasick automaton over every canonical name and alias, so one pass
+  over the text finds all exact mentions regardless of vocabulary size;
+- a trigram inverted index over the same phrases for typo-tolerant lookup
+  (candidates by shared trigrams, confirmed with a bounded edit distance),
+  used only for the words the automaton left unmatched.
+"""
+
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.aho_corasick import AhoCorasick
+from utils.text import (
+    CLAUSE_BOUNDARIES,
+    is_negated,
+    levenshtein,
+    normalize_text,
+    trigrams,
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# 📖 ALIASES (colloquial English, Hindi, Hinglish)
+# ============================================
+
+SYMPTOM_ALIASES: Dict[str, List[str]] = {
+    "Itching": ["itch", "itchy", "itchy skin", "khujli", "खुजली"],
+    "Skin Rash": ["rash", "rashes", "skin rashes", "daane", "चकत्ते", "दाने"],
+    "Continuous Sneezing": ["sneezing", "sneezes", "chheenk", "छींक", "छींकें"],
+    "Shivering": ["shaking", "kaanpna", "kapkapi", "कंपकंपी"],
+    "Chills": ["chill", "feeling cold", "thand lagna", "ठंड लगना", "ठंड लग रही"],
+    "Joint Pain": [
+        "joint ache",
+        "joints pain",
+        "aching joints",
+        "jodo me dard",
+        "jodon me dard",
+        "जोड़ों मे दर्द",
+        "जोड़ों का दर्द",
+    ],
+    "Stomach Pain": [
+        "stomach ache",
+        "stomachache",
+        "tummy ache",
+        "pet dard",
+        "pet me dard",
+        "पेट दर्द",
+        "पेट मे दर्द",
+    ],
+    "Acidity": [
+        "heartburn",
+        "acid reflux",
+        "jalan",
+        "seene me jalan",
+        "एसिडिटी",
+        "सीने मे जलन",
+    ],
+    "Ulcers On Tongue": ["mouth ulcers", "tongue ulcers", "chhale", "छाले"],
+    "Vomiting": [
+        "vomit",
+        "vomits",
+        "vomited",
+        "throwing up",
+        "threw up",
+        "puking",
+        "ulti",
+        "ultiyan",
+        "उल्टी",
+    ],
+    "Burning Micturition": [
+        "burning urination",
+        "burning while urinating",
+        "painful urination",
+        "peshab me jalan",
+        "पेशाब मे जलन",
+    ],
+    "Fatigue": [
+        "tired",
+        "tiredness",
+        "exhausted",
+        "exhaustion",
+        "no energy",
+        "thakan",
+        "thakaan",
+        "थकान",
+        "थकावट",
+    ],
+    "Weight Gain": ["gaining weight", "wajan badhna", "वजन बढ़ना"],
+    "Anxiety": ["anxious", "nervous", "ghabrahat", "घबराहट", "चिंता"],
+    "Cold Hands And Feets": ["cold hands", "cold feet", "cold hands and feet"],
+    "Mood Swings": ["moody", "mood changes"],
+    "Weight Loss": ["losing weight", "lost weight", "wajan kam", "वजन कम"],
+    "Restlessness": ["restless", "bechaini", "बेचैनी"],
+    "Lethargy": ["lethargic", "sluggish", "sust", "सुस्ती"],
+    "Irregular Sugar Level": [
+        "sugar fluctuation",
+        "blood sugar swings",
+        "unstable sugar",
+    ],
+    "Cough": ["coughing", "khansi", "khaansi", "खांसी"],
+    "High Fever": [
+        "fever",
+        "febrile",
+        "temperature",
+        "bukhar",
+        "bukhaar",
+        "tez bukhar",
+        "बुखार",
+        "तेज बुखार",
+    ],
+    "Mild Fever": [
+        "mild fever",
+        "low fever",
+        "low grade fever",
+        "slight fever",
+        "halka bukhar",
+        "हल्का बुखार",
+    ],
+    "Sunken Eyes": ["hollow eyes"],
+    "Breathlessness": [
+        "shortness of breath",
+        "short of breath",
+        "breathing difficulty",
+        "difficulty breathing",
+        "saans phoolna",
+        "सांस फूलना",
+    ],
+    "Sweating": ["sweats", "sweaty", "pasina", "paseena", "पसीना"],
+    "Dehydration": ["dehydrated", "pani ki kami", "पानी की कमी"],
+    "Indigestion": ["dyspepsia", "upset stomach", "badhazmi", "बदहजमी", "अपच"],
+    "Headache": [
+        "head ache",
+        "head pain",
+        "head hurts",
+        "sir dard",
+        "sar dard",
+        "sir me dard",
+        "sar me dard",
+        "सिरदर्द",
+        "सिर दर्द",
+        "सिर मे दर्द",
+    ],
+    "Yellowish Skin": ["yellow skin", "peeli tvacha", "पीली त्वचा"],
+    "Dark Urine": ["dark pee", "brown urine"],
+    "Nausea": [
+        "nauseous",
+        "queasy",
+        "feel like vomiting",
+        "ji machalna",
+        "jee michlana",
+        "जी मिचलाना",
+    ],
+    "Loss Of Appetite": [
+        "no appetite",
+        "not hungry",
+        "bhookh nahi",
+        "भूख नहीं",
+        "भूख कम",
+    ],
+    "Pain Behind The Eyes": ["eye pain", "pain behind eyes", "aankh ke peeche dard"],
+    "Back Pain": [
+        "backache",
+        "back ache",
+        "kamar dard",
+        "peeth dard",
+        "कमर दर्द",
+        "पीठ दर्द",
+    ],
+    "Constipation": ["constipated", "kabz", "kabj", "कब्ज"],
+    "Abdominal Pain": ["abdomen pain", "abdominal cramps"],
+    "Diarrhoea": [
+        "diarrhea",
+        "loose motion",
+        "loose motions",
+        "loose stools",
+        "runny stool",
+        "dast",
+        "दस्त",
+    ],
+    "Yellow Urine": ["yellow pee", "peela peshab", "पीला पेशाब"],
+    "Yellowing Of Eyes": ["yellow eyes", "peeli aankhen", "पीली आंखें"],
+    "Swelling Of Stomach": [
+        "stomach swelling",
+        "swollen stomach",
+        "pet me sujan",
+        "पेट मे सूजन",
+    ],
+    "Swelled Lymph Nodes": ["swollen lymph nodes", "swollen glands"],
+    "Malaise": ["unwell", "feeling sick", "not feeling well"],
+    "Blurred And Distorted Vision": [
+        "blurry vision",
+        "blurred vision",
+        "distorted vision",
+        "dhundhla dikhna",
+        "धुंधला दिखना",
+    ],
+    "Phlegm": ["mucus", "cough with mucus", "balgam", "बलगम"],
+    "Throat Irritation": [
+        "sore throat",
+        "scratchy throat",
+        "gale me kharash",
+        "gala kharab",
+        "गले मे खराश",
+    ],
+    "Redness Of Eyes": ["red eyes", "bloodshot eyes", "aankhen laal", "आंखें लाल"],
+    "Sinus Pressure": ["sinus", "sinus pain"],
+    "Runny Nose": ["running nose", "nose running", "naak behna", "नाक बहना"],
+    "Congestion": [
+        "blocked nose",
+        "stuffy nose",
+        "nasal congestion",
+        "naak band",
+        "नाक बंद",
+    ],
+    "Chest Pain": ["chest ache", "seene me dard", "सीने मे दर्द", "छाती मे दर्द"],
+    "Weakness In Limbs": ["weak arms", "weak legs", "weak limbs"],
+    "Fast Heart Rate": [
+        "racing heart",
+        "rapid heartbeat",
+        "fast heartbeat",
+        "tachycardia",
+        "dhadkan tez",
+        "धड़कन तेज",
+    ],
+    "Pain During Bowel Movements": [
+        "painful bowel movements",
+        "pain while passing stool",
+    ],
+    "Pain In Anal Region": ["anal pain", "rectal pain"],
+    "Bloody Stool": ["blood in stool", "stool with blood", "mal me khoon", "मल मे खून"],
+    "Neck Pain": ["neck ache", "gardan dard", "गर्दन दर्द", "गर्दन मे दर्द"],
+    "Dizziness": [
+        "dizzy",
+        "lightheaded",
+        "light headed",
+        "chakkar",
+        "chakkar aana",
+        "चक्कर",
+        "चक्कर आना",
+    ],
+    "Cramps": ["cramping", "muscle cramps", "aithan", "ऐंठन"],
+    "Bruising": ["bruises", "bruised easily"],
+    "Obesity": ["obese", "overweight", "motapa", "मोटापा"],
+    "Swollen Legs": [
+        "leg swelling",
+        "swelling in legs",
+        "pairon me sujan",
+        "पैरों मे सूजन",
+    ],
+    "Puffy Face And Eyes": ["puffy face", "puffy eyes", "swollen face"],
+    "Enlarged Thyroid": ["goiter", "goitre", "thyroid swelling"],
+    "Brittle Nails": ["weak nails", "nails breaking"],
+    "Swollen Extremeties": ["swollen extremities", "swollen hands and feet"],
+    "Excessive Hunger": ["always hungry", "very hungry", "zyada bhookh", "ज्यादा भूख"],
+    "Drying And Tingling Lips": ["dry lips", "tingling lips"],
+    "Slurred Speech": ["slurring", "speech slurred"],
+    "Knee Pain": ["knee ache", "ghutno me dard", "घुटनों मे दर्द", "घुटने मे दर्द"],
+    "Hip Joint Pain": ["hip pain"],
+    "Muscle Weakness": ["weak muscles"],
+    "Stiff Neck": ["neck stiffness", "gardan akadna", "गर्दन अकड़ना"],
+    "Swelling Joints": [
+        "swollen joints",
+        "joint swelling",
+        "jodo me sujan",
+        "जोड़ों मे सूजन",
+    ],
+    "Movement Stiffness": ["stiffness", "stiff joints"],
+    "Spinning Movements": ["vertigo", "room spinning", "spinning sensation"],
+    "Loss Of Balance": ["losing balance", "off balance"],
+    "Unsteadiness": ["unsteady", "wobbly"],
+    "Weakness Of One Body Side": ["one sided weakness", "weakness on one side"],
+    "Loss Of Smell": ["cant smell", "anosmia", "no smell"],
+    "Bladder Discomfort": ["bladder pain"],
+    "Foul Smell Of urine": ["smelly urine", "foul smelling urine"],
+    "Continuous Feel Of Urine": ["frequent urge to urinate", "urge to pee"],
+    "Passage Of Gases": [
+        "gas",
+        "flatulence",
+        "farting",
+        "bloating",
+        "gas banna",
+        "गैस",
+    ],
+    "Depression": ["depressed", "feeling low", "udasi", "उदासी"],
+    "Irritability": ["irritable", "chidchidapan", "चिड़चिड़ापन"],
+    "Muscle Pain": [
+        "body ache",
+        "body pain",
+        "muscle ache",
+        "myalgia",
+        "badan dard",
+        "बदन दर्द",
+        "शरीर मे दर्द",
+    ],
+    "Altered Sensorium": ["confusion", "confused", "disoriented"],
+    "Red Spots Over Body": ["red spots", "laal daane", "लाल दाने"],
+    "Belly Pain": ["belly ache", "tummy pain"],
+    "Abnormal Menstruation": [
+        "irregular periods",
+        "abnormal periods",
+        "heavy periods",
+        "period problems",
+    ],
+    "Watering From Eyes": [
+        "watery eyes",
+        "teary eyes",
+        "aankhon se paani",
+        "आंखों से पानी",
+    ],
+    "Increased Appetite": ["more hungry"],
+    "Polyuria": [
+        "frequent urination",
+        "peeing a lot",
+        "baar baar peshab",
+        "बार बार पेशाब",
+    ],
+    "Lack Of Concentration": [
+        "cant concentrate",
+        "poor concentration",
+        "trouble focusing",
+    ],
+    "Visual Disturbances": ["vision problems", "seeing spots"],
+    "Coma": ["unconscious", "behosh", "बेहोश"],
+    "Stomach Bleeding": ["vomiting blood", "blood in vomit"],
+    "Distention Of Abdomen": ["bloated abdomen", "distended abdomen"],
+    "Blood In Sputum": [
+        "coughing blood",
+        "coughing up blood",
+        "khansi me khoon",
+        "खांसी मे खून",
+    ],
+    "Prominent Veins On Calf": ["visible leg veins", "bulging veins"],
+    "Palpitations": ["palpitation", "heart pounding", "pounding heart"],
+    "Painful Walking": ["pain while walking", "hurts to walk"],
+    "Pus Filled Pimples": ["pimples", "acne", "muhase", "मुहांसे"],
+    "Blackheads": ["blackhead"],
+    "Scurring": ["scarring", "scars"],
+    "Skin Peeling": ["peeling skin"],
+    "Blister": ["blisters", "chhala"],
+    "Yellow Crust Ooze": ["yellow crust", "oozing sores"],
+}
+
+FUZZY_MIN_LENGTH = 6  # shorter words are too easily confused with common ones
+FUZZY_MIN_SIMILARITY = 0.45  # trigram Dice coefficient to consider a candidate
+FUZZY_CANDIDATES = 8
+FUZZY_MAX_TOKENS = 200  # beyond this only exact/alias matches are extracted
+FUZZY_MAX_NGRAM = 3
+FUZZY_CACHE_SIZE = 20000  # free text repeats the same non-symptom words a lot
+
+
+class SymptomNormalizer:
+    def __init__(self, symptom_index: Dict[str, int]):
+        self.symptom_index = dict(symptom_index)
+        # normalized phrase -> (canonical name, "exact" | "alias")
+        self._phrases: Dict[str, Tuple[str, str]] = {}
+        for name in self.symptom_index:
+            self._phrases.setdefault(normalize_text(name), (name, "exact"))
+        for name, aliases in SYMPTOM_ALIASES.items():
+            if name not in self.symptom_index:
+                logger.debug(f"Skipping aliases for unknown symptom {name!r}")
+                continue
+            for alias in aliases:
+                self._phrases.setdefault(normalize_text(alias), (name, "alias"))
+
+        self._matcher: AhoCorasick = AhoCorasick()
+        self._phrase_list = list(self._phrases)
+        self._phrase_grams: List[int] = []
+        # (first letter, trigram) -> phrase ids; fuzzy matches must share the
+        # first letter, which keeps posting lists short
+        self._trigram_index: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for phrase_id, phrase in enumerate(self._phrase_list):
+            self._matcher.add(phrase, phrase)
+            grams = trigrams(phrase)
+            self._phrase_grams.append(len(grams))
+            for gram in grams:
+                self._trigram_index[(phrase[0], gram)].append(phrase_id)
+        self._matcher.build()
+        self._fuzzy_cache: Dict[str, Optional[str]] = {}
+        self._stats = {"extractions": 0, "fuzzy_matches": 0, "total_us": 0.0}
+
+    # ---------- single terms ----------
+
+    def _fuzzy(self, term: str) -> Optional[str]:
+        """Closest phrase within 1 edit (2 for longer terms), sharing the first letter"""
+        if term in self._fuzzy_cache:
+            return self._fuzzy_cache[term]
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        match = self._fuzzy_cache[term] = self._closest_phrase(term)
+        return match
+
+    def _closest_phrase(self, term: str) -> Optional[str]:
+        max_distance = 1 if len(term) <= 7 else 2
+        grams = trigrams(term)
+        shared = Counter(
+            phrase_id
+            for gram in grams
+            for phrase_id in self._trigram_index.get((term[0], gram), ())
+        )
+        best: Optional[Tuple[int, str]] = None
+        for phrase_id, count in shared.most_common(FUZZY_CANDIDATES):
+            phrase = self._phrase_list[phrase_id]
+            similarity = 2 * count / (len(grams) + self._phrase_grams[phrase_id])
+            if similarity < FUZZY_MIN_SIMILARITY:
+                continue
+            distance = levenshtein(term, phrase, max_distance)
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, phrase)
+        return best[1] if best else None
+
+    def resolve(self, term: str) -> Optional[str]:
+        """Canonical symptom name for a name/alias/misspelling, or None"""
+        if term in self.symptom_index:
+            return term
+        key = normalize_text(term)
+        if not key:
+            return None
+        if key in self._phrases:
+            return self._phrases[key][0]
+        if len(key) >= FUZZY_MIN_LENGTH:
+            phrase = self._fuzzy(key)
+            if phrase:
+                self._stats["fuzzy_matches"] += 1
+                return self._phrases[phrase][0]
+        return None
+
+    def canonicalize(self, symptoms: List[str]) -> Tuple[List[str], List[str]]:
+        """Split user-supplied names into (canonical names, unrecognized inputs)"""
+        recognized: List[str] = []
+        unrecognized: List[str] = []
+        for symptom in symptoms:
+            name = self.resolve(symptom)
+            if name is None:
+                unrecognized.append(symptom)
+            elif name not in recognized:
+                recognized.append(name)
+        return recognized, unrecognized
+
+    # ---------- free text ----------
+
+    def _clause_mentions(self, clause: str) -> List[Dict[str, Any]]:
+        text = normalize_text(clause)
+        if not text:
+            return []
+        spans = [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]
+        token_at = {start: i for i, (start, _) in enumerate(spans)}
+        tokens = [text[s:e] for s, e in spans]
+
+        # Leftmost-longest, non-overlapping automaton matches
+        found = sorted(self._matcher.find_all(text), key=lambda m: (m[0], m[0] - m[1]))
+        matches: List[Tuple[int, int, str, str]] = (
+            []
+        )  # first token, end token, phrase, method
+        covered = [False] * len(tokens)
+        last_end = -1
+        for start, end, phrase in found:
+            if start < last_end:
+                continue
+            first = token_at[start]
+            last = first + phrase.count(" ")
+            matches.append((first, last + 1, phrase, self._phrases[phrase][1]))
+            covered[first : last + 1] = [True] * (last + 1 - first)
+            last_end = end
+
+        # Typo-tolerant pass over the words the automaton did not cover
+        if len(tokens) <= FUZZY_MAX_TOKENS:
+            i = 0
+            while i < len(tokens):
+                hit = None
+                if not covered[i]:
+                    for n in range(FUZZY_MAX_NGRAM, 0, -1):
+                        if i + n > len(tokens) or any(covered[i : i + n]):
+                            continue
+                        candidate = " ".join(tokens[i : i + n])
+                        if len(candidate) < FUZZY_MIN_LENGTH:
+                            continue
+                        phrase = self._fuzzy(candidate)
+                        if phrase:
+                            hit = (i, i + n, phrase, "fuzzy")
+                            break
+                if hit:
+                    matches.append(hit)
+                    self._stats["fuzzy_matches"] += 1
+                    i = hit[1]
+                else:
+                    i += 1
+
+        mentions = []
+        for first, end, phrase, method in sorted(matches):
+            mentions.append(
+                {
+                    "symptom": self._phrases[phrase][0],
+                    "text": " ".join(tokens[first:end]),
+                    "method": method,
+                    "negated": is_negated(tokens, first, end),
+                }
+            )
+        return mentions
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        Symptom mentions in free text. Returns {"symptoms": [...], "negated":
+        [...], "mentions": [...]}: canonical names reported present (in order
+        of first mention), names explicitly denied ("no fever"), and every
+        mention with the matched text and method (exact/alias/fuzzy).
+        """
+        started = time.perf_counter()
+        mentions: List[Dict[str, Any]] = []
+        for clause in CLAUSE_BOUNDARIES.split(text or ""):
+            mentions.extend(self._clause_mentions(clause))
+
+        symptoms: List[str] = []
+        negated: List[str] = []
+        for mention in mentions:
+            target = negated if mention["negated"] else symptoms
+            if mention["symptom"] not in target:
+                target.append(mention["symptom"])
+        # Reported anywhere overrides a denial elsewhere ("no fever... now fever")
+        negated = [name for name in negated if name not in symptoms]
+
+        self._stats["extractions"] += 1
+        self._stats["total_us"] += (time.perf_counter() - started) * 1e6
+        return {"symptoms": symptoms, "negated": negated, "mentions": mentions}
+
+    def get_stats(self) -> Dict[str, Any]:
+        extractions = self._stats["extractions"]
+        return {
+            "symptoms": len(self.symptom_index),
+            "phrases": len(self._phrases),
+            "trigrams": len(self._trigram_index),
+            "extractions": extractions,
+            "fuzzy_matches": self._stats["fuzzy_matches"],
+            "avg_extract_us": (
+                round(self._stats["total_us"] / extractions, 1) if extractions else 0.0
+            ),
+        }
+
+
+# Built by ml_service.load_models()
+symptom_normalizer: Optional[SymptomNormalizer] = None
+
+
+def build_symptom_normalizer(symptom_index: Dict[str, int]) -> SymptomNormalizer:
+    global symptom_normalizer
+    symptom_normalizer = SymptomNormalizer(symptom_index)
+    logger.info(
+        f"[OK] Symptom normalizer: {len(symptom_normalizer._phrases)} phrases "
+        f"for {len(symptom_index)} symptoms"
+    )
+    return symptom_normalizer
+
+
+def extract_symptoms(text: str) -> Dict[str, Any]:
+    """extract() on the loaded normalizer; empty result if models aren't loaded"""
+    if symptom_normalizer is None:
+        return {"symptoms": [], "negated": [], "mentions": []}
+    return symptom_normalizer.extract(text)
+
+
+def canonicalize_symptoms(symptoms: List[str]) -> Tuple[List[str], List[str]]:
+    """canonicalize() on the loaded normalizer; passes names through if not loaded"""
+    if symptom_normalizer is None:
+        return list(symptoms), []
+    return symptom_normalizer.canonicalize(symptoms)
+
+
+def get_symptom_normalizer_stats() -> Dict[str, Any]:
+    if symptom_normalizer is None:
+        return {"loaded": False}
+    return {"loaded": True, **symptom_normalizer.get_stats()}
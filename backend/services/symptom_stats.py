@@ -0,0 +1,113 @@
+"""
+Symptom–Disease Statistics
+Matrices derived once from the Naive Bayes model at load time. The model
+was trained on binary symptom vectors, so its per-class feature means
+(theta_) are P(symptom present | disease). Used to rank symptom suggestions
+and to pick follow-up questions without running the classifiers.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Keeps log() finite for symptoms never/always seen with a disease in training
+EPSILON = 1e-3
+
+
+class SymptomDiseaseStats:
+    def __init__(
+        self, nb_model, symptom_index: Dict[str, int], diseases: Sequence[str]
+    ):
+        # Column i of theta_ is the feature at symptom_index value i
+        self.symptoms: List[str] = [None] * len(symptom_index)
+        for name, index in symptom_index.items():
+            self.symptoms[index] = name
+        self.symptom_ids = dict(symptom_index)
+        self.diseases: List[str] = [diseases[c] for c in nb_model.classes_]
+
+        p = np.clip(np.asarray(nb_model.theta_, dtype=np.float64), EPSILON, 1 - EPSILON)
+        self.p_present = p  # (diseases, symptoms)
+        self.log_present = np.log(p)
+        self.log_absent = np.log1p(-p)
+        prior = np.asarray(nb_model.class_prior_, dtype=np.float64)
+        self.log_prior = np.log(prior / prior.sum())
+        # P(symptom present) over the training prior — ranking with nothing selected
+        self.prevalence = np.exp(self.log_prior) @ p
+
+    def ids(self, symptoms: Sequence[str]) -> List[int]:
+        """Column ids of known symptom names (unknown names are skipped)"""
+        return [self.symptom_ids[s] for s in symptoms if s in self.symptom_ids]
+
+    def posterior(
+        self, present: Sequence[int], absent: Sequence[int] = ()
+    ) -> np.ndarray:
+        """P(disease | evidence) under the NB independence assumption"""
+        log_post = self.log_prior.copy()
+        if len(present):
+            log_post += self.log_present[:, list(present)].sum(axis=1)
+        if len(absent):
+            log_post += self.log_absent[:, list(absent)].sum(axis=1)
+        log_post -= log_post.max()
+        post = np.exp(log_post)
+        return post / post.sum()
+
+    @staticmethod
+    def entropy(distribution: np.ndarray, axis: int = 0) -> np.ndarray:
+        """Shannon entropy in bits; 0·log 0 counts as 0"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(
+                distribution > 0, distribution * np.log2(distribution), 0.0
+            )
+        return -terms.sum(axis=axis)
+
+    def information_gain(
+        self, present: Sequence[int], absent: Sequence[int] = ()
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expected drop in disease entropy from asking about each symptom, for
+        all symptoms at once. Returns (gain per symptom, current posterior);
+        symptoms already answered get a gain of -inf.
+        """
+        post = self.posterior(present, absent)
+        # Joint P(disease, answer) for every candidate symptom: (diseases, symptoms)
+        joint_yes = post[:, None] * self.p_present
+        joint_no = post[:, None] - joint_yes
+        p_yes = joint_yes.sum(axis=0)
+        p_no = 1.0 - p_yes
+        expected = p_yes * self.entropy(joint_yes / p_yes) + p_no * self.entropy(
+            joint_no / p_no
+        )
+        gain = self.entropy(post) - expected
+        gain[list(present) + list(absent)] = -np.inf
+        return gain, post
+
+    def cooccurrence(self, present: Sequence[int]) -> np.ndarray:
+        """P(each symptom present | the selected ones are present)"""
+        if not len(present):
+            return self.prevalence
+        return self.posterior(present) @ self.p_present
+
+
+# Built by ml_service.load_models()
+symptom_stats: Optional[SymptomDiseaseStats] = None
+
+
+def build_symptom_stats(
+    nb_model, symptom_index: Dict[str, int], diseases: Sequence[str]
+) -> Optional[SymptomDiseaseStats]:
+    global symptom_stats
+    if not hasattr(nb_model, "theta_"):
+        logger.warning(
+            "[WARN] NB model has no class-conditional means; symptom stats disabled"
+        )
+        symptom_stats = None
+        return None
+    symptom_stats = SymptomDiseaseStats(nb_model, symptom_index, diseases)
+    logger.info(
+        f"[OK] Symptom stats: {len(symptom_stats.diseases)} diseases x "
+        f"{len(symptom_stats.symptoms)} symptoms"
+    )
+    return symptom_stats
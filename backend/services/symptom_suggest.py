@@ -0,0 +1,133 @@
+"""
+Symptom Autocomplete
+Prefix search over the symptom vocabulary for the symptom pickers. Built
+once in load_models() as a sorted array of normalized keys — each full name,
+each word inside a name ("pain" → "Joint Pain") and each alias ("bukhar" →
+"High Fever") — so a query is a bisect plus a short scan of the matching
+range. Matches are ranked by how likely they are to accompany the symptoms
+already selected (see symptom_stats).
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services import symptom_stats as stats_module
+from services.symptom_normalizer import SYMPTOM_ALIASES
+from utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Match kinds, best first
+NAME, WORD, ALIAS = 0, 1, 2
+MIN_WORD_LENGTH = 3  # "of", "in" ... are not worth indexing
+
+
+class SymptomSuggester:
+    def __init__(self, symptom_index: Dict[str, int]):
+        self.symptoms: List[str] = [None] * len(symptom_index)
+        for name, index in symptom_index.items():
+            self.symptoms[index] = name
+        self.symptom_ids = dict(symptom_index)
+
+        best: Dict[Tuple[str, int], int] = {}  # (key, symptom id) -> best kind
+        for name, symptom_id in symptom_index.items():
+            key = normalize_text(name)
+            best[(key, symptom_id)] = NAME
+            for word in key.split()[1:]:
+                if len(word) >= MIN_WORD_LENGTH:
+                    best.setdefault((word, symptom_id), WORD)
+        for name, aliases in SYMPTOM_ALIASES.items():
+            if name not in symptom_index:
+                continue
+            for alias in aliases:
+                best.setdefault((normalize_text(alias), symptom_index[name]), ALIAS)
+
+        entries = sorted((key, kind, sid) for (key, sid), kind in best.items())
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+        self._stats = {"queries": 0, "total_us": 0.0}
+
+    def _prefix_matches(self, prefix: str) -> Dict[int, Tuple[int, str]]:
+        """symptom id -> (best match kind, matched key) for keys starting with prefix"""
+        matches: Dict[int, Tuple[int, str]] = {}
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            key, kind, symptom_id = self._entries[i]
+            if symptom_id not in matches or kind < matches[symptom_id][0]:
+                matches[symptom_id] = (kind, key)
+            i += 1
+        return matches
+
+    def suggest(
+        self, query: str, selected: Sequence[str] = (), limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` symptoms matching `query` by prefix, excluding `selected`.
+        With symptoms selected, the likeliest companions come first; otherwise
+        full-name matches beat word and alias matches, then common symptoms
+        beat rare ones. An empty query ranks the whole vocabulary.
+        """
+        started = time.perf_counter()
+        selected_ids = {self.symptom_ids[s] for s in selected if s in self.symptom_ids}
+        prefix = normalize_text(query)
+        if prefix:
+            matches = self._prefix_matches(prefix)
+        else:
+            matches = {sid: (NAME, "") for sid in range(len(self.symptoms))}
+        for symptom_id in selected_ids:
+            matches.pop(symptom_id, None)
+
+        stats = stats_module.symptom_stats
+        scores = stats.cooccurrence(sorted(selected_ids)) if stats else None
+
+        def score(symptom_id: int) -> float:
+            return float(scores[symptom_id]) if scores is not None else 0.0
+
+        def order(symptom_id: int):
+            kind, name = matches[symptom_id][0], self.symptoms[symptom_id]
+            if selected_ids:
+                return (-score(symptom_id), kind, name)
+            return (kind, -score(symptom_id), name)
+
+        results = []
+        for symptom_id in sorted(matches, key=order)[:limit]:
+            kind, key = matches[symptom_id]
+            results.append(
+                {
+                    "symptom": self.symptoms[symptom_id],
+                    "matched": key if kind == ALIAS else None,
+                    "score": round(score(symptom_id), 4),
+                }
+            )
+
+        self._stats["queries"] += 1
+        self._stats["total_us"] += (time.perf_counter() - started) * 1e6
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = self._stats["queries"]
+        return {
+            "keys": len(self._keys),
+            "queries": queries,
+            "avg_query_us": (
+                round(self._stats["total_us"] / queries, 1) if queries else 0.0
+            ),
+        }
+
+
+# Built by ml_service.load_models()
+symptom_suggester: Optional[SymptomSuggester] = None
+
+
+def build_symptom_suggester(symptom_index: Dict[str, int]) -> SymptomSuggester:
+    global symptom_suggester
+    symptom_suggester = SymptomSuggester(symptom_index)
+    return symptom_suggester
+
+
+def get_symptom_suggest_stats() -> Dict[str, Any]:
+    if symptom_suggester is None:
+        return {"loaded": False}
+    return {"loaded": True, **symptom_suggester.get_stats()}
@@ -0,0 +1,126 @@
+"""
+User Context Snapshot Cache
+Small per-user snapshot (profile fields + latest prediction) used to
+personalize chat, predictions and health plans without hitting Mongo on
+every request. Entries expire after USER_CONTEXT_TTL and are invalidated
+explicitly on profile updates and refreshed in place on new predictions.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config.settings import USER_CONTEXT_MAX_ENTRIES, USER_CONTEXT_TTL
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = (
+    "name",
+    "age",
+    "gender",
+    "weight",
+    "height",
+    "bmi",
+    "pressure",
+    "city",
+)
+
+_snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_expires_at: Dict[str, float] = {}
+# Bumped on every invalidation so an in-flight load can't store stale data
+_versions: Dict[str, int] = {}
+_inflight: Dict[str, asyncio.Future] = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+async def _load_snapshot(email: str) -> Dict[str, Any]:
+    projection = {field: 1 for field in PROFILE_FIELDS}
+    user, recent = await asyncio.gather(
+        db.store.find_one({"email": email}, projection),
+        db.predictions.find_one(
+            {"email": email},
+            {"ml_prediction": 1, "created_at": 1},
+            sort=[("created_at", -1)],
+        ),
+    )
+    snapshot = {field: (user or {}).get(field) for field in PROFILE_FIELDS}
+    snapshot["exists"] = user is not None
+    snapshot["recent_prediction"] = recent.get("ml_prediction") if recent else None
+    snapshot["recent_prediction_at"] = recent.get("created_at") if recent else None
+    return snapshot
+
+
+def _store(email: str, snapshot: Dict[str, Any]):
+    _snapshots[email] = snapshot
+    _snapshots.move_to_end(email)
+    _expires_at[email] = time.monotonic() + USER_CONTEXT_TTL
+    while len(_snapshots) > USER_CONTEXT_MAX_ENTRIES:
+        evicted, _ = _snapshots.popitem(last=False)
+        _expires_at.pop(evicted, None)
+
+
+async def get_user_context(email: str) -> Dict[str, Any]:
+    """
+    Snapshot for `email`: PROFILE_FIELDS plus recent_prediction(_at) and
+    `exists` (False if no such user). Returns a copy safe to mutate.
+    """
+    snapshot = _snapshots.get(email)
+    if snapshot is not None and _expires_at.get(email, 0) > time.monotonic():
+        _stats["hits"] += 1
+        _snapshots.move_to_end(email)
+        return dict(snapshot)
+
+    _stats["misses"] += 1
+    pending = _inflight.get(email)
+    if pending is None:
+        version = _versions.get(email, 0)
+        pending = asyncio.ensure_future(_load_snapshot(email))
+        _inflight[email] = pending
+        try:
+            snapshot = await pending
+        finally:
+            _inflight.pop(email, None)
+        if _versions.get(email, 0) == version:
+            _store(email, snapshot)
+    else:
+        # Concurrent miss for the same user — share the in-flight load
+        snapshot = await asyncio.shield(pending)
+    return dict(snapshot)
+
+
+def invalidate_user_context(email: str):
+    """Drop the cached snapshot (profile changed, user deleted, ...)"""
+    _versions[email] = _versions.get(email, 0) + 1
+    if _snapshots.pop(email, None) is not None:
+        _stats["invalidations"] += 1
+    _expires_at.pop(email, None)
+
+
+def record_new_prediction(
+    email: str, prediction: str, created_at: Optional[datetime] = None
+):
+    """
+    Point the cached snapshot at a prediction that was just made, without a
+    DB round trip (the insert may not have landed yet).
+    """
+    snapshot = _snapshots.get(email)
+    if snapshot is None:
+        invalidate_user_context(email)
+        return
+    _versions[email] = _versions.get(email, 0) + 1
+    snapshot["recent_prediction"] = prediction
+    snapshot["recent_prediction_at"] = created_at or datetime.utcnow()
+
+
+def get_user_context_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_snapshots),
+        "ttl_seconds": USER_CONTEXT_TTL,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,526 @@
+"""
+Per-User Statistics
+One `user_stats` document per user (_id = email) holding record counts,
+last-activity timestamps and a tally of predicted diseases. Routes that
+insert or delete tracked records call record_created() / record_deleted(),
+which apply $inc / $max to that document, so reading a user's stats is a
+primary-key lookup instead of a count_documents per collection.
+
+The same document carries the gamification state — the calendar weeks
+with activity, 30-day medication adherence, a snapshot of the profile
+fields badges and the health score look at, and the badges earned — so the
+badge engine (services.badges) is evaluated on each write and
+/gamification is a single document read.
+
+Counter updates are not transactional with the writes they mirror; the
+reconciliation job recomputes every document from the source collections
+and repairs any drift. A user whose document has never been reconciled is
+rebuilt on first read.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from config.settings import USER_STATS_RECONCILE_INTERVAL
+from database.connection import db
+from services.badges import MAX_STREAK_WEEKS, STREAK_COUNTERS, award_badges, week_start
+from services.write_behind import flush_write_behind
+
+logger = logging.getLogger(__name__)
+
+# counter -> (collection, owner field, timestamp field)
+TRACKED = {
+    "predictions": ("predictions", "email", "created_at"),
+    "appointments": ("appointments", "user_email", "created_at"),
+    "medications": ("medications", "email", "created_at"),
+    "medication_logs": ("medication_logs", "email", "logged_at"),
+    "journal_entries": ("journal_entries", "email", "created_at"),
+    "files": ("files", "email", "uploaded_at"),
+    "family_profiles": ("family_profiles", "owner_email", "created_at"),
+}
+# Counted events without a collection of their own
+EVENTS = ("reports",)
+COUNTERS = tuple(TRACKED) + EVENTS
+# User fields copied into the document for badges and the health score
+SNAPSHOT_FIELDS = [
+    "name",
+    "age",
+    "gender",
+    "height",
+    "weight",
+    "phone",
+    "city",
+    "bmi",
+    "pressure",
+]
+ADHERENCE_WINDOW_DAYS = 30
+
+_stats = {
+    "updates": 0,
+    "update_errors": 0,
+    "rebuilds": 0,
+    "reconciled_at": None,
+    "last_reconcile": None,
+}
+_task: Optional[asyncio.Task] = None
+# Marker in `migrations`: every registered account has a user_stats document
+COVERAGE_MIGRATION = "user_stats_coverage"
+_all_users_covered = False
+
+
+def _tally_key(disease: str) -> str:
+    # Field names can't contain "." or start with "$"
+    return disease.replace(".", "．").lstrip("$") or "unknown"
+
+
+def _disease_name(key: str) -> str:
+    return key.replace("．", ".")
+
+
+async def _apply(
+    email: str, update: Dict[str, Any], evaluate: bool = False
+) -> Optional[Dict[str, Any]]:
+    try:
+        doc = await db.user_stats.find_one_and_update(
+            {"_id": email},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        _stats["updates"] += 1
+        if evaluate:
+            await award_badges(doc)
+        return doc
+    except Exception as e:
+        # Never fail the write being mirrored; reconciliation repairs the count
+        _stats["update_errors"] += 1
+        logger.warning(f"user_stats update failed for {email}: {e}")
+        return None
+
+
+async def _adherence(email_filter: Any) -> Dict[str, float]:
+    """email -> % of medication logs not skipped over the adherence window"""
+    since = datetime.utcnow() - timedelta(days=ADHERENCE_WINDOW_DAYS)
+    pipeline = [
+        {"$match": {"email": email_filter, "logged_at": {"$gte": since}}},
+        {
+            "$group": {
+                "_id": "$email",
+                "total": {"$sum": 1},
+                "taken": {"$sum": {"$cond": [{"$eq": ["$skipped", False]}, 1, 0]}},
+            }
+        },
+    ]
+    return {
+        row["_id"]: round(row["taken"] / row["total"] * 100, 1)
+        async for row in db.medication_logs.aggregate(pipeline)
+        if row["total"]
+    }
+
+
+async def record_created(
+    email: Optional[str],
+    counter: str,
+    at: Optional[datetime] = None,
+    prediction: Optional[str] = None,
+):
+    """Count one new record (or event) for a user and bump last activity"""
+    if not email:
+        return
+    at = at or datetime.utcnow()
+    inc = {f"counts.{counter}": 1}
+    if prediction:
+        inc[f"predicted.{_tally_key(prediction)}"] = 1
+    update = {
+        "$inc": inc,
+        "$max": {f"last_activity.{counter}": at, "last_active_at": at},
+    }
+    if counter in STREAK_COUNTERS:
+        update["$addToSet"] = {"active_weeks": week_start(at)}
+    if counter == "medication_logs":
+        try:
+            adherence = await _adherence(email)
+            update["$set"] = {
+                "adherence": {
+                    "percentage": adherence.get(email, 0.0),
+                    "computed_at": datetime.utcnow(),
+                }
+            }
+        except Exception as e:
+            # Still count the log; the next log or reconciliation refreshes it
+            _stats["update_errors"] += 1
+            logger.warning(f"Adherence refresh failed for {email}: {e}")
+    await _apply(email, update, evaluate=True)
+
+
+async def record_profile(email: Optional[str], user: Optional[Dict[str, Any]]):
+    """Refresh the profile snapshot after the user document changed"""
+    if not email or not user:
+        return
+    profile = {field: user.get(field) for field in SNAPSHOT_FIELDS}
+    await _apply(email, {"$set": {"profile": profile}}, evaluate=True)
+
+
+async def record_deleted(
+    email: Optional[str], counter: str, count: int = 1, prediction: Optional[str] = None
+):
+    if not email or count <= 0:
+        return
+    inc = {f"counts.{counter}": -count}
+    if prediction:
+        inc[f"predicted.{_tally_key(prediction)}"] = -count
+    await _apply(email, {"$inc": inc})
+
+
+def _shape(doc: Dict[str, Any]) -> Dict[str, Any]:
+    counts = doc.get("counts") or {}
+    tally = sorted(
+        (
+            (_disease_name(key), n)
+            for key, n in (doc.get("predicted") or {}).items()
+            if n > 0
+        ),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return {
+        "email": doc["_id"],
+        "counts": {counter: max(counts.get(counter, 0), 0) for counter in COUNTERS},
+        "predicted": [{"disease": d, "count": n} for d, n in tally],
+        "most_common_prediction": tally[0][0] if tally else None,
+        "last_activity": doc.get("last_activity") or {},
+        "last_active_at": doc.get("last_active_at"),
+        "active_weeks": sorted(doc.get("active_weeks") or []),
+        "adherence": (doc.get("adherence") or {}).get("percentage", 0.0),
+        "profile": doc.get("profile") or {},
+        "badges": doc.get("badges") or {},
+        "reconciled_at": doc.get("reconciled_at"),
+    }
+
+
+async def get_user_stats(email: str) -> Dict[str, Any]:
+    """Stats for one user; built from the source collections if never reconciled"""
+    doc = await db.user_stats.find_one({"_id": email})
+    if not doc or not doc.get("reconciled_at"):
+        doc = await reconcile_user(email)
+    return _shape(doc)
+
+
+async def get_many_user_stats(emails: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    emails = list(emails)
+    docs = {
+        doc["_id"]: doc async for doc in db.user_stats.find({"_id": {"$in": emails}})
+    }
+    missing = [e for e in emails if not docs.get(e, {}).get("reconciled_at")]
+    if missing:
+        fresh = await _rebuild({"$in": missing})
+        operations = []
+        for email in missing:
+            doc = fresh.get(email) or _empty_doc(email, datetime.utcnow())
+            operations.append(_store(doc))
+            docs[email] = {**docs.get(email, {}), **doc}
+        await db.user_stats.bulk_write(operations, ordered=False)
+        _stats["rebuilds"] += len(missing)
+    return {email: _shape(docs[email]) for email in emails if email in docs}
+
+
+async def delete_user_stats(email: str):
+    await db.user_stats.delete_one({"_id": email})
+
+
+# ============================================
+# 🔧 RECONCILIATION
+# ============================================
+
+
+def _as_date(field: str) -> Dict[str, Any]:
+    # Some collections store ISO strings; only real dates count as activity
+    return {
+        "$convert": {
+            "input": f"${field}",
+            "to": "date",
+            "onError": None,
+            "onNull": None,
+        }
+    }
+
+
+def _empty_doc(email: str, now: datetime) -> Dict[str, Any]:
+    return {
+        "_id": email,
+        "counts": {counter: 0 for counter in TRACKED},
+        "predicted": {},
+        "last_activity": {},
+        "last_active_at": None,
+        "active_weeks": [],
+        "adherence": {"percentage": 0.0, "computed_at": now},
+        "profile": {},
+        "reconciled_at": now,
+    }
+
+
+def _store(doc: Dict[str, Any]) -> UpdateOne:
+    # $set rather than replace: earned badges are not derived data
+    fields = {key: value for key, value in doc.items() if key != "_id"}
+    return UpdateOne({"_id": doc["_id"]}, {"$set": fields}, upsert=True)
+
+
+async def _rebuild(email_filter: Any) -> Dict[str, Dict[str, Any]]:
+    """Recompute stats documents for users matching an owner-field filter"""
+    # Counts must include documents still queued for insertion
+    await flush_write_behind()
+    now = datetime.utcnow()
+    docs: Dict[str, Dict[str, Any]] = {}
+
+    def doc_for(email: str) -> Dict[str, Any]:
+        if email not in docs:
+            docs[email] = _empty_doc(email, now)
+        return docs[email]
+
+    for counter, (collection, owner, time_field) in TRACKED.items():
+        pipeline = [
+            {"$match": {owner: email_filter}},
+            {
+                "$group": {
+                    "_id": f"${owner}",
+                    "count": {"$sum": 1},
+                    "last": {"$max": _as_date(time_field)},
+                }
+            },
+        ]
+        async for row in db[collection].aggregate(pipeline, allowDiskUse=True):
+            if not row["_id"]:
+                continue
+            doc = doc_for(row["_id"])
+            doc["counts"][counter] = row["count"]
+            if row.get("last"):
+                doc["last_activity"][counter] = row["last"]
+                if not doc["last_active_at"] or row["last"] > doc["last_active_at"]:
+                    doc["last_active_at"] = row["last"]
+
+    pipeline = [
+        {"$match": {"email": email_filter, "ml_prediction": {"$type": "string"}}},
+        {
+            "$group": {
+                "_id": {"email": "$email", "disease": "$ml_prediction"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    async for row in db.predictions.aggregate(pipeline, allowDiskUse=True):
+        doc = doc_for(row["_id"]["email"])
+        doc["predicted"][_tally_key(row["_id"]["disease"])] = row["count"]
+
+    # Weeks with a check-in, one bucketed aggregation across the streak sources
+    since = week_start(now) - timedelta(weeks=MAX_STREAK_WEEKS)
+
+    def activity(time_field: str) -> list:
+        return [
+            {"$match": {"email": email_filter, time_field: {"$gte": since}}},
+            {"$project": {"_id": 0, "email": 1, "at": f"${time_field}"}},
+        ]
+
+    pipeline = [
+        *activity(TRACKED["predictions"][2]),
+        {
+            "$unionWith": {
+                "coll": "journal_entries",
+                "pipeline": activity(TRACKED["journal_entries"][2]),
+            }
+        },
+        {
+            "$unionWith": {
+                "coll": "medication_logs",
+                "pipeline": activity(TRACKED["medication_logs"][2]),
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "email": "$email",
+                    "week": {
+                        "$dateTrunc": {
+                            "date": "$at",
+                            "unit": "week",
+                            "startOfWeek": "monday",
+                        }
+                    },
+                }
+            }
+        },
+    ]
+    async for row in db.predictions.aggregate(pipeline, allowDiskUse=True):
+        doc_for(row["_id"]["email"])["active_weeks"].append(row["_id"]["week"])
+    for doc in docs.values():
+        doc["active_weeks"].sort()
+
+    for email, percentage in (await _adherence(email_filter)).items():
+        doc_for(email)["adherence"]["percentage"] = percentage
+
+    projection = {field: 1 for field in SNAPSHOT_FIELDS}
+    async for user in db.store.find({"email": email_filter}, projection):
+        doc_for(user["email"])["profile"] = {
+            field: user.get(field) for field in SNAPSHOT_FIELDS
+        }
+
+    # Event counters have no source collection; keep what has been counted
+    async for existing in db.user_stats.find(
+        {
+            "_id": email_filter,
+            "$or": [{f"counts.{counter}": {"$gt": 0}} for counter in EVENTS],
+        },
+        {"counts": 1, "last_activity": 1},
+    ):
+        doc = doc_for(existing["_id"])
+        for counter in EVENTS:
+            count = (existing.get("counts") or {}).get(counter)
+            if not count:
+                continue
+            doc["counts"][counter] = count
+            at = (existing.get("last_activity") or {}).get(counter)
+            if at:
+                doc["last_activity"][counter] = at
+                if not doc["last_active_at"] or at > doc["last_active_at"]:
+                    doc["last_active_at"] = at
+    return docs
+
+
+def _drifted(stored: Optional[Dict[str, Any]], fresh: Dict[str, Any]) -> bool:
+    if not stored:
+        return True
+    stored_counts = stored.get("counts") or {}
+    if any(stored_counts.get(c, 0) != n for c, n in fresh["counts"].items()):
+        return True
+    stored_tally = {k: n for k, n in (stored.get("predicted") or {}).items() if n}
+    return stored_tally != fresh["predicted"]
+
+
+async def reconcile_user(email: str) -> Dict[str, Any]:
+    """Recompute one user's stats document and store it"""
+    docs = await _rebuild(email)
+    fields = docs.get(email) or _empty_doc(email, datetime.utcnow())
+    fields.pop("_id", None)
+    doc = await db.user_stats.find_one_and_update(
+        {"_id": email},
+        {"$set": fields},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    _stats["rebuilds"] += 1
+    # Badges met before the engine saw them are granted without a notification
+    await award_badges(doc, notify=False)
+    return doc
+
+
+async def reconcile_user_stats(batch_size: int = 500) -> Dict[str, int]:
+    """
+    Recompute every user's stats from the source collections, batch by batch
+    of registered users. Reports how many documents had drifted counts;
+    stats of users that no longer exist are removed.
+    """
+    started = datetime.utcnow()
+    result = {"users": 0, "repaired": 0, "removed": 0}
+
+    async def flush(emails: List[str]):
+        fresh = await _rebuild({"$in": emails})
+        stored = {
+            doc["_id"]: doc
+            async for doc in db.user_stats.find({"_id": {"$in": emails}})
+        }
+        docs = [fresh.get(email) or _empty_doc(email, started) for email in emails]
+        result["repaired"] += sum(_drifted(stored.get(doc["_id"]), doc) for doc in docs)
+        # Adherence and streak weeks slide with time, so every document is rewritten
+        await db.user_stats.bulk_write([_store(doc) for doc in docs], ordered=False)
+        for doc in docs:
+            doc["badges"] = (stored.get(doc["_id"]) or {}).get("badges") or {}
+            await award_badges(doc, notify=False)
+        result["users"] += len(emails)
+
+    batch: List[str] = []
+    async for user in db.store.find({"email": {"$exists": True}}, {"email": 1}):
+        batch.append(user["email"])
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    known = set(await db.store.distinct("email"))
+    orphans = [e for e in await db.user_stats.distinct("_id") if e not in known]
+    if orphans:
+        removed = await db.user_stats.delete_many({"_id": {"$in": orphans}})
+        result["removed"] = removed.deleted_count
+
+    _stats["reconciled_at"] = datetime.utcnow()
+    _stats["last_reconcile"] = result
+    await _mark_all_users_covered()
+    logger.info(f"user_stats reconciliation: {result}")
+    return result
+
+
+async def _mark_all_users_covered():
+    global _all_users_covered
+    await db.migrations.update_one(
+        {"_id": COVERAGE_MIGRATION},
+        {"$set": {"completed_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    _all_users_covered = True
+
+
+async def all_users_have_stats() -> bool:
+    """
+    Whether a full reconciliation has ever completed, so listings driven
+    from user_stats can't miss accounts created before it existed (new
+    accounts get their document at signup)
+    """
+    global _all_users_covered
+    if not _all_users_covered:
+        marker = await db.migrations.find_one({"_id": COVERAGE_MIGRATION})
+        _all_users_covered = marker is not None
+    return _all_users_covered
+
+
+async def _reconcile_loop():
+    # First run on a database that predates user_stats: cover every account now
+    try:
+        if not await all_users_have_stats():
+            await reconcile_user_stats()
+    except Exception as e:
+        logger.error(f"Initial user_stats reconciliation failed: {e}")
+    if USER_STATS_RECONCILE_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(USER_STATS_RECONCILE_INTERVAL)
+        try:
+            await reconcile_user_stats()
+        except Exception as e:
+            logger.error(f"user_stats reconciliation failed: {e}")
+
+
+def start_user_stats_reconciler():
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_reconcile_loop())
+
+
+async def stop_user_stats_reconciler():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _task = None
+
+
+def get_user_stats_service_stats() -> Dict[str, Any]:
+    return {
+        "reconcile_interval_seconds": USER_STATS_RECONCILE_INTERVAL,
+        **_stats,
+    }
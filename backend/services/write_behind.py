@@ -0,0 +1,221 @@
+"""
+Write-Behind Buffer
+Takes append-only inserts (chat turns, activity events) off the request path. Documents are queued per collection and written with
+insert_many when a collection reaches WRITE_BEHIND_BATCH_SIZE or every
+WRITE_BEHIND_FLUSH_INTERVAL seconds, and everything left is flushed on
+shutdown.
+
+Queued documents are not visible to queries until they are flushed. Anything
+read back right after it is written (predictions, health plans) is inserted
+directly instead, and readers that rebuild state from a buffered collection
+call flush_write_behind() first.
+
+Memory is bounded by WRITE_BEHIND_MAX_PENDING: when the buffer is full the
+caller writes directly (counted as overflow). Batches that keep failing are
+dropped after MAX_ATTEMPTS and counted.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from config.settings import (
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_ENABLED,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_MAX_PENDING,
+)
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # collection -> deque of (document, attempts)
+        self._queues: Dict[str, Deque[Tuple[Dict[str, Any], int]]] = {}
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "overflow": 0,
+            "dropped": 0,
+            "retried": 0,
+            "last_flush_at": None,
+            "last_error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, collection: str, document: Dict[str, Any]) -> bool:
+        """
+        Queue a document for insertion. Returns False if the buffer isn't
+        running or is full — the caller must then write it itself.
+        """
+        if not self.running:
+            return False
+        if self._pending >= self.max_pending:
+            self._stats["overflow"] += 1
+            return False
+        # Assign the id now so retries of a partially written batch are idempotent
+        document.setdefault("_id", ObjectId())
+        queue = self._queues.setdefault(collection, deque())
+        queue.append((document, 0))
+        self._pending += 1
+        self._stats["enqueued"] += 1
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"✅ Write-behind buffer started (batch={self.batch_size}, "
+                f"interval={self.flush_interval}s, max_pending={self.max_pending})"
+            )
+
+    async def stop(self):
+        """Stop the background flusher and write everything still queued"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(final=True)
+        logger.info(f"Write-behind buffer stopped: {self.get_stats()}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush error: {e}")
+
+    async def flush(
+        self, final: bool = False, collections: Optional[Iterable[str]] = None
+    ):
+        """Write what is queued (only for `collections`, if given)"""
+        wanted = set(collections) if collections is not None else None
+        async with self._flush_lock:
+            for collection, queue in list(self._queues.items()):
+                if wanted is not None and collection not in wanted:
+                    continue
+                # Only what is queued now; failed documents retry on the next flush
+                remaining = len(queue)
+                while remaining:
+                    size = min(remaining, self.batch_size)
+                    batch = [queue.popleft() for _ in range(size)]
+                    remaining -= size
+                    self._pending -= size
+                    await self._write_batch(collection, batch, final)
+            self._stats["last_flush_at"] = datetime.utcnow()
+
+    async def _write_batch(self, collection: str, batch: list, final: bool):
+        documents = [doc for doc, _ in batch]
+        failed_indexes = set()
+        try:
+            await db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean an earlier attempt already wrote the document
+            failed_indexes = {
+                err["index"]
+                for err in e.details.get("writeErrors", [])
+                if err.get("code") != DUPLICATE_KEY_ERROR
+            }
+            self._stats["last_error"] = str(e)[:200]
+        except Exception as e:
+            failed_indexes = set(range(len(batch)))
+            self._stats["last_error"] = str(e)[:200]
+            logger.warning(f"Write-behind insert into {collection} failed: {e}")
+
+        self._stats["batches"] += 1
+        self._stats["written"] += len(batch) - len(failed_indexes)
+        for index in sorted(failed_indexes):
+            document, attempts = batch[index]
+            if (
+                final
+                or attempts + 1 >= MAX_ATTEMPTS
+                or self._pending >= self.max_pending
+            ):
+                self._stats["dropped"] += 1
+                continue
+            self._stats["retried"] += 1
+            self._queues[collection].append((document, attempts + 1))
+            self._pending += 1
+        if failed_indexes and final:
+            logger.error(
+                f"Write-behind dropped {len(failed_indexes)} {collection} documents on shutdown"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running": self.running,
+            "pending": self._pending,
+            "pending_by_collection": {c: len(q) for c, q in self._queues.items() if q},
+            "max_pending": self.max_pending,
+        }
+
+
+write_behind = WriteBehindBuffer()
+
+
+async def persist(collection: str, document: Dict[str, Any]):
+    """
+    Insert `document` via the write-behind buffer, falling back to a direct
+    insert_one when buffering is disabled, stopped or full.
+    """
+    if WRITE_BEHIND_ENABLED and write_behind.enqueue(collection, document):
+        return
+    await db[collection].insert_one(document)
+
+
+async def flush_write_behind(*collections: str):
+    """
+    Make queued documents visible before reading them back (all collections
+    when none are named). Waits for a batch already being written.
+    """
+    await write_behind.flush(collections=collections or None)
+
+
+async def start_write_behind():
+    if WRITE_BEHIND_ENABLED:
+        await write_behind.start()
+
+
+async def stop_write_behind():
+    await write_behind.stop()
+
+
+def get_write_behind_stats() -> Dict[str, Any]:
+    return {"enabled": WRITE_BEHIND_ENABLED, **write_behind.get_stats()}
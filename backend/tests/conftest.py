@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the backend modules the way main.py does (from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "test-secret")
@@ -0,0 +1,90 @@
+"""
+In-memory stand-in for a Motor collection, covering only the find() subset
+the pagination code uses: equality, $lt/$lte/$gt/$gte/$ne/$in/$nin, $and/$or,
+top-level inclusion projections and multi-key sorts with MongoDB's null
+ordering (missing/null before any value ascending).
+"""
+
+import operator
+from typing import Any, Dict, List
+
+_COMPARE = {
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+}
+
+
+def _field_matches(value: Any, condition: Any) -> bool:
+    if not (
+        isinstance(condition, dict)
+        and condition
+        and next(iter(condition)).startswith("$")
+    ):
+        return value == condition
+    for op, operand in condition.items():
+        if op in _COMPARE:
+            if value is None or operand is None or not _COMPARE[op](value, operand):
+                return False
+        elif op == "$ne":
+            if value == operand:
+                return False
+        elif op == "$in":
+            if value not in operand:
+                return False
+        elif op == "$nin":
+            if value in operand:
+                return False
+        else:
+            raise NotImplementedError(op)
+    return True
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _field_matches(doc.get(key), condition):
+            return False
+    return True
+
+
+def _sort_key(value: Any):
+    return (0, 0) if value is None else (1, value)
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        # Stable sorts applied from the last key to the first
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda d: _sort_key(d.get(field)), reverse=order < 0)
+        return self
+
+    def limit(self, count: int):
+        self._docs = self._docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self._docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+
+    def find(self, query=None, projection=None):
+        found = [dict(d) for d in self.docs if matches(d, query or {})]
+        if projection:
+            keep = {k for k, v in projection.items() if v} | {"_id"}
+            found = [{k: v for k, v in d.items() if k in keep} for d in found]
+        return FakeCursor(found)
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import services.activity_feed as activity_feed
+from fake_mongo import FakeCollection
+
+EMAIL = "timeline@example.com"
+SINCE = datetime(2026, 3, 1)
+
+
+def _event(n, email=EMAIL, event_type="prediction", date=None):
+    # Pairs of events share a date so pages have to break ties on _id
+    date = date or SINCE + timedelta(hours=n // 2)
+    return {
+        "_id": ObjectId(),
+        "email": email,
+        "type": event_type,
+        "date": date,
+        "event": {"n": n},
+    }
+
+
+def _timeline(monkeypatch, events):
+    collection = FakeCollection(events)
+    monkeypatch.setattr(
+        activity_feed, "db", SimpleNamespace(activity_events=collection)
+    )
+    return collection
+
+
+def _all_pages(limit, **kwargs):
+    async def run():
+        seen, cursor = [], None
+        while True:
+            events, cursor = await activity_feed.user_timeline(
+                EMAIL, SINCE, limit=limit, cursor=cursor, **kwargs
+            )
+            seen.append([e["n"] for e in events])
+            if cursor is None:
+                return seen
+
+    return asyncio.run(run())
+
+
+def test_timeline_pages_have_no_duplicates_or_gaps(monkeypatch):
+    events = [_event(n) for n in range(11)]
+    events += [
+        _event(100, email="other@example.com"),
+        _event(101, event_type="signup"),
+        _event(102, date=SINCE - timedelta(days=1)),
+    ]
+    _timeline(monkeypatch, events)
+
+    pages = _all_pages(limit=3)
+
+    expected = [
+        e["event"]["n"]
+        for e in sorted(events[:11], key=lambda e: (e["date"], e["_id"]), reverse=True)
+    ]
+    assert [len(page) for page in pages] == [3, 3, 3, 2]
+    assert [n for page in pages for n in page] == expected
+
+
+def test_timeline_filters_by_type(monkeypatch):
+    events = [
+        _event(n, event_type=("journal" if n % 3 else "prediction")) for n in range(9)
+    ]
+    _timeline(monkeypatch, events)
+
+    pages = _all_pages(limit=2, event_type="prediction")
+
+    assert sorted(n for page in pages for n in page) == [0, 3, 6]
+
+
+def test_new_events_do_not_shift_later_pages(monkeypatch):
+    collection = _timeline(monkeypatch, [_event(n) for n in range(6)])
+
+    async def run():
+        first, cursor = await activity_feed.user_timeline(EMAIL, SINCE, limit=3)
+        collection.docs.append(_event(50, date=SINCE + timedelta(days=1)))
+        second, cursor = await activity_feed.user_timeline(
+            EMAIL, SINCE, limit=3, cursor=cursor
+        )
+        return [e["n"] for e in first], [e["n"] for e in second], cursor
+
+    first, second, cursor = asyncio.run(run())
+
+    assert set(first).isdisjoint(second)
+    assert sorted(first + second) == list(range(6))
+    assert cursor is None
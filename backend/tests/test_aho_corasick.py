@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from utils.aho_corasick import AhoCorasick
+
+
+def _matcher(patterns):
+    matcher = AhoCorasick()
+    for pattern in patterns:
+        matcher.add(pattern, pattern)
+    return matcher.build()
+
+
+def test_finds_overlapping_and_nested_patterns():
+    matcher = _matcher(["he", "she", "his", "hers"])
+
+    matches = sorted(matcher.find_all("ushers", whole_words=False))
+
+    assert matches == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_whole_words_rejects_matches_inside_words():
+    matcher = _matcher(["pain", "chest pain", "fever"])
+
+    text = "chest pain, painful feverish spain; fever."
+
+    assert matcher.find_values(text) == ["chest pain", "pain", "fever"]
+    assert matcher.find_values(text, whole_words=False).count("pain") == 3
+
+
+def test_whole_words_treats_combining_marks_as_word_chars():
+    # "सीने में दर्द" (chest pain); the vowel sign ी must not count as a boundary
+    matcher = _matcher(["दर्द", "सी"])
+
+    assert matcher.find_values("सीने में दर्द") == ["दर्द"]
+
+
+def test_matches_brute_force_on_random_text():
+    rng = random.Random(3)
+    patterns = ["ab", "abc", "bca", "c", "aab", "cab", "bb"]
+    matcher = _matcher(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abc") for _ in range(30))
+        expected = sorted(
+            (i, i + len(p), p)
+            for p in patterns
+            for i in range(len(text))
+            if text.startswith(p, i)
+        )
+        assert sorted(matcher.find_all(text, whole_words=False)) == expected
+
+
+def test_build_is_required_and_final():
+    matcher = AhoCorasick()
+    matcher.add("cough", "cough")
+    with pytest.raises(RuntimeError):
+        list(matcher.find_all("cough"))
+    matcher.build()
+    with pytest.raises(RuntimeError):
+        matcher.add("fever", "fever")
+    assert len(matcher) == 1
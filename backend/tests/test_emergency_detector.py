@@ -0,0 +1,46 @@
+import pytest
+
+from services.emergency_detector import detect_emergency
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "No chest pain and no shortness of breath",
+        "I think I have food poisoning",
+        "what is the overdose limit for paracetamol",
+        "I get sleep paralysis",
+        "takes medicine for seizures",
+        "history of seizures, doing fine now",
+        "I had chest pain and sweating 2 years ago",
+        "seene me dard nahi hai aur pasina nahi",
+    ],
+)
+def test_benign_text_is_not_an_emergency(text):
+    result = detect_emergency(text)
+    assert not result["is_emergency"], result
+    assert result["guidance"] == ""
+
+
+@pytest.mark.parametrize(
+    "text, emergency",
+    [
+        ("I have chest pain and shortness of breath", "cardiac"),
+        ("I have crushing chest pain", "cardiac"),
+        ("my father has crushing chest pain right now", "cardiac"),
+        ("no fever but chest pain and sweating", "cardiac"),
+        ("I have had chest pain since morning and I am sweating", "cardiac"),
+        ("सीने में दर्द और पसीना आ रहा है", "cardiac"),
+        ("my son is having a seizure", "unconscious"),
+        ("I just had a seizure", "unconscious"),
+        ("mujhe abhi daura pad raha hai", "unconscious"),
+        ("she swallowed poison", "poisoning"),
+        ("he took an overdose and is unconscious", "poisoning"),
+        ("baby is choking, help me", "respiratory"),
+        ("my face is drooping and speech is slurred", "stroke"),
+    ],
+)
+def test_emergencies_are_detected(text, emergency):
+    result = detect_emergency(text)
+    assert emergency in result["emergencies"], result
+    assert result["guidance"]
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.gamification as gamification
+from services.badges import BADGES, award_badges
+from services.user_stats import _shape
+
+EMAIL = "partial@example.com"
+
+
+def _stats_doc(percentage: float):
+    return {
+        "_id": EMAIL,
+        "counts": {"predictions": 3, "medication_logs": 10},
+        "active_weeks": [],
+        "adherence": {"percentage": percentage, "taken": 5, "logged": 10},
+        "profile": {"name": "Partial"},
+        "badges": {"first_prediction": datetime(2026, 1, 5)},
+        "reconciled_at": datetime(2026, 1, 5),
+    }
+
+
+def _client(monkeypatch, doc):
+    async def fake_auth(request):
+        return EMAIL
+
+    async def fake_stats(email):
+        return _shape(doc)
+
+    monkeypatch.setattr(gamification, "require_auth", fake_auth)
+    monkeypatch.setattr(gamification, "get_user_stats", fake_stats)
+    app = FastAPI()
+    app.include_router(gamification.router)
+    return TestClient(app)
+
+
+def test_gamification_with_partial_adherence(monkeypatch):
+    response = _client(monkeypatch, _stats_doc(50.0)).get("/gamification")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["adherence"]["percentage"] == 50.0
+    locked = {badge["id"]: badge for badge in data["badges"]["locked"]}
+    adherence_badges = [b for b in BADGES if b["source"] == "special_adherence"]
+    for badge in adherence_badges:
+        assert locked[badge["id"]]["progress"] == 50.0
+
+
+def test_award_badges_reads_raw_adherence():
+    # Only the adherence badge is left to evaluate; 50% doesn't meet it
+    doc = _stats_doc(50.0)
+    doc["badges"] = {
+        b["id"]: datetime(2026, 1, 5)
+        for b in BADGES
+        if b["source"] != "special_adherence"
+    }
+    assert asyncio.run(award_badges(doc, notify=False)) == []
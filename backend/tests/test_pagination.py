@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import routes.medications as medications
+from fake_mongo import FakeCollection, matches
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter, paginate
+
+EMAIL = "pages@example.com"
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    doc_id = ObjectId()
+    for value in [datetime(2026, 2, 3, 4, 5, 6, 789), "Dr. Rao", 4.5, None, doc_id]:
+        assert decode_cursor(encode_cursor(value, doc_id)) == (value, doc_id)
+    assert decode_cursor(encode_cursor(7, "a@example.com")) == (7, "a@example.com")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        _raw_cursor(["v", "id"]),
+        _raw_cursor({"v": 1}),
+        _raw_cursor({"v": 1, "id": None}),
+        _raw_cursor({"v": 1, "id": {"$oid": "not-an-object-id"}}),
+        _raw_cursor({"v": {"$date": "yesterday"}, "id": 1}),
+        _raw_cursor({"v": {"$where": "sleep(1000)"}, "id": 1}),
+        encode_cursor(datetime(2026, 1, 1), ObjectId())[:-3],
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_tampered_cursor_returns_400_from_list_endpoint(monkeypatch):
+    async def fake_auth(request):
+        return EMAIL
+
+    monkeypatch.setattr(medications, "require_auth", fake_auth)
+    monkeypatch.setattr(
+        medications, "db", SimpleNamespace(medications=FakeCollection())
+    )
+    app = FastAPI()
+    app.include_router(medications.router)
+    cursor = _raw_cursor({"v": {"$gt": ""}, "id": 1})
+
+    response = TestClient(app).get("/medications", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def _walk(docs, direction, limit=2):
+    collection = FakeCollection(docs)
+
+    async def run():
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(
+                collection, {}, "due", direction, limit, cursor
+            )
+            seen.extend(doc["_id"] for doc in page)
+            if cursor is None:
+                return seen
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_paging_reaches_null_and_missing_sort_values(direction):
+    start = datetime(2026, 5, 1)
+    docs = [{"_id": i, "due": start + timedelta(days=i % 3)} for i in range(5)]
+    docs += [{"_id": 5, "due": None}, {"_id": 6}, {"_id": 7, "due": None}]
+
+    seen = _walk(docs, direction)
+
+    # MongoDB order: nulls first ascending, last descending; _id breaks ties
+    def key(doc):
+        due = doc.get("due")
+        return (due is not None, due or start, doc["_id"])
+
+    expected = [d["_id"] for d in sorted(docs, key=key, reverse=direction < 0)]
+    assert seen == expected
+
+
+def test_keyset_filter_after_null_value():
+    docs = [{"_id": 1, "due": None}, {"_id": 2}, {"_id": 3, "due": 5}]
+
+    ascending = keyset_filter("due", 1, None, 1)
+    descending = keyset_filter("due", -1, None, 2)
+
+    assert [d["_id"] for d in docs if matches(d, ascending)] == [2, 3]
+    assert [d["_id"] for d in docs if matches(d, descending)] == [1]
+
+
+def test_keyset_filter_on_custom_id_field():
+    docs = [{"email": e, "seen": 1} for e in ["a@x", "b@x", "c@x"]]
+
+    after = keyset_filter("seen", -1, 1, "b@x", id_field="email")
+
+    assert [d["email"] for d in docs if matches(d, after)] == ["a@x"]
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import services.rollups as rollups
+from fake_mongo import matches
+
+TODAY = rollups.day_start(datetime.utcnow())
+YESTERDAY = TODAY - timedelta(days=1)
+TWO_DAYS_AGO = TODAY - timedelta(days=2)
+DELHI = {"city": "delhi", "age": 34, "gender": "Female"}
+PUNE = {"city": "Pune", "age": 61, "gender": "male"}
+
+
+class FakeSource:
+    """db.predictions: yields what the $group/$lookup pipeline would return"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.windows = []
+
+    async def aggregate(self, pipeline, allowDiskUse=False):
+        self.windows.append(pipeline[0]["$match"]["created_at"])
+        for row in self.rows:
+            yield row
+
+
+class FakeRollups:
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            assert op._upsert
+            self.docs[op._filter["_id"]] = op._doc
+
+    async def delete_many(self, query):
+        stale = [i for i, doc in self.docs.items() if matches(doc, query)]
+        for doc_id in stale:
+            del self.docs[doc_id]
+        return SimpleNamespace(deleted_count=len(stale))
+
+
+def _bucket(metric, day, total):
+    return {
+        "_id": f"{metric}:{day:%Y-%m-%d}",
+        "metric": metric,
+        "day": day,
+        "total": total,
+    }
+
+
+def _group(day, email, disease, count, user):
+    return {
+        "_id": {"day": day, "email": email, "disease": disease},
+        "count": count,
+        "user": user,
+    }
+
+
+def test_rebuild_recomputes_a_day_and_drops_stale_buckets(monkeypatch):
+    source = FakeSource(
+        [
+            _group(YESTERDAY, "a@example.com", "Malaria", 2, DELHI),
+            _group(YESTERDAY, "b@example.com", "Malaria", 1, PUNE),
+            _group(YESTERDAY, "b@example.com", "Typhoid", 1, PUNE),
+        ]
+    )
+    store = FakeRollups(
+        [
+            # Drifted by a failed increment
+            _bucket("predictions", YESTERDAY, 1),
+            # Its records have since been deleted
+            _bucket("predictions", TWO_DAYS_AGO, 3),
+            # Left to the increments / other metrics
+            _bucket("predictions", TODAY, 9),
+            _bucket("signups", TWO_DAYS_AGO, 4),
+        ]
+    )
+    monkeypatch.setattr(
+        rollups, "db", SimpleNamespace(predictions=source, daily_rollups=store)
+    )
+
+    result = asyncio.run(rollups.rebuild_rollups(days=7, metrics=["predictions"]))
+
+    assert source.windows == [
+        {"$gte": TODAY - timedelta(days=7), "$lt": TODAY, "$type": "date"}
+    ]
+    assert result["predictions"] == {"buckets": 1, "removed": 1}
+    rebuilt = store.docs.pop(f"predictions:{YESTERDAY:%Y-%m-%d}")
+    assert rebuilt["day"] == YESTERDAY and rebuilt["metric"] == "predictions"
+    assert rebuilt["total"] == 4
+    assert rebuilt["by"] == {
+        "disease": {"Malaria": 3, "Typhoid": 1},
+        "city": {"Delhi": 2, "Pune": 2},
+        "age_band": {"30-44": 2, "60+": 2},
+        "gender": {"female": 2, "male": 2},
+        "disease_by_city": {
+            "Delhi": {"Malaria": 2},
+            "Pune": {"Malaria": 1, "Typhoid": 1},
+        },
+    }
+    assert sorted(store.docs) == [
+        f"predictions:{TODAY:%Y-%m-%d}",
+        f"signups:{TWO_DAYS_AGO:%Y-%m-%d}",
+    ]
+
+
+def test_rebuild_is_idempotent(monkeypatch):
+    source = FakeSource([_group(YESTERDAY, "a@example.com", None, 2, {})])
+    store = FakeRollups([])
+    monkeypatch.setattr(
+        rollups, "db", SimpleNamespace(predictions=source, daily_rollups=store)
+    )
+
+    asyncio.run(rollups.rebuild_rollups(days=3, metrics=["predictions"]))
+    first = {i: dict(doc, updated_at=None) for i, doc in store.docs.items()}
+    asyncio.run(rollups.rebuild_rollups(days=3, metrics=["predictions"]))
+    second = {i: dict(doc, updated_at=None) for i, doc in store.docs.items()}
+
+    assert first == second
+    (bucket,) = second.values()
+    assert bucket["total"] == 2
+    assert bucket["by"]["disease"] == {rollups.UNKNOWN: 2}
+    assert bucket["by"]["city"] == {rollups.UNKNOWN: 2}
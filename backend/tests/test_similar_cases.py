@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+from services.similar_cases import Case, SimilarCaseIndex, _jaccard
+
+NUM_SYMPTOMS = 132
+START = datetime(2026, 1, 1)
+
+
+def _bits(symptoms):
+    return sum(1 << s for s in symptoms)
+
+
+def _case(i, symptoms, email="user@example.com"):
+    return Case(str(i), email, "Flu", _bits(symptoms), START + timedelta(minutes=i))
+
+
+def test_query_recalls_cases_at_jaccard_half():
+    rng = random.Random(11)
+    index = SimilarCaseIndex(NUM_SYMPTOMS, max_cases=10_000)
+    queries = []
+    for i in range(500):
+        # Six symptoms with two swapped out: Jaccard exactly 4/8
+        query = set(rng.sample(range(NUM_SYMPTOMS), 6))
+        case = query - set(rng.sample(sorted(query), 2))
+        others = [s for s in range(NUM_SYMPTOMS) if s not in query]
+        case |= set(rng.sample(others, 2))
+        assert _jaccard(_bits(query), _bits(case)) == 0.5
+        index.add(_case(i, case))
+        queries.append((str(i), _bits(query)))
+
+    found = sum(
+        any(case.case_id == case_id for _, case in index.query(bits, limit=50))
+        for case_id, bits in queries
+    )
+    assert found / len(queries) >= 0.95
+
+
+def test_query_ranks_by_exact_jaccard():
+    index = SimilarCaseIndex(NUM_SYMPTOMS)
+    index.add(_case(1, {1, 2, 3, 4}))
+    index.add(_case(2, {1, 2, 3, 4, 5, 6}))
+    index.add(_case(3, {40, 41, 42}))
+
+    results = index.query(_bits({1, 2, 3, 4}))
+
+    assert [(round(sim, 2), case.case_id) for sim, case in results] == [
+        (1.0, "1"),
+        (0.67, "2"),
+    ]
+
+
+def test_add_evicts_oldest_beyond_max_cases():
+    index = SimilarCaseIndex(NUM_SYMPTOMS, max_cases=3)
+    for i in range(5):
+        index.add(_case(i, {1, 2, 3}, email=f"user{i}@example.com"))
+
+    assert len(index) == 3
+    ids = {case.case_id for _, case in index.query(_bits({1, 2, 3}))}
+    assert ids == {"2", "3", "4"}
+    assert index.user_cases("user0@example.com", _bits({1, 2, 3})) == []
+    assert index.watermark == START + timedelta(minutes=4)
+
+
+def test_snapshot_round_trip():
+    index = SimilarCaseIndex(NUM_SYMPTOMS)
+    for i, symptoms in enumerate([{1, 2, 3}, {1, 2, 4}, {7, 8}, {1, 2, 3, 9}]):
+        index.add(_case(i, symptoms, email=f"user{i % 2}@example.com"))
+    query = _bits({1, 2, 3})
+
+    restored = SimilarCaseIndex.from_snapshot(index.snapshot(), NUM_SYMPTOMS)
+
+    assert restored is not None
+    assert len(restored) == len(index)
+    assert restored.watermark == index.watermark
+    assert not restored.dirty
+
+    def summary(results):
+        return [(sim, case.case_id) for sim, case in results]
+
+    assert summary(restored.query(query)) == summary(index.query(query))
+    assert summary(restored.user_cases("user0@example.com", query)) == summary(
+        index.user_cases("user0@example.com", query)
+    )
+
+
+def test_snapshot_rejected_for_other_vocabulary():
+    index = SimilarCaseIndex(NUM_SYMPTOMS)
+    index.add(_case(1, {1, 2}))
+
+    assert SimilarCaseIndex.from_snapshot(index.snapshot(), NUM_SYMPTOMS + 1) is None
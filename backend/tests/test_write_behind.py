@@ -0,0 +1,145 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+import services.write_behind as write_behind_module
+from services.write_behind import (
+    DUPLICATE_KEY_ERROR,
+    MAX_ATTEMPTS,
+    WriteBehindBuffer,
+)
+
+
+class FakeCollection:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.docs = []
+        self.calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo unavailable")
+        self.docs.extend(documents)
+
+    async def insert_one(self, document):
+        self.docs.append(document)
+
+
+def _run_buffer(monkeypatch, collection, scenario, **kwargs):
+    monkeypatch.setattr(write_behind_module, "db", {"chat_messages": collection})
+
+    async def run():
+        # A long interval keeps the background flusher out of the way
+        buffer = WriteBehindBuffer(flush_interval=3600, **kwargs)
+        await buffer.start()
+        try:
+            return await scenario(buffer)
+        finally:
+            buffer._task.cancel()
+
+    return asyncio.run(run())
+
+
+def test_enqueue_overflows_when_full(monkeypatch):
+    collection = FakeCollection()
+
+    async def scenario(buffer):
+        accepted = [buffer.enqueue("chat_messages", {"n": n}) for n in range(3)]
+        stats = buffer.get_stats()
+        await buffer.flush()
+        return accepted, stats, buffer.get_stats()
+
+    accepted, full, flushed = _run_buffer(
+        monkeypatch, collection, scenario, batch_size=10, max_pending=2
+    )
+
+    assert accepted == [True, True, False]
+    assert full["overflow"] == 1 and full["pending"] == 2
+    assert [doc["n"] for doc in collection.docs] == [0, 1]
+    assert flushed["pending"] == 0 and flushed["written"] == 2
+
+
+def test_enqueue_is_refused_when_stopped():
+    buffer = WriteBehindBuffer()
+
+    assert buffer.enqueue("chat_messages", {"n": 1}) is False
+    assert buffer.get_stats()["overflow"] == 0
+
+
+def test_failed_batch_is_retried_on_next_flush(monkeypatch):
+    collection = FakeCollection(failures=1)
+
+    async def scenario(buffer):
+        buffer.enqueue("chat_messages", {"n": 1})
+        await buffer.flush()
+        after_failure = buffer.get_stats()
+        await buffer.flush()
+        return after_failure, buffer.get_stats()
+
+    after_failure, after_retry = _run_buffer(monkeypatch, collection, scenario)
+
+    assert after_failure["retried"] == 1 and after_failure["pending"] == 1
+    assert after_failure["written"] == 0
+    assert after_retry["written"] == 1 and after_retry["pending"] == 0
+    assert after_retry["dropped"] == 0
+    # Same _id on retry, so a partially written batch can't duplicate
+    assert len(collection.docs) == 1 and "_id" in collection.docs[0]
+
+
+def test_batch_is_dropped_after_max_attempts(monkeypatch):
+    collection = FakeCollection(failures=MAX_ATTEMPTS)
+
+    async def scenario(buffer):
+        buffer.enqueue("chat_messages", {"n": 1})
+        for _ in range(MAX_ATTEMPTS + 1):
+            await buffer.flush()
+        return buffer.get_stats()
+
+    stats = _run_buffer(monkeypatch, collection, scenario)
+
+    assert collection.calls == MAX_ATTEMPTS
+    assert stats["retried"] == MAX_ATTEMPTS - 1
+    assert stats["dropped"] == 1 and stats["pending"] == 0
+    assert collection.docs == []
+
+
+def test_flush_only_named_collections(monkeypatch):
+    chat, events = FakeCollection(), FakeCollection()
+    monkeypatch.setattr(
+        write_behind_module, "db", {"chat_messages": chat, "activity_events": events}
+    )
+
+    async def run():
+        buffer = WriteBehindBuffer(flush_interval=3600)
+        await buffer.start()
+        buffer.enqueue("chat_messages", {"n": 1})
+        buffer.enqueue("activity_events", {"n": 2})
+        await buffer.flush(collections=["activity_events"])
+        buffer._task.cancel()
+        return buffer.get_stats()
+
+    stats = asyncio.run(run())
+
+    assert chat.docs == [] and len(events.docs) == 1
+    assert stats["pending_by_collection"] == {"chat_messages": 1}
+
+
+def test_duplicate_keys_count_as_written(monkeypatch):
+    class DuplicateCollection(FakeCollection):
+        async def insert_many(self, documents, ordered=True):
+            # An earlier attempt already wrote the first document
+            raise BulkWriteError(
+                {"writeErrors": [{"index": 0, "code": DUPLICATE_KEY_ERROR}]}
+            )
+
+    async def scenario(buffer):
+        buffer.enqueue("chat_messages", {"n": 1})
+        await buffer.flush()
+        return buffer.get_stats()
+
+    stats = _run_buffer(monkeypatch, DuplicateCollection(), scenario)
+
+    assert stats["written"] == 1
+    assert stats["retried"] == 0 and stats["pending"] == 0
@@ -0,0 +1,107 @@
+"""
+Aho-Corasick multi-pattern matcher
+Finds every occurrence of any of N phrases in a single pass over the text,
+independent of N. Used for emergency phrase detection and symptom mention
+extraction.
+"""
+
+import unicodedata
+from collections import deque
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def is_word_char(ch: str) -> bool:
+    """Letters/digits plus combining marks (Devanagari vowel signs, virama)"""
+    return ch.isalnum() or unicodedata.category(ch) in ("Mn", "Mc")
+
+
+class AhoCorasick(Generic[T]):
+    """
+    Usage:
+        matcher = AhoCorasick()
+        matcher.add("chest pain", "chest_pain")
+        matcher.build()
+        for start, end, value in matcher.find_all(text): ...
+    Patterns are matched as-is; normalize patterns and text the same way.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Outputs per state: (pattern length, value), including those reached via fail links
+        self._out: List[List[Tuple[int, T]]] = [[]]
+        self._patterns = 0
+        self._built = False
+
+    def __len__(self) -> int:
+        return self._patterns
+
+    def add(self, pattern: str, value: T):
+        if self._built:
+            raise RuntimeError("Cannot add patterns after build()")
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+        self._patterns += 1
+
+    def build(self) -> "AhoCorasick[T]":
+        """Compute failure links (BFS); must be called before matching"""
+        queue = deque(self._goto[0].values())  # depth-1 states fail to the root
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def find_all(
+        self, text: str, whole_words: bool = True
+    ) -> Iterator[Tuple[int, int, T]]:
+        """
+        Yield (start, end, value) for every match. With whole_words, matches
+        must not start or end inside a word.
+        """
+        if not self._built:
+            raise RuntimeError("Call build() before matching")
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                start, end = i - length + 1, i + 1
+                if whole_words and (
+                    (
+                        start > 0
+                        and is_word_char(text[start - 1])
+                        and is_word_char(text[start])
+                    )
+                    or (
+                        end < len(text)
+                        and is_word_char(text[end])
+                        and is_word_char(text[end - 1])
+                    )
+                ):
+                    continue
+                yield start, end, value
+
+    def find_values(self, text: str, whole_words: bool = True) -> List[T]:
+        return [value for _, _, value in self.find_all(text, whole_words)]
@@ -6,6 +6,7 @@ from typing import Dict, Optional, Any, List
 from collections import Counter
 from datetime import datetime
 from bson import ObjectId
+import hashlib
 import json
 import re
 
@@ -97,3 +98,9 @@ def mode(arr: List[str]) -> str:
     counter = Counter(arr)
     max_count = max(counter.values())
     return next(k for k, v in counter.items() if v == max_count)
+
+
+def compute_fingerprint(payload: Any) -> str:
+    """Stable SHA-256 fingerprint of a JSON-like payload (key order independent)"""
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
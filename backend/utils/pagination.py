@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination
+List endpoints sort on one field with _id as the tie-breaker and hand back
+an opaque `next_cursor` encoding the (sort value, _id) of the last item.
+The next page starts strictly after that pair, so fetching page N costs
+the same as page 1 (an index seek instead of skipping N pages) and rows
+inserted meanwhile don't shift items between pages.
+
+Each list needs an index on (filter fields..., sort field, _id) in the sort
+direction for the seek to be covered; see database.connection.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    return value
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$date" in value:
+            return datetime.fromisoformat(value["$date"])
+        if "$oid" in value:
+            return ObjectId(value["$oid"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(value: Any, doc_id: Any) -> str:
+    """Opaque cursor for the position just after (value, doc_id)"""
+    payload = json.dumps({"v": _dump_value(value), "id": _dump_value(doc_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """(sort value, _id) from a cursor; 400 if it was tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        doc_id = _load_value(payload["id"])
+        if doc_id is None:
+            raise ValueError("cursor without _id")
+        return _load_value(payload["v"]), doc_id
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(
+    field: str, direction: int, value: Any, doc_id: Any, id_field: str = "_id"
+) -> Dict[str, Any]:
+    """
+    Documents after (value, doc_id) in [(field, direction), (id_field,
+    direction)] order; id_field must be unique. MongoDB sorts missing/null
+    values first ascending and last descending, so those are reached
+    explicitly rather than lost.
+    """
+    id_after = {"$lt": doc_id} if direction < 0 else {"$gt": doc_id}
+    if value is None:
+        tail = [{field: None, id_field: id_after}]
+        if direction > 0:
+            tail.append({field: {"$ne": None}})
+        return {"$or": tail}
+    beyond = {"$lt": value} if direction < 0 else {"$gt": value}
+    conditions = [{field: beyond}, {field: value, id_field: id_after}]
+    if direction < 0:
+        conditions.append({field: None})
+    return {"$or": conditions}
+
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    direction: int = -1,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of `collection` matching `query`, ordered by sort_field then
+    _id. Returns (documents, next_cursor); next_cursor is None on the last
+    page. Documents are returned as stored (ObjectIds not serialized).
+    """
+    if cursor:
+        value, doc_id = decode_cursor(cursor)
+        query = {"$and": [query, keyset_filter(sort_field, direction, value, doc_id)]}
+    docs = (
+        await collection.find(query, projection)
+        .sort([(sort_field, direction), ("_id", direction)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+    return docs, next_cursor
@@ -0,0 +1,87 @@
+"""
+Text normalization and fuzzy-matching helpers
+Shared by the emergency detector and the symptom normalizer so patterns and
+user text (English, Hindi, Hinglish) are folded the same way.
+"""
+
+import re
+import unicodedata
+from typing import List, Sequence, Set
+
+_APOSTROPHES = re.compile(r"['’`´]")
+_NON_WORD = re.compile(r"[^\wऀ-ॿ]+")
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+# Words that negate a phrase mentioned up to NEGATION_WINDOW tokens later
+NEGATIONS = {
+    "no",
+    "not",
+    "without",
+    "dont",
+    "doesnt",
+    "didnt",
+    "never",
+    "denies",
+    "na",
+    "nahi",
+    "nahin",
+    "नहीं",
+    "ना",
+    "बिना",
+    "bina",
+}
+# Hindi places the negation after the phrase: "bukhar nahi hai"
+POSTPOSED_NEGATIONS = {"nahi", "nahin", "नहीं", "ना"}
+NEGATION_WINDOW = 3
+# Clause boundaries; negation does not carry across them
+CLAUSE_BOUNDARIES = re.compile(
+    r"[.,;:!?\n|।]+|\b(?:but|however|although|lekin|magar)\b|लेकिन|मगर"
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, fold Hindi spelling variants, drop punctuation, collapse spaces"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    text = text.replace("़", "")  # nukta: ज़ → ज
+    text = text.replace("ँ", "ं")  # chandrabindu → anusvara: साँस → सांस
+    text = _APOSTROPHES.sub("", text)
+    text = text.replace("_", " ")
+    text = f" {' '.join(_NON_WORD.sub(' ', text).split())} "
+    return text.replace(" में ", " मे ").replace(" mein ", " me ").strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of `text`, padded so short words still get some"""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance between a and b, or max_distance + 1 as soon as it is
+    known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous: List[int] = list(range(len(a) + 1))
+    for i, cb in enumerate(b, 1):
+        current = [i]
+        for j, ca in enumerate(a, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def is_negated(tokens: Sequence[str], first: int, end: int) -> bool:
+    """Whether the phrase at tokens[first:end] is negated within its clause"""
+    before = tokens[max(0, first - NEGATION_WINDOW) : first]
+    after = tokens[end : end + 2]
+    return any(t in NEGATIONS for t in before) or any(
+        t in POSTPOSED_NEGATIONS for t in after
+    )
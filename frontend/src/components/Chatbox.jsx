@@ -15,6 +15,7 @@ const Chatbot = () => {
   const [inputMessage, setInputMessage] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const [geminiAvailable, setGeminiAvailable] = useState(false);
+  const [conversationId, setConversationId] = useState(null);
   const messagesEndRef = useRef(null);
   const { email } = useAuth();
 
@@ -53,9 +54,16 @@ const Chatbot = () => {
 
     try {
       const context = email ? { user_email: email } : {};
-      const response = await geminiAPI.healthChat(userMessage, context);
+      const response = await geminiAPI.healthChat(
+        userMessage,
+        context,
+        conversationId
+      );
 
       if (response.success && response.data) {
+        if (response.data.conversation_id) {
+          setConversationId(response.data.conversation_id);
+        }
         setMessages((prev) => [
           ...prev,
           {
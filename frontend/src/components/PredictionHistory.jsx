@@ -192,6 +192,11 @@ function PredictionHistory() {
                             ⭐ AI Enhanced
                           </span>
                         )}
+                        {typeof prediction.confidence === "number" && (
+                          <span className="bg-gray-100 dark:bg-gray-700 text-gray-700 dark:text-gray-300 text-xs px-3 py-1 rounded-full font-semibold">
+                            {Math.round(prediction.confidence * 100)}% relative score
+                          </span>
+                        )}
                       </div>
                       <div className="flex items-center gap-4 text-sm text-gray-600 dark:text-gray-400 mb-3">
                         <span className="flex items-center gap-2 bg-gray-100 dark:bg-gray-700 px-3 py-1 rounded-lg">
@@ -272,6 +277,26 @@ function PredictionHistory() {
                     </div>
                   </div>
                 )}
+                {selectedPrediction.differential?.length > 0 && (
+                  <div className="p-4 bg-gradient-to-r from-green-50 to-emerald-50 dark:from-green-950/30 dark:to-emerald-950/30 rounded-xl border border-green-200 dark:border-green-800">
+                    <p className="text-sm font-bold text-gray-700 dark:text-gray-300 mb-3">
+                      Differential:
+                    </p>
+                    <ul className="space-y-1">
+                      {selectedPrediction.differential.map((item) => (
+                        <li
+                          key={item.disease}
+                          className="flex justify-between text-sm text-gray-700 dark:text-gray-300"
+                        >
+                          <span>{item.disease}</span>
+                          <span className="font-semibold">
+                            {Math.round((item.score ?? item.probability) * 100)}%
+                          </span>
+                        </li>
+                      ))}
+                    </ul>
+                  </div>
+                )}
                 {selectedPrediction.ml_models && (
                   <div className="p-4 bg-gradient-to-r from-purple-50 to-purple-100 dark:from-purple-950/30 dark:to-purple-900/30 rounded-xl border border-purple-200 dark:border-purple-800">
                     <p className="text-sm font-bold text-gray-700 dark:text-gray-300 mb-3">
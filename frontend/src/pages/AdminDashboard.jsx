@@ -258,6 +258,11 @@ function AdminDashboard() {
         <div className="mt-6">
           {activeTab === "overview" && stats && (
             <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }}>
+              {stats.computed_at && (
+                <p className="text-xs text-gray-500 dark:text-gray-400 mb-3">
+                  Counts as of {new Date(`${stats.computed_at}Z`).toLocaleString()}
+                </p>
+              )}
               <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-5 gap-4 mb-8">
                 {Object.entries(stats.overview || {}).map(([key, value]) => {
                   const Icon = STAT_ICONS[key] || FaChartLine;
@@ -28,7 +28,9 @@ const MOOD_OPTIONS = [
 
 function SymptomTimeline() {
   const [events, setEvents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [filter, setFilter] = useState(null);
   const [days, setDays] = useState(90);
   const [showJournalModal, setShowJournalModal] = useState(false);
@@ -47,6 +49,7 @@ function SymptomTimeline() {
       const data = await timelineAPI.getTimeline(days, filter);
       if (data.success) {
         setEvents(data.data.events || []);
+        setNextCursor(data.data.next_cursor || null);
       } else {
         toast.error("Failed to load timeline");
       }
@@ -58,6 +61,23 @@ function SymptomTimeline() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const data = await timelineAPI.getTimeline(days, filter, 100, nextCursor);
+      if (data.success) {
+        setEvents((prev) => [...prev, ...(data.data.events || [])]);
+        setNextCursor(data.data.next_cursor || null);
+      }
+    } catch (error) {
+      console.error("Timeline error:", error);
+      toast.error("Failed to load more events");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleCreateJournal = async (e) => {
     e.preventDefault();
     try {
@@ -381,6 +401,17 @@ function SymptomTimeline() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                  className="border-2 border-btn2 text-btn2 px-6 py-2 rounded-xl font-semibold hover:bg-btn2 hover:text-white transition-all disabled:opacity-50"
+                >
+                  {isLoadingMore ? "Loading..." : "Load older events"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -160,6 +160,29 @@ export const predictionAPI = {
     });
   },
 
+  // Interactive diagnosis: which symptom to ask about next
+  nextSymptom: async (present, absent = [], limit = 3) => {
+    return apiRequest("/predict/next-symptom", {
+      method: "POST",
+      body: JSON.stringify({ present, absent, limit }),
+    });
+  },
+
+  getSymptoms: async () => {
+    return apiRequest("/predict/symptoms", {
+      method: "GET",
+    });
+  },
+
+  // Autocomplete ranked by co-occurrence with already selected symptoms
+  suggestSymptoms: async (q, selected = [], limit = 10) => {
+    const params = new URLSearchParams({ q, limit });
+    selected.forEach((symptom) => params.append("selected", symptom));
+    return apiRequest(`/predict/symptoms/suggest?${params}`, {
+      method: "GET",
+    });
+  },
+
   getHistory: async (limit = 50) => {
     return apiRequest(`/predictions/history?limit=${limit}`, {
       method: "GET",
@@ -184,10 +207,14 @@ export const predictionAPI = {
  * Gemini AI APIs
  */
 export const geminiAPI = {
-  healthChat: async (message, context = {}) => {
+  healthChat: async (message, context = {}, conversationId = null) => {
     return apiRequest("/gemini/chat", {
       method: "POST",
-      body: JSON.stringify({ message, context }),
+      body: JSON.stringify({
+        message,
+        context,
+        ...(conversationId && { conversation_id: conversationId }),
+      }),
     });
   },
 
@@ -211,8 +238,9 @@ export const geminiAPI = {
     });
   },
 
-  generateHealthPlan: async () => {
-    return apiRequest("/gemini/health/personalized-plan", {
+  generateHealthPlan: async (force = false) => {
+    const query = force ? "?force=true" : "";
+    return apiRequest(`/gemini/health/personalized-plan${query}`, {
       method: "POST",
       body: JSON.stringify({}),
     });
@@ -438,9 +466,10 @@ export const healthAPI = {
  * Timeline / Health Journal APIs
  */
 export const timelineAPI = {
-  getTimeline: async (days = 90, eventType = null, limit = 100) => {
+  getTimeline: async (days = 90, eventType = null, limit = 100, before = null) => {
     const params = new URLSearchParams({ days, limit });
     if (eventType) params.append("event_type", eventType);
+    if (before) params.append("before", before);
     return apiRequest(`/timeline?${params}`, { method: "GET" });
   },
 
@@ -543,7 +572,7 @@ export const doctorAPI = {
     if (params.min_rating) searchParams.append("min_rating", params.min_rating);
     if (params.sort_by) searchParams.append("sort_by", params.sort_by);
     if (params.limit) searchParams.append("limit", params.limit);
-    if (params.skip) searchParams.append("skip", params.skip);
+    if (params.cursor) searchParams.append("cursor", params.cursor);
     return apiRequest(`/doctors?${searchParams}`, { method: "GET" });
   },
 
@@ -593,8 +622,9 @@ export const adminAPI = {
     return apiRequest("/admin/stats", { method: "GET" });
   },
 
-  getUsers: async (search = "", limit = 50, skip = 0) => {
-    const params = new URLSearchParams({ limit, skip });
+  getUsers: async (search = "", limit = 50, cursor = null, sortBy = "created_at") => {
+    const params = new URLSearchParams({ limit, sort_by: sortBy });
+    if (cursor) params.append("cursor", cursor);
     if (search) params.append("search", search);
     return apiRequest(`/admin/users?${params}`, { method: "GET" });
   },
@@ -614,6 +644,13 @@ export const adminAPI = {
   getActivity: async (limit = 20) => {
     return apiRequest(`/admin/activity?limit=${limit}`, { method: "GET" });
   },
+
+  getTrends: async (metric, { days = 30, granularity = "day", dimension = null, city = null } = {}) => {
+    const params = new URLSearchParams({ days, granularity });
+    if (dimension) params.append("dimension", dimension);
+    if (city) params.append("city", city);
+    return apiRequest(`/admin/trends/${metric}?${params}`, { method: "GET" });
+  },
 };
 
 /**